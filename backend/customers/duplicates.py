@@ -0,0 +1,120 @@
+"""
+Duplicate customer detection (blocking + pair scoring) and set-based merging
+"""
+import unicodedata
+from collections import defaultdict
+from itertools import combinations
+
+from django.conf import settings
+from django.db import transaction
+
+from measurements.models import Measurement
+from orders.models import Order
+from payments.models import Payment
+from .models import Customer
+from .search import word_similarity
+
+# Blocks bigger than this are placeholders (a shop number, a very common name), not duplicates
+MAX_BLOCK_SIZE = 50
+# Weighted towards the name: the same phonetic key alone (NAME_WEIGHT) reaches the default
+# minimum score, so one person saved under two numbers is found; a shared phone alone
+# (a family number) is not
+PHONE_WEIGHT = 0.3
+NAME_WEIGHT = 0.6
+EXACT_NAME_WEIGHT = 0.1
+# Fields a merge copies from a duplicate when the kept customer has no value
+FILLABLE_FIELDS = ('address', 'notes')
+
+
+def min_duplicate_score():
+    return getattr(settings, 'CUSTOMER_DUPLICATE_MIN_SCORE', 0.6)
+
+
+def plain_name(name):
+    return ' '.join(unicodedata.normalize('NFC', name or '').casefold().split())
+
+
+def score_pair(a, b):
+    """0..1 from a shared normalized phone, phonetic name similarity and an identical spelling"""
+    score = 0.0
+    if a['phone_e164'] and a['phone_e164'] == b['phone_e164']:
+        score += PHONE_WEIGHT
+    if a['name_key'] and a['name_key'] == b['name_key']:
+        score += NAME_WEIGHT
+    else:
+        score += NAME_WEIGHT * min(word_similarity(a['name_key'] or '', b['name_key'] or ''),
+                                   word_similarity(b['name_key'] or '', a['name_key'] or ''))
+    if plain_name(a['name']) == plain_name(b['name']):
+        score += EXACT_NAME_WEIGHT
+    return round(score, 3)
+
+
+def candidate_pairs(rows, by_name=True):
+    """Id pairs sharing a normalized phone or (by_name) a full phonetic name key; never all-pairs"""
+    blocks = defaultdict(list)
+    for row in rows:
+        if row['phone_e164']:
+            blocks['phone', row['phone_e164']].append(row['id'])
+        if by_name and row['name_key']:
+            blocks['name', row['name_key']].append(row['id'])
+    pairs = set()
+    for ids in blocks.values():
+        if 1 < len(ids) <= MAX_BLOCK_SIZE:
+            pairs.update(combinations(sorted(ids), 2))
+    return pairs
+
+
+def find_duplicates(min_score=None, queryset=None):
+    """[(score, keep_id, duplicate_id)] best first; the older customer is the one to keep"""
+    min_score = min_duplicate_score() if min_score is None else min_score
+    queryset = Customer.objects.all() if queryset is None else queryset
+    rows = {row['id']: row for row in queryset.values('id', 'name', 'phone_e164', 'name_key')}
+    # Pairs that only share a name cannot reach a score above the name weights
+    by_name = min_score <= NAME_WEIGHT + EXACT_NAME_WEIGHT
+    found = []
+    for first, second in candidate_pairs(rows.values(), by_name):
+        score = score_pair(rows[first], rows[second])
+        if score >= min_score:
+            found.append((score, first, second))
+    found.sort(key=lambda item: (-item[0], item[1], item[2]))
+    return found
+
+
+def merge_customers(target_id, duplicate_ids):
+    """
+    Move the duplicates' measurements and orders (and so their payments) to the target and
+    delete the duplicates, in one transaction with one UPDATE per table.
+
+    Returns the counts of moved rows. Raises Customer.DoesNotExist for unknown ids.
+    """
+    duplicate_ids = sorted(set(duplicate_ids) - {target_id})
+    with transaction.atomic():
+        target = Customer.objects.select_for_update().get(pk=target_id)
+        duplicates = list(Customer.objects.select_for_update().filter(id__in=duplicate_ids).order_by('-id'))
+        missing = set(duplicate_ids) - {customer.id for customer in duplicates}
+        if missing:
+            raise Customer.DoesNotExist(f"Unknown customer id(s): {', '.join(map(str, sorted(missing)))}")
+
+        moved = {
+            'measurements': Measurement.objects.filter(customer_id__in=duplicate_ids).update(customer_id=target_id),
+            'payments': Payment.objects.filter(order__customer_id__in=duplicate_ids).count(),
+            'orders': Order.objects.filter(customer_id__in=duplicate_ids).update(customer_id=target_id),
+        }
+
+        changed = []
+        for field in FILLABLE_FIELDS:
+            if not getattr(target, field):
+                value = next((getattr(customer, field) for customer in duplicates if getattr(customer, field)), None)
+                if value:
+                    setattr(target, field, value)
+                    changed.append(field)
+        if target.gender == 'unisex':
+            gender = next((customer.gender for customer in duplicates if customer.gender != 'unisex'), None)
+            if gender:
+                target.gender = gender
+                changed.append('gender')
+        if changed:
+            target.save(update_fields=changed)
+
+        Customer.objects.filter(id__in=duplicate_ids).delete()
+    return target, moved
@@ -0,0 +1,107 @@
+"""
+SQLite FTS5 index over customers, kept current by triggers.
+
+Imports no models: migration 0003 builds the index from here, and must keep working
+however the Customer model changes later.
+"""
+from django.db import connection
+
+FTS_TABLE = 'customers_fts'
+# bm25 column weights: name, phone, address, notes
+FTS_WEIGHTS = (10.0, 5.0, 1.0, 1.0)
+
+FTS_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        name, phone, address, notes,
+        content='customers', content_rowid='id',
+        tokenize="unicode61 remove_diacritics 2 categories 'L* N* Co M*'",
+        prefix='2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON customers BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, phone, address, notes)
+        VALUES (new.id, new.name, new.phone, new.address, new.notes);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON customers BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, phone, address, notes)
+        VALUES ('delete', old.id, old.name, old.phone, old.address, old.notes);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF name, phone, address, notes ON customers BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, phone, address, notes)
+        VALUES ('delete', old.id, old.name, old.phone, old.address, old.notes);
+        INSERT INTO {FTS_TABLE}(rowid, name, phone, address, notes)
+        VALUES (new.id, new.name, new.phone, new.address, new.notes);
+    END
+    """,
+]
+
+FTS_DROP = [
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ai',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_ad',
+    f'DROP TRIGGER IF EXISTS {FTS_TABLE}_au',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+]
+
+_availability = {}
+
+
+def sqlite_has_fts5(cursor):
+    try:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        if cursor.fetchone()[0]:
+            return True
+        # Some builds load FTS5 without the compile option being reported
+        cursor.execute("CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(x)")
+        cursor.execute("DROP TABLE temp.fts5_probe")
+        return True
+    except Exception:
+        return False
+
+
+def create_fts_index(schema_editor):
+    """(Re)create the FTS table and its triggers and rebuild it from customers; SQLite only"""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        if not sqlite_has_fts5(cursor):
+            return
+        for statement in FTS_DDL:
+            cursor.execute(statement)
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    _availability.clear()
+
+
+def drop_fts_index(schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for statement in FTS_DROP:
+            cursor.execute(statement)
+    _availability.clear()
+
+
+def fts_available():
+    """Whether the current database has the customers FTS table (checked once per database)"""
+    if connection.vendor != 'sqlite':
+        return False
+    key = str(connection.settings_dict['NAME'])
+    if key not in _availability:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+            _availability[key] = cursor.fetchone() is not None
+    return _availability[key]
+
+
+def fts_query(text):
+    """MATCH expression: every word must match as a prefix ("rah mir" finds "Rahim, Mirpur")"""
+    words = [word.replace('"', '') for word in text.split()]
+    words = [word for word in words if word]
+    if not words:
+        return None
+    return ' '.join(f'"{word}"*' for word in words)
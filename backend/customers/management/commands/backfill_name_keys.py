@@ -0,0 +1,54 @@
+"""
+Fill Customer.name_key and the customer_name_trigrams rows fuzzy search reads.
+
+Model.save() keeps them current, but QuerySet.update(), bulk_create() and raw SQL do not,
+so every row is re-derived and only customers whose stored key differs are rewritten.
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from customers.models import Customer, CustomerNameTrigram
+from customers.phonetic import phonetic_key, trigrams
+
+
+class Command(BaseCommand):
+    help = "Recompute customer phonetic name keys and their trigrams where they are missing or stale"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--missing-only',
+            action='store_true',
+            help="Only fill customers whose name_key is empty, skipping the check for stale keys",
+        )
+
+    def handle(self, *args, **options):
+        rows = Customer.objects.order_by('id')
+        if options['missing_only']:
+            rows = rows.filter(name_key__isnull=True)
+        updated = 0
+        last_id = 0
+        # Keyset batches, so no read cursor stays open while the rows are rewritten
+        while True:
+            batch = list(rows.filter(id__gt=last_id).values_list('id', 'name', 'name_key')[:options['batch_size']])
+            if not batch:
+                break
+            last_id = batch[-1][0]
+            changed = []
+            for customer_id, name, stored_key in batch:
+                key = phonetic_key(name)
+                if key != stored_key:
+                    changed.append(Customer(id=customer_id, name_key=key))
+            if changed:
+                updated += self.write(changed)
+        self.stdout.write(self.style.SUCCESS(f"customers: updated {updated} name key(s)"))
+
+    def write(self, customers):
+        with transaction.atomic():
+            Customer.objects.bulk_update(customers, ['name_key'])
+            CustomerNameTrigram.objects.filter(customer_id__in=[customer.id for customer in customers]).delete()
+            CustomerNameTrigram.objects.bulk_create(
+                CustomerNameTrigram(customer_id=customer.id, trigram=gram)
+                for customer in customers for gram in trigrams(customer.name_key)
+            )
+        return len(customers)
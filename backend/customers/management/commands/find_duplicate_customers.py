@@ -0,0 +1,33 @@
+"""
+Report likely duplicate customers, blocked by normalized phone and phonetic name key
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from customers.duplicates import find_duplicates
+from customers.models import Customer
+
+
+class Command(BaseCommand):
+    help = "List likely duplicate customer pairs; merge them with POST /api/customers/merge/"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--min-score', type=float, default=None,
+                            help="Lowest pair score to report (default: CUSTOMER_DUPLICATE_MIN_SCORE)")
+        parser.add_argument('--limit', type=int, default=100, help="Most pairs to print")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        pairs = find_duplicates(options['min_score'])
+        elapsed = time.perf_counter() - started
+
+        shown = pairs[:options['limit']]
+        ids = {customer_id for _, keep, duplicate in shown for customer_id in (keep, duplicate)}
+        customers = Customer.objects.in_bulk(ids)
+        for score, keep, duplicate in shown:
+            a, b = customers[keep], customers[duplicate]
+            self.stdout.write(f"{score:.2f}  #{a.id} {a.name} ({a.phone})  <-  #{b.id} {b.name} ({b.phone})")
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(pairs)} likely duplicate pair(s) among {Customer.objects.count()} customers in {elapsed:.2f}s"
+        ))
@@ -0,0 +1,24 @@
+# Generated by Django 5.0.1 on 2026-10-17 09:12
+
+from django.db import migrations
+
+from customers.fts import create_fts_index, drop_fts_index
+
+
+def create_index(apps, schema_editor):
+    # No-op off SQLite or without FTS5; search then keeps using LIKE
+    create_fts_index(schema_editor)
+
+
+def drop_index(apps, schema_editor):
+    drop_fts_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ('customers', '0002_customer_gender'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
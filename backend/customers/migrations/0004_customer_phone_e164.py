@@ -0,0 +1,31 @@
+# Generated by Django 5.0.1 on 2026-10-17 03:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0003_customer_fts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customer',
+            name='phone_e164',
+            field=models.CharField(blank=True, editable=False, max_length=16, null=True),
+        ),
+        migrations.AddField(
+            model_name='customer',
+            name='phone_reversed',
+            field=models.CharField(blank=True, editable=False, max_length=15, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['phone_e164'], name='idx_customers_phone_e164'),
+        ),
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['phone_reversed'], name='idx_customers_phone_reversed'),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.0.1 on 2026-10-17 03:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from customers.phonetic import phonetic_key, trigrams
+
+
+def index_existing_names(apps, schema_editor):
+    Customer = apps.get_model('customers', 'Customer')
+    CustomerNameTrigram = apps.get_model('customers', 'CustomerNameTrigram')
+    customers = []
+    batch = []
+    # Materialized first: the loop rewrites the rows it reads
+    for customer_id, name in list(Customer.objects.order_by('id').values_list('id', 'name')):
+        key = phonetic_key(name)
+        customers.append(Customer(id=customer_id, name_key=key))
+        batch.extend(CustomerNameTrigram(customer_id=customer_id, trigram=gram) for gram in trigrams(key))
+        if len(customers) >= 2000:
+            Customer.objects.bulk_update(customers, ['name_key'])
+            CustomerNameTrigram.objects.bulk_create(batch)
+            customers, batch = [], []
+    Customer.objects.bulk_update(customers, ['name_key'])
+    CustomerNameTrigram.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0004_customer_phone_e164'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customer',
+            name='name_key',
+            field=models.CharField(blank=True, editable=False, max_length=255, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['name_key'], name='idx_customers_name_key'),
+        ),
+        migrations.CreateModel(
+            name='CustomerNameTrigram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trigram', models.CharField(max_length=3)),
+                ('customer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='name_trigrams', to='customers.customer')),
+            ],
+            options={
+                'db_table': 'customer_name_trigrams',
+                'indexes': [models.Index(fields=['trigram', 'customer'], name='idx_customer_name_trigrams')],
+            },
+        ),
+        migrations.RunPython(index_existing_names, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,8 @@
 from django.db import models
 
+from dorji360.phone import reversed_digits, to_e164
+from .phonetic import phonetic_key
+
 
 class Customer(models.Model):
     GENDER_CHOICES = [
@@ -10,6 +13,11 @@ class Customer(models.Model):
 
     name = models.CharField(max_length=255)
     phone = models.CharField(max_length=50)
+    # Derived from phone on save (and by the backfill_phone_numbers command)
+    phone_e164 = models.CharField(max_length=16, blank=True, null=True, editable=False)
+    phone_reversed = models.CharField(max_length=15, blank=True, null=True, editable=False)
+    # Script-independent phonetic key of name, set on save (and by the backfill_name_keys command)
+    name_key = models.CharField(max_length=255, blank=True, null=True, editable=False)
     gender = models.CharField(max_length=10, choices=GENDER_CHOICES, default='unisex')
     address = models.TextField(blank=True, null=True)
     notes = models.TextField(blank=True, null=True)
@@ -18,6 +26,49 @@ class Customer(models.Model):
     class Meta:
         db_table = 'customers'
         ordering = ['-id']
+        indexes = [
+            models.Index(fields=['phone_e164'], name='idx_customers_phone_e164'),
+            models.Index(fields=['phone_reversed'], name='idx_customers_phone_reversed'),
+            models.Index(fields=['name_key'], name='idx_customers_name_key'),
+        ]
 
     def __str__(self):
         return self.name
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._stored_name_key = instance.__dict__.get('name_key')
+        return instance
+
+    def save(self, *args, **kwargs):
+        self.phone_e164 = to_e164(self.phone)
+        self.phone_reversed = reversed_digits(self.phone_e164)
+        self.name_key = phonetic_key(self.name)
+        # Read by the post_save handler: the name trigrams only change with the key
+        self._name_key_changed = self._state.adding or self.name_key != getattr(self, '_stored_name_key', None)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            if 'phone' in update_fields:
+                update_fields = {*update_fields, 'phone_e164', 'phone_reversed'}
+            if 'name' in update_fields:
+                update_fields = {*update_fields, 'name_key'}
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+        if update_fields is None or 'name' in update_fields:
+            self._stored_name_key = self.name_key
+
+
+class CustomerNameTrigram(models.Model):
+    """One trigram of Customer.name_key, indexed for fuzzy name search"""
+    customer = models.ForeignKey('Customer', on_delete=models.CASCADE, related_name='name_trigrams')
+    trigram = models.CharField(max_length=3)
+
+    class Meta:
+        db_table = 'customer_name_trigrams'
+        indexes = [
+            models.Index(fields=['trigram', 'customer'], name='idx_customer_name_trigrams'),
+        ]
+
+    def __str__(self):
+        return f"{self.trigram!r} ({self.customer_id})"
@@ -0,0 +1,88 @@
+"""
+Script-independent phonetic keys for customer names, so "রহিম" and "Rahim" compare equal
+"""
+import re
+import unicodedata
+
+# Bangla letters to rough Latin
+BANGLA_TO_LATIN = {
+    # independent vowels
+    'অ': 'a', 'আ': 'a', 'ই': 'i', 'ঈ': 'i', 'উ': 'u', 'ঊ': 'u', 'ঋ': 'ri',
+    'এ': 'e', 'ঐ': 'oi', 'ও': 'o', 'ঔ': 'ou',
+    # vowel signs
+    'া': 'a', 'ি': 'i', 'ী': 'i', 'ু': 'u', 'ূ': 'u', 'ৃ': 'ri',
+    'ে': 'e', 'ৈ': 'oi', 'ো': 'o', 'ৌ': 'ou',
+    # consonants
+    'ক': 'k', 'খ': 'kh', 'গ': 'g', 'ঘ': 'gh', 'ঙ': 'ng',
+    'চ': 'ch', 'ছ': 'chh', 'জ': 'j', 'ঝ': 'jh', 'ঞ': 'n',
+    'ট': 't', 'ঠ': 'th', 'ড': 'd', 'ঢ': 'dh', 'ণ': 'n',
+    'ত': 't', 'থ': 'th', 'দ': 'd', 'ধ': 'dh', 'ন': 'n',
+    'প': 'p', 'ফ': 'ph', 'ব': 'b', 'ভ': 'bh', 'ম': 'm',
+    'য': 'j', 'র': 'r', 'ল': 'l', 'শ': 'sh', 'ষ': 'sh', 'স': 's', 'হ': 'h',
+    '\u09dc': 'r', '\u09dd': 'r', '\u09df': 'y', 'ৎ': 't', 'ং': 'ng',
+    # hasanta, nukta, chandrabindu, visarga carry no sound of their own here
+    '্': '', '়': '', 'ঁ': '', 'ঃ': '',
+}
+# NFC keeps these decomposed (base + nukta); fold them into the precomposed letters first
+NUKTA_FORMS = {'\u09a1\u09bc': '\u09dc', '\u09a2\u09bc': '\u09dd', '\u09af\u09bc': '\u09df'}
+BANGLA_DIGITS = str.maketrans('০১২৩৪৫৬৭৮৯', '0123456789')
+BANGLA_CONSONANTS = set('কখগঘঙচছজঝঞটঠডঢণতথদধনপফবভমযরলশষসহ\u09dc\u09dd\u09df')
+
+# Spelling variants that sound alike, applied after transliteration
+DIGRAPHS = [
+    ('chh', 'c'), ('ch', 'c'), ('ck', 'k'), ('sh', 's'), ('ph', 'f'), ('kh', 'k'), ('gh', 'g'),
+    ('th', 't'), ('dh', 'd'), ('bh', 'b'), ('jh', 'j'), ('ng', 'n'),
+    ('z', 'j'), ('q', 'k'), ('v', 'b'), ('x', 'ks'),
+]
+VOWELS = set('aeiouyw')
+CONSONANTS = set('bcdfgjklmnprstx')
+NON_LETTERS_RE = re.compile(r'[^a-z]')
+
+
+def transliterate(text):
+    """Bangla script to rough lowercase Latin; Latin text is passed through"""
+    text = unicodedata.normalize('NFC', text or '')
+    for decomposed, composed in NUKTA_FORMS.items():
+        text = text.replace(decomposed, composed)
+    text = text.translate(BANGLA_DIGITS)
+    latin = []
+    for char, following in zip(text, text[1:] + ' '):
+        latin.append(BANGLA_TO_LATIN.get(char, char))
+        if char in BANGLA_CONSONANTS and following in BANGLA_CONSONANTS:
+            latin.append('o')  # inherent vowel, so রহিম reads "rohim" rather than "rhim"
+    return ''.join(latin).lower()
+
+
+def word_key(word):
+    """Consonant skeleton of one romanized word: 'Mohammad' and 'Muhammad' both give 'mhmd'"""
+    word = unicodedata.normalize('NFKD', word)
+    word = NON_LETTERS_RE.sub('', ''.join(char for char in word if not unicodedata.combining(char)))
+    for spelling, sound in DIGRAPHS:
+        word = word.replace(spelling, sound)
+    if not word:
+        return ''
+    key = 'a' if word[0] in VOWELS else word[0]
+    previous = word[0]
+    for char in word[1:]:
+        if char in VOWELS or (char == 'h' and previous in CONSONANTS):
+            previous = char
+            continue
+        if key[-1] != char:
+            key += char
+        previous = char
+    return key
+
+
+def phonetic_key(name):
+    """Space-separated word keys of a name written in Bangla or English"""
+    keys = (word_key(word) for word in transliterate(name).split())
+    return ' '.join(key for key in keys if key)
+
+
+def trigrams(key):
+    """Trigrams of each word padded like pg_trgm ('  r', ' rh', 'rhm', 'hm ')"""
+    grams = set()
+    for word in key.split():
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
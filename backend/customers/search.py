@@ -0,0 +1,97 @@
+"""
+Customer search: ranked prefix matching through an SQLite FTS5 index (LIKE elsewhere),
+and fuzzy name matching on phonetic-key trigrams
+"""
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Q
+
+from .fts import FTS_TABLE, FTS_WEIGHTS, fts_query
+from .models import Customer, CustomerNameTrigram
+from .phonetic import phonetic_key, trigrams
+
+
+def ranked_customer_ids(text, limit=None, offset=0):
+    """Customer ids matching `text`, best bm25 rank first"""
+    expression = fts_query(text)
+    if expression is None:
+        return []
+    weights = ', '.join(str(weight) for weight in FTS_WEIGHTS)
+    sql = (
+        f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+        f'ORDER BY bm25({FTS_TABLE}, {weights}), rowid DESC LIMIT %s OFFSET %s'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [expression, -1 if limit is None else limit, offset])
+        return [row[0] for row in cursor.fetchall()]
+
+
+def phone_digit_ids(digits, limit=None):
+    """Customer ids whose phone contains `digits` anywhere (FTS only matches from the start), newest first"""
+    return list(Customer.objects.filter(phone__contains=digits).order_by('-id').values_list('id', flat=True)[:limit])
+
+
+def like_filter(text):
+    """Fallback when FTS5 is unavailable: substring match on the same columns"""
+    condition = (
+        Q(name__icontains=text) | Q(phone__icontains=text)
+        | Q(address__icontains=text) | Q(notes__icontains=text)
+    )
+    if text.isdigit():
+        condition |= Q(id=text)
+    return condition
+
+
+# Customers scored per fuzzy query, taken in order of shared trigrams
+FUZZY_CANDIDATES = 500
+
+
+def index_name_trigrams(customer):
+    """Replace the stored trigrams of one customer's name_key"""
+    with transaction.atomic():
+        CustomerNameTrigram.objects.filter(customer_id=customer.pk).delete()
+        CustomerNameTrigram.objects.bulk_create(
+            CustomerNameTrigram(customer_id=customer.pk, trigram=gram) for gram in trigrams(customer.name_key or '')
+        )
+
+
+def word_similarity(query_key, name_key):
+    """Mean over query words of the best trigram similarity (shared / union) to any word of the name"""
+    query_words = [trigrams(word) for word in query_key.split()]
+    name_words = [trigrams(word) for word in (name_key or '').split()]
+    if not query_words or not name_words:
+        return 0.0
+    total = 0.0
+    for query in query_words:
+        total += max(len(query & name) / len(query | name) for name in name_words)
+    return total / len(query_words)
+
+
+def fuzzy_customer_ids(text, limit=None, offset=0):
+    """
+    Customer ids whose name sounds like `text` in either script, best first.
+
+    Candidates come from the trigram index (no per-query work over the table); each is
+    scored by word_similarity of the phonetic keys and kept above CUSTOMER_FUZZY_THRESHOLD.
+    Only the FUZZY_CANDIDATES best candidates are scored, so results are capped.
+    """
+    key = phonetic_key(text)
+    grams = trigrams(key)
+    if not grams:
+        return []
+    candidates = (
+        CustomerNameTrigram.objects.filter(trigram__in=grams)
+        .values('customer_id')
+        .annotate(shared=Count('id'))
+        .order_by('-shared', '-customer_id')
+        .values_list('customer_id', flat=True)[:FUZZY_CANDIDATES]
+    )
+    threshold = getattr(settings, 'CUSTOMER_FUZZY_THRESHOLD', 0.3)
+    scored = []
+    for customer_id, name_key in Customer.objects.filter(id__in=list(candidates)).values_list('id', 'name_key'):
+        score = word_similarity(key, name_key)
+        if score >= threshold:
+            scored.append((-score, -customer_id))
+    scored.sort()
+    end = None if limit is None else offset + limit
+    return [-customer_id for _, customer_id in scored[offset:end]]
@@ -1,4 +1,6 @@
 from rest_framework import serializers
+
+from dorji360.fastpath import format_datetime
 from .models import Customer
 
 
@@ -10,3 +12,31 @@ class CustomerSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'phone', 'gender', 'address', 'notes', 'created_at']
         read_only_fields = ['id', 'created_at']
 
+
+CUSTOMER_LIST_COLUMNS = ('id', 'name', 'phone', 'gender', 'address', 'notes', 'created_at')
+
+
+def customer_rows(rows):
+    """Fast-path equivalent of CustomerSerializer(many=True) for CUSTOMER_LIST_COLUMNS rows"""
+    return [
+        {
+            'id': row['id'],
+            'name': row['name'],
+            'phone': row['phone'],
+            'gender': row['gender'],
+            'address': row['address'],
+            'notes': row['notes'],
+            'created_at': format_datetime(row['created_at']),
+        }
+        for row in rows
+    ]
+
+
+class CustomerMergeSerializer(serializers.Serializer):
+    target = serializers.IntegerField()
+    duplicates = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, max_length=100)
+
+    def validate(self, attrs):
+        if attrs['target'] in attrs['duplicates']:
+            raise serializers.ValidationError({'duplicates': ["Must not contain the target customer."]})
+        return attrs
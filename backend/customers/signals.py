@@ -0,0 +1,32 @@
+"""
+Keep the in-process customer suggest index and the name trigrams current
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Customer
+from .search import index_name_trigrams
+from .suggest import suggestions
+
+
+@receiver(post_save, sender=Customer)
+def update_suggest_index(sender, instance, raw=False, **kwargs):
+    if not raw:
+        # Shared by every request in the process: only committed customers go in
+        transaction.on_commit(lambda: suggestions.customer_saved(instance))
+
+
+@receiver(post_save, sender=Customer)
+def update_name_trigrams(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and 'name' not in update_fields):
+        return
+    if not getattr(instance, '_name_key_changed', True):
+        return  # same key, same trigrams
+    index_name_trigrams(instance)
+
+
+@receiver(post_delete, sender=Customer)
+def remove_from_suggest_index(sender, instance, **kwargs):
+    customer_id = instance.pk  # delete() clears the pk before commit
+    transaction.on_commit(lambda: suggestions.customer_deleted(customer_id))
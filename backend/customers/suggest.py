@@ -0,0 +1,160 @@
+"""
+Process-local prefix index for the customer picker (GET /api/customers/suggest/)
+"""
+import bisect
+import threading
+import time
+import unicodedata
+
+from django.conf import settings
+
+from dorji360.phone import default_country_code, digits_only, to_e164
+from .models import Customer
+
+
+def name_keys(name):
+    """Every word of the name, case-folded, so 'ud' finds 'Rahim Uddin'"""
+    return sorted(set(unicodedata.normalize('NFC', name or '').casefold().split()))
+
+
+def phone_keys(phone):
+    """Digits as typed, plus the national number without trunk prefix ('1712...' for +8801712...)"""
+    keys = {digits_only(phone)}
+    e164 = to_e164(phone)
+    country_code = default_country_code()
+    if e164 and e164[1:].startswith(country_code):
+        keys.add(e164[1 + len(country_code):])
+    return sorted(key for key in keys if key)
+
+
+def phone_query_keys(digits):
+    keys = {digits, digits.lstrip('0')}
+    country_code = default_country_code()
+    if digits.startswith(country_code) and len(digits) > len(country_code):
+        keys.add(digits[len(country_code):])
+    return [key for key in keys if key]
+
+
+class SuggestIndex:
+    """
+    Sorted (key, customer_id) arrays searched with bisect: one for name words, one for phone digits.
+
+    Built on first use; post_save/post_delete (customers/signals.py) insert and remove
+    single entries. Other processes see changes after CUSTOMER_SUGGEST_TTL seconds.
+    """
+
+    def __init__(self, rows=()):
+        self.lock = threading.Lock()
+        self.loaded_at = time.monotonic()
+        self.customers = {}
+        self.names = []
+        self.phones = []
+        for customer_id, name, phone in rows:
+            self.customers[customer_id] = (name, phone)
+            self.names.extend((key, customer_id) for key in name_keys(name))
+            self.phones.extend((key, customer_id) for key in phone_keys(phone))
+        self.names.sort()
+        self.phones.sort()
+
+    @property
+    def size(self):
+        return len(self.customers)
+
+    def upsert(self, customer_id, name, phone):
+        with self.lock:
+            self._remove(customer_id)
+            self.customers[customer_id] = (name, phone)
+            for key in name_keys(name):
+                bisect.insort(self.names, (key, customer_id))
+            for key in phone_keys(phone):
+                bisect.insort(self.phones, (key, customer_id))
+
+    def remove(self, customer_id):
+        with self.lock:
+            self._remove(customer_id)
+
+    def _remove(self, customer_id):
+        previous = self.customers.pop(customer_id, None)
+        if previous is None:
+            return
+        name, phone = previous
+        for entries, keys in ((self.names, name_keys(name)), (self.phones, phone_keys(phone))):
+            for key in keys:
+                position = bisect.bisect_left(entries, (key, customer_id))
+                if position < len(entries) and entries[position] == (key, customer_id):
+                    del entries[position]
+
+    @staticmethod
+    def _prefix_range(entries, prefix):
+        # '\U0010ffff' sorts after every character a key can continue with
+        return bisect.bisect_left(entries, (prefix,)), bisect.bisect_left(entries, (prefix + '\U0010ffff',))
+
+    def suggest(self, query, limit=10):
+        """[(id, name, phone)]: phone-digit prefix for numeric queries, else every word a name-word prefix"""
+        query = unicodedata.normalize('NFC', query).casefold().strip()
+        digits = digits_only(query)
+        with self.lock:
+            if digits and not any(char.isalpha() for char in query):
+                ranges = [(self.phones, key) for key in phone_query_keys(digits)]
+                rest = []
+            else:
+                words = query.split()
+                if not words:
+                    return []
+                # Scan the rarest-looking (longest) word; check the others against the name
+                words.sort(key=len, reverse=True)
+                ranges = [(self.names, words[0])]
+                rest = words[1:]
+            found = []
+            seen = set()
+            for entries, prefix in ranges:
+                start, end = self._prefix_range(entries, prefix)
+                for position in range(start, end):
+                    customer_id = entries[position][1]
+                    if customer_id in seen:
+                        continue
+                    seen.add(customer_id)
+                    name, phone = self.customers[customer_id]
+                    if rest:
+                        keys = name_keys(name)
+                        if not all(any(key.startswith(word) for key in keys) for word in rest):
+                            continue
+                    found.append((customer_id, name, phone))
+                    if len(found) >= limit:
+                        return found
+            return found
+
+
+class CustomerSuggestions:
+    def __init__(self):
+        self._index = None
+        self._lock = threading.Lock()
+
+    def index(self):
+        ttl = getattr(settings, 'CUSTOMER_SUGGEST_TTL', 300)
+        index = self._index
+        if index is None or time.monotonic() - index.loaded_at > ttl:
+            with self._lock:
+                index = self._index
+                if index is None or time.monotonic() - index.loaded_at > ttl:
+                    rows = Customer.objects.values_list('id', 'name', 'phone').iterator(chunk_size=5000)
+                    index = SuggestIndex(rows)
+                    self._index = index
+        return index
+
+    def suggest(self, query, limit=10):
+        return self.index().suggest(query, limit)
+
+    def customer_saved(self, customer):
+        if self._index is not None:
+            self._index.upsert(customer.pk, customer.name, customer.phone)
+
+    def customer_deleted(self, customer_id):
+        if self._index is not None:
+            self._index.remove(customer_id)
+
+    def invalidate(self):
+        self._index = None
+
+
+suggestions = CustomerSuggestions()
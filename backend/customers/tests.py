@@ -1,3 +1,377 @@
+from datetime import date
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from dorji360.pagination import IdCursorPagination
+from dorji360.phone import to_e164
+from measurements.models import Measurement, MeasurementTemplate
+from orders.models import Order
+from payments.models import Payment
+from .duplicates import candidate_pairs, find_duplicates
+from .models import Customer
+from .phonetic import phonetic_key
+from .fts import fts_available
+from .suggest import suggestions
+from .serializers import CustomerSerializer
+
+
+class CustomerPaginationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        Customer.objects.bulk_create(
+            Customer(name=f'Customer {i}', phone=f'0171000{i:04d}') for i in range(7)
+        )
+
+    def test_cursor_pages_walk_the_table_newest_first(self):
+        seen = []
+        url, params = '/api/customers/', {'page_size': 3}
+        while url:
+            data = self.client.get(url, params).json()
+            self.assertLessEqual(len(data['results']), 3)
+            seen.extend(c['id'] for c in data['results'])
+            url, params = data['next'], None
+        self.assertEqual(seen, list(Customer.objects.order_by('-id').values_list('id', flat=True)))
+
+    def test_page_size_is_capped(self):
+        Customer.objects.bulk_create(
+            Customer(name=f'Extra {i}', phone=f'0181000{i:04d}') for i in range(IdCursorPagination.max_page_size)
+        )
+        data = self.client.get('/api/customers/', {'page_size': 10000}).json()
+        self.assertEqual(len(data['results']), IdCursorPagination.max_page_size)
+        self.assertIsNotNone(data['next'])
+
+    def test_all_returns_plain_list(self):
+        data = self.client.get('/api/customers/', {'all': '1'}).json()
+        self.assertIsInstance(data, list)
+        self.assertEqual(len(data), 7)
+
+
+class CustomerFastListTests(TestCase):
+    def test_fast_list_matches_serializer(self):
+        Customer.objects.create(name='রহিম', phone='01712345678', gender='male', address='Dhaka North')
+        Customer.objects.create(name='Salma', phone='01911111111', notes='VIP')
+
+        response = APIClient().get('/api/customers/', {'all': '1'})
+        expected = JSONRenderer().render(CustomerSerializer(Customer.objects.order_by('-id'), many=True).data)
+        self.assertEqual(response.content, expected)
+
+
+class CustomerSearchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.rahim = Customer.objects.create(name='Rahim Uddin', phone='01712345678', address='Mirpur, Dhaka')
+        self.karim = Customer.objects.create(name='Karim', phone='01898765432', notes='Friend of Rahim')
+        self.bangla = Customer.objects.create(name='রহিম উদ্দিন', phone='01911111111')
+
+    def search(self, text, **params):
+        return self.client.get('/api/customers/', {'search': text, **params}).json()
+
+    def test_fts_index_is_available(self):
+        self.assertTrue(fts_available())
+
+    def test_prefix_match_ranks_name_above_notes(self):
+        data = self.search('rah')
+        self.assertEqual([c['id'] for c in data['results']], [self.rahim.id, self.karim.id])
+
+    def test_every_word_must_match(self):
+        self.assertEqual([c['id'] for c in self.search('rahim mirp')['results']], [self.rahim.id])
+
+    def test_bangla_prefix(self):
+        self.assertEqual([c['id'] for c in self.search('রহি', all='1')], [self.bangla.id])
+
+    def test_triggers_keep_index_in_sync(self):
+        self.rahim.name = 'Abdul Rahman'
+        self.rahim.save()
+        self.assertEqual([c['id'] for c in self.search('abdul')['results']], [self.rahim.id])
+        self.assertEqual([c['id'] for c in self.search('rahim')['results']], [self.karim.id])
+        self.karim.delete()
+        self.assertEqual(self.search('rahim')['results'], [])
+
+    def test_digits_match_phone_prefix_and_id(self):
+        self.assertEqual([c['id'] for c in self.search('01712')['results']], [self.rahim.id])
+        self.assertEqual(self.search(str(self.karim.id))['results'][0]['id'], self.karim.id)
+
+    def test_digits_match_inside_phone_numbers(self):
+        self.assertEqual([c['id'] for c in self.search('2345')['results']], [self.rahim.id])
+        self.assertEqual([c['id'] for c in self.search('1111', all='1')], [self.bangla.id])
+
+    def test_like_fallback(self):
+        with patch('customers.views.fts_available', return_value=False):
+            data = self.search('ddin', all='1')
+        self.assertEqual([c['id'] for c in data], [self.rahim.id])
+
+    def test_non_digit_search_filters(self):
+        with patch('customers.views.fts_available', return_value=False):
+            self.assertEqual(self.search('nobody', all='1'), [])
+        self.assertEqual(self.search('nobody', all='1'), [])
+
+
+class CustomerPhoneTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.rahim = Customer.objects.create(name='Rahim', phone='01712-345678')
+        self.karim = Customer.objects.create(name='Karim', phone='+880 1898 765432')
+
+    def test_phone_normalized_on_save(self):
+        self.assertEqual(self.rahim.phone_e164, '+8801712345678')
+        self.rahim.phone = '1712000000'
+        self.rahim.save(update_fields=['phone'])
+        self.rahim.refresh_from_db()
+        self.assertEqual(self.rahim.phone_e164, '+8801712000000')
+        self.assertEqual(self.rahim.phone_reversed, '0000002171088')
+
+    def test_normalization(self):
+        for raw in ('+8801712345678', '01712-345678', '1712345678', '008801712345678', '8801712345678'):
+            self.assertEqual(to_e164(raw), '+8801712345678', raw)
+        self.assertIsNone(to_e164('123'))
+        self.assertEqual(to_e164('+44 20 7946 0958'), '+442079460958')
+
+    def test_exact_lookup_in_any_format(self):
+        for number in ('+8801712345678', '01712345678', '1712-345678'):
+            data = self.client.get(f'/api/customers/by-phone/{number}/').json()
+            self.assertEqual(data['match'], 'exact')
+            self.assertEqual([c['id'] for c in data['results']], [self.rahim.id])
+
+    def test_suffix_lookup(self):
+        data = self.client.get('/api/customers/by-phone/765432/').json()
+        self.assertEqual(data['match'], 'suffix')
+        self.assertEqual([c['id'] for c in data['results']], [self.karim.id])
+        self.assertEqual(self.client.get('/api/customers/by-phone/99999/').json()['results'], [])
+
+    def test_too_few_digits(self):
+        self.assertEqual(self.client.get('/api/customers/by-phone/12/').status_code, 400)
+
+    def test_backfill_command(self):
+        Customer.objects.update(phone_e164=None, phone_reversed=None)
+        Customer.objects.bulk_create([Customer(name='Legacy', phone='n/a')])
+        out = StringIO()
+        call_command('backfill_phone_numbers', stdout=out)
+        self.assertEqual(
+            dict(Customer.objects.values_list('name', 'phone_e164')),
+            {'Rahim': '+8801712345678', 'Karim': '+8801898765432', 'Legacy': None},
+        )
+        self.assertIn('customers: updated 2 row(s); 1 phone number(s) could not be normalized', out.getvalue())
+
+    def test_backfill_fixes_values_left_stale_by_update(self):
+        Customer.objects.filter(pk=self.karim.pk).update(phone='01555000111')
+        call_command('backfill_phone_numbers', missing_only=True, stdout=StringIO())
+        self.assertEqual(Customer.objects.get(pk=self.karim.pk).phone_e164, '+8801898765432')
+        call_command('backfill_phone_numbers', stdout=StringIO())
+        self.karim.refresh_from_db()
+        self.assertEqual((self.karim.phone_e164, self.karim.phone_reversed), ('+8801555000111', '1110005551088'))
+
+
+class CustomerSuggestTests(TestCase):
+    def setUp(self):
+        suggestions.invalidate()
+        self.client = APIClient()
+        self.rahim = Customer.objects.create(name='Rahim Uddin', phone='01712-345678')
+        self.rahima = Customer.objects.create(name='Rahima Begum', phone='+8801898765432')
+        self.bangla = Customer.objects.create(name='রহিম উদ্দিন', phone='01911111111')
+
+    def suggest(self, q, **params):
+        return self.client.get('/api/customers/suggest/', {'q': q, **params}).json()
+
+    def test_name_word_prefix(self):
+        self.assertEqual([c['id'] for c in self.suggest('rah')], [self.rahim.id, self.rahima.id])
+        self.assertEqual([c['id'] for c in self.suggest('UDD')], [self.rahim.id])
+        self.assertEqual([c['id'] for c in self.suggest('begum rahi')], [self.rahima.id])
+        self.assertEqual([c['id'] for c in self.suggest('রহি')], [self.bangla.id])
+        self.assertEqual(self.suggest('rah', limit=1), [
+            {'id': self.rahim.id, 'name': 'Rahim Uddin', 'phone': '01712-345678'}
+        ])
+
+    def test_phone_prefix_in_any_format(self):
+        for q in ('0171', '1712', '+880171', '8801712'):
+            self.assertEqual([c['id'] for c in self.suggest(q)], [self.rahim.id], q)
+        self.assertEqual([c['id'] for c in self.suggest('01898')], [self.rahima.id])
+
+    def test_index_follows_saves_and_deletes(self):
+        self.suggest('rah')  # build the index
+        with self.captureOnCommitCallbacks(execute=True):
+            self.rahim.name = 'Karim Uddin'
+            self.rahim.save()
+            Customer.objects.create(name='Rahman', phone='01500000000')
+            self.rahima.delete()
+        self.assertEqual([c['name'] for c in self.suggest('rah')], ['Rahman'])
+        self.assertEqual([c['name'] for c in self.suggest('kar')], ['Karim Uddin'])
+
+    def test_empty_query_and_bad_limit(self):
+        self.assertEqual(self.suggest(''), [])
+        response = self.client.get('/api/customers/suggest/', {'q': 'r', 'limit': 500})
+        self.assertEqual(response.status_code, 400)
+
+
+class CustomerFuzzySearchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.bangla = Customer.objects.create(name='রহিম উদ্দিন', phone='01911111111')
+        self.latin = Customer.objects.create(name='Mohammad Rahman', phone='01712345678')
+        self.other = Customer.objects.create(name='Salma Begum', phone='01898765432')
+
+    def fuzzy(self, text):
+        return [c['id'] for c in self.client.get('/api/customers/', {'search': text, 'mode': 'fuzzy'}).json()['results']]
+
+    def test_phonetic_keys_match_across_scripts(self):
+        for bangla, latin in [('রহিম', 'Rahim'), ('মোহাম্মদ', 'Muhammad'), ('চৌধুরী', 'Chowdhury'),
+                              ('খাতুন', 'Khatun'), ('ইয়াসিন', 'Yasin'), ('আনোয়ার', 'Anwar')]:
+            self.assertEqual(phonetic_key(bangla), phonetic_key(latin), latin)
+        self.assertEqual(self.bangla.name_key, 'rhm adn')
+
+    def test_romanized_query_finds_bangla_name(self):
+        self.assertEqual(self.fuzzy('Rahim'), [self.bangla.id, self.latin.id])
+        self.assertEqual(self.fuzzy('Rahim Uddin'), [self.bangla.id])
+
+    def test_tolerates_spelling_variants(self):
+        self.assertEqual(self.fuzzy('Muhammed Rahmaan'), [self.latin.id])
+        self.assertEqual(self.fuzzy('বেগম'), [self.other.id])
+        self.assertEqual(self.fuzzy('zzz'), [])
+
+    def test_rename_reindexes(self):
+        self.other.name = 'Salma Akter'
+        self.other.save(update_fields=['name'])
+        self.assertEqual(self.fuzzy('Begum'), [])
+        self.assertEqual(self.fuzzy('আক্তার'), [self.other.id])
+
+    def test_save_without_name_change_keeps_trigrams(self):
+        customer = Customer.objects.get(pk=self.other.pk)
+        customer.address = 'Mirpur'
+        with CaptureQueriesContext(connection) as ctx:
+            customer.save()
+        self.assertFalse([q for q in ctx.captured_queries if 'customer_name_trigrams' in q['sql']])
+        self.assertEqual(self.fuzzy('Begum'), [self.other.id])
+
+    def test_backfill_command_reindexes_names_written_without_save(self):
+        Customer.objects.filter(pk=self.other.pk).update(name='Salma Akter')
+        Customer.objects.bulk_create([Customer(name='Rahima Khatun', phone='01555000111')])
+        out = StringIO()
+        call_command('backfill_name_keys', stdout=out)
+        self.assertIn('customers: updated 2 name key(s)', out.getvalue())
+        self.assertEqual(self.fuzzy('Begum'), [])
+        self.assertEqual(self.fuzzy('আক্তার'), [self.other.id])
+        self.assertEqual(len(self.fuzzy('খাতুন')), 1)
+
+    def test_unknown_mode(self):
+        response = self.client.get('/api/customers/', {'search': 'x', 'mode': 'soundex'})
+        self.assertEqual(response.status_code, 400)
+
+
+class CustomerDuplicateTests(TestCase):
+    def setUp(self):
+        suggestions.invalidate()
+        self.client = APIClient()
+        self.rahim = Customer.objects.create(name='Rahim Uddin', phone='01712-345678', gender='male')
+        self.rahim_bn = Customer.objects.create(name='রহিম উদ্দিন', phone='+8801712345678', address='Mirpur')
+        self.rahim_typo = Customer.objects.create(name='rahim uddin', phone='1712345678')
+        # Same phone, different person (family members share numbers)
+        self.salma = Customer.objects.create(name='Salma Begum', phone='01712345678')
+        self.other = Customer.objects.create(name='Karim', phone='01898765432')
+
+    def test_pairs_blocked_by_phone_and_name(self):
+        pairs = {(keep, duplicate): score for score, keep, duplicate in find_duplicates()}
+        self.assertEqual(set(pairs), {
+            (self.rahim.id, self.rahim_bn.id),
+            (self.rahim.id, self.rahim_typo.id),
+            (self.rahim_bn.id, self.rahim_typo.id),
+        })
+        self.assertEqual(pairs[self.rahim.id, self.rahim_typo.id], 1.0)
+        loose = {(keep, duplicate) for _, keep, duplicate in find_duplicates(min_score=0.3)}
+        self.assertIn((self.rahim.id, self.salma.id), loose)
+        self.assertEqual(candidate_pairs([{'id': i, 'phone_e164': '+880', 'name_key': None} for i in range(100)]), set())
+
+    def test_same_name_with_different_phones_at_default_score(self):
+        latin = Customer.objects.create(name='Mohammad Rahman', phone='01911111111')
+        bangla = Customer.objects.create(name='মোহাম্মদ রহমান', phone='01522222222')
+        same = Customer.objects.create(name='Mohammad Rahman', phone='01633333333')
+        pairs = {(keep, duplicate): score for score, keep, duplicate in find_duplicates()}
+        self.assertIn((latin.id, bangla.id), pairs)
+        self.assertEqual(pairs[latin.id, same.id], 0.7)
+        self.assertNotIn((self.rahim.id, self.salma.id), pairs)
+
+    def test_duplicates_endpoint(self):
+        data = self.client.get('/api/customers/duplicates/', {'limit': 1}).json()
+        self.assertEqual(len(data), 1)
+        self.assertEqual((data[0]['keep']['id'], data[0]['duplicate']['id']), (self.rahim.id, self.rahim_typo.id))
+
+    def test_merge_repoints_measurements_orders_and_payments(self):
+        template = MeasurementTemplate.objects.create(
+            garment_type='shirt', gender='male', display_name='Shirt (Male)', fields_json={'chest': 'Chest'}
+        )
+        measurement = Measurement.objects.create(
+            customer=self.rahim_bn, garment_type='shirt', template=template, measurements_json={'chest': 38}
+        )
+        order = Order.objects.create(customer=self.rahim_typo, delivery_date=date(2025, 12, 1), total_amount=500)
+        Payment.objects.create(order=order, amount=200, payment_type='advance', payment_method='cash')
+
+        response = self.client.post(
+            '/api/customers/merge/', {'target': self.rahim.id, 'duplicates': [self.rahim_bn.id, self.rahim_typo.id]},
+            format='json',
+        )
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['moved'], {'measurements': 1, 'orders': 1, 'payments': 1})
+        self.assertEqual(data['customer']['address'], 'Mirpur')
+        measurement.refresh_from_db()
+        order.refresh_from_db()
+        self.assertEqual((measurement.customer_id, order.customer_id), (self.rahim.id, self.rahim.id))
+        self.assertFalse(Customer.objects.filter(id__in=[self.rahim_bn.id, self.rahim_typo.id]).exists())
+        self.assertEqual(Payment.objects.get().order.customer_id, self.rahim.id)
+
+    def test_merge_is_all_or_nothing(self):
+        response = self.client.post(
+            '/api/customers/merge/', {'target': self.rahim.id, 'duplicates': [self.rahim_bn.id, 999999]}, format='json'
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertTrue(Customer.objects.filter(id=self.rahim_bn.id).exists())
+        response = self.client.post(
+            '/api/customers/merge/', {'target': self.rahim.id, 'duplicates': [self.rahim.id]}, format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_command(self):
+        out = StringIO()
+        call_command('find_duplicate_customers', stdout=out)
+        self.assertIn('3 likely duplicate pair(s) among 5 customers', out.getvalue())
+
+
+class CustomerRankedPagingTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        for i in range(5):
+            Customer.objects.create(name=f'Rahim {i}', phone=f'0171000{i:04d}')
+            Customer.objects.create(name=f'রহিম {i}', phone=f'0181000{i:04d}')
+        self.exact = Customer.objects.create(name='Walk-in', phone='01900000000')
+
+    def walk(self, params):
+        seen, url = [], '/api/customers/'
+        while url:
+            data = self.client.get(url, params).json()
+            self.assertLessEqual(len(data['results']), 2)
+            seen.extend(c['id'] for c in data['results'])
+            url, params = data['next'], None
+        return seen
+
+    def test_prefix_pages_reach_every_match(self):
+        seen = self.walk({'search': 'rahim', 'page_size': 2})
+        self.assertEqual(seen, [c['id'] for c in self.client.get('/api/customers/', {'search': 'rahim', 'all': '1'}).json()])
+        self.assertEqual(len(seen), 5)
+        second = self.client.get('/api/customers/', {'search': 'rahim', 'page_size': 2, 'offset': 2}).json()
+        self.assertIsNotNone(second['previous'])
+
+    def test_exact_id_match_is_not_repeated(self):
+        Customer.objects.create(name=f'Mr {self.exact.id}', phone='01500000000')
+        seen = self.walk({'search': str(self.exact.id), 'page_size': 2})
+        self.assertEqual(seen[0], self.exact.id)
+        self.assertEqual(len(seen), len(set(seen)))
 
-# Create your tests here.
+    def test_fuzzy_pages_reach_every_match(self):
+        seen = self.walk({'search': 'Rahim', 'mode': 'fuzzy', 'page_size': 2})
+        self.assertEqual(len(seen), 10)
+        self.assertEqual(len(set(seen)), 10)
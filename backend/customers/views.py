@@ -1,27 +1,182 @@
-from rest_framework import viewsets
+from django.conf import settings
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 from django.db.models import Q
+from django.db.models.expressions import RawSQL
 
+from dorji360.fastpath import FastListMixin
+from dorji360.phone import digits_only, to_e164
+from .duplicates import find_duplicates, merge_customers
 from .models import Customer
-from .serializers import CustomerSerializer
+from .fts import FTS_TABLE, fts_available, fts_query
+from .search import fuzzy_customer_ids, like_filter, phone_digit_ids, ranked_customer_ids
+from .suggest import suggestions
+from .serializers import CustomerMergeSerializer, CustomerSerializer, CUSTOMER_LIST_COLUMNS, customer_rows
 
 
-class CustomerViewSet(viewsets.ModelViewSet):
+# Most rows GET /api/customers/by-phone/{number} returns
+BY_PHONE_LIMIT = 20
+MAX_SUGGESTIONS = 50
+# ?mode= of the list search: FTS prefix words (LIKE without FTS5), or phonetic fuzzy names
+SEARCH_MODES = ('prefix', 'fuzzy')
+# Ranked searches page by position in the ranking rather than by id cursor
+RANK_OFFSET_PARAM = 'offset'
+
+
+class CustomerViewSet(FastListMixin, viewsets.ModelViewSet):
     queryset = Customer.objects.all()
     serializer_class = CustomerSerializer
 
+    def get_search(self):
+        return self.request.query_params.get('search', '').strip()
+
     def get_queryset(self):
         queryset = Customer.objects.all()
-        search = self.request.query_params.get('search', None)
+        search = self.get_search()
         if search:
-            queryset = queryset.filter(
-                Q(name__icontains=search) |
-                Q(phone__icontains=search) |
-                Q(id=search) if search.isdigit() else Q()
-            )
+            if fts_available():
+                expression = fts_query(search) or '""'
+                matches = RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [expression])
+                condition = Q(id__in=matches)
+                if search.isdigit():
+                    condition |= Q(id=search) | Q(phone__contains=search)
+                queryset = queryset.filter(condition)
+            else:
+                queryset = queryset.filter(like_filter(search))
         return queryset.order_by('-id')
 
     def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        serializer = self.get_serializer(queryset, many=True)
-        return Response(serializer.data)
+        search = self.get_search()
+        mode = request.query_params.get('mode', 'prefix')
+        if mode not in SEARCH_MODES:
+            raise ValidationError({'mode': [f"Choose one of: {', '.join(SEARCH_MODES)}."]})
+        if search and mode == 'fuzzy':
+            return self.ranked_response(lambda limit, offset: fuzzy_customer_ids(search, limit, offset))
+        if search and fts_available():
+            return self.ranked_response(lambda limit, offset: self.prefix_match_ids(search, limit, offset))
+        return super().list(request, *args, **kwargs)
+
+    def prefix_match_ids(self, search, limit, offset):
+        """
+        FTS matches by bm25 rank. Numeric searches put an exact id match first and end with
+        the other customers whose phone contains the digits, as the LIKE search did.
+        """
+        if not search.isdigit():
+            return ranked_customer_ids(search, limit, offset)
+        end = None if limit is None else offset + limit
+        ids = [int(search)] if Customer.objects.filter(id=search).exists() else []
+        ids += ranked_customer_ids(search, end)
+        ids += phone_digit_ids(search, end)
+        return list(dict.fromkeys(ids))[offset:end]
+
+    def ranked_response(self, find_ids):
+        """
+        Best matches first instead of newest first. Everything with ?all=1; otherwise pages
+        addressed by ?offset=, with next/previous links like the cursor-paginated list.
+        """
+        request = self.request
+        if request.query_params.get(self.paginator.all_query_param) in ('1', 'true'):
+            return Response(self.ranked_rows(find_ids(None, 0)))
+        try:
+            offset = max(int(request.query_params.get(RANK_OFFSET_PARAM, 0)), 0)
+        except ValueError:
+            raise ValidationError({RANK_OFFSET_PARAM: ["A whole number is required."]})
+        page_size = self.paginator.get_page_size(request)
+        ids = find_ids(page_size + 1, offset)  # one extra row tells whether there is a next page
+        url = request.build_absolute_uri()
+        next_url = previous_url = None
+        if len(ids) > page_size:
+            next_url = replace_query_param(url, RANK_OFFSET_PARAM, offset + page_size)
+        if offset > 0:
+            previous_offset = max(offset - page_size, 0)
+            previous_url = (
+                replace_query_param(url, RANK_OFFSET_PARAM, previous_offset) if previous_offset
+                else remove_query_param(url, RANK_OFFSET_PARAM)
+            )
+        return Response({'next': next_url, 'previous': previous_url, 'results': self.ranked_rows(ids[:page_size])})
+
+    def ranked_rows(self, ids):
+        by_id = {row['id']: row for row in self.get_list_values(Customer.objects.filter(id__in=ids))}
+        return self.build_list_rows(by_id[customer_id] for customer_id in ids if customer_id in by_id)
+
+    @action(detail=False, methods=['get'], url_path=r'by-phone/(?P<number>[^/]+)')
+    def by_phone(self, request, number=None):
+        """
+        Customers with this phone number, however it is written; failing that, customers
+        whose number ends with the given digits. Both are single index lookups.
+        """
+        digits = digits_only(number)
+        min_digits = getattr(settings, 'PHONE_MIN_SUFFIX_DIGITS', 4)
+        if len(digits) < min_digits:
+            raise ValidationError({'number': [f"Enter at least {min_digits} digits."]})
+
+        match = 'exact'
+        e164 = to_e164(number)
+        queryset = Customer.objects.filter(phone_e164=e164) if e164 else Customer.objects.none()
+        rows = list(self.get_list_values(queryset.order_by('-id')[:BY_PHONE_LIMIT]))
+        if not rows:
+            # Suffix of the number == prefix of the reversed digits; ':' sorts right after '9'
+            match = 'suffix'
+            key = digits[::-1]
+            queryset = Customer.objects.filter(phone_reversed__gte=key, phone_reversed__lt=key + ':')
+            rows = list(self.get_list_values(queryset.order_by('-id')[:BY_PHONE_LIMIT]))
+        return Response({'match': match, 'results': self.build_list_rows(rows)})
+
+    @action(detail=False, methods=['get'])
+    def suggest(self, request):
+        """GET /api/customers/suggest/?q=rah&limit=10 - picker suggestions from the in-memory index"""
+        try:
+            limit = int(request.query_params.get('limit', 10))
+        except ValueError:
+            raise ValidationError({'limit': ["A whole number is required."]})
+        if not 1 <= limit <= MAX_SUGGESTIONS:
+            raise ValidationError({'limit': [f"Choose between 1 and {MAX_SUGGESTIONS}."]})
+        query = request.query_params.get('q', '')
+        return Response([
+            {'id': customer_id, 'name': name, 'phone': phone}
+            for customer_id, name, phone in suggestions.suggest(query, limit)
+        ])
+
+    @action(detail=False, methods=['get'])
+    def duplicates(self, request):
+        """GET /api/customers/duplicates/?min_score=0.7&limit=50 - likely duplicate pairs, best first"""
+        min_score = request.query_params.get('min_score')
+        try:
+            min_score = float(min_score) if min_score is not None else None
+        except ValueError:
+            raise ValidationError({'min_score': ["A number is required."]})
+        try:
+            limit = int(request.query_params.get('limit', 50))
+        except ValueError:
+            raise ValidationError({'limit': ["A whole number is required."]})
+        pairs = find_duplicates(min_score)[:max(limit, 1)]
+        ids = {customer_id for _, keep, duplicate in pairs for customer_id in (keep, duplicate)}
+        rows = {row['id']: row for row in self.build_list_rows(self.get_list_values(Customer.objects.filter(id__in=ids)))}
+        return Response([
+            {'score': score, 'keep': rows[keep], 'duplicate': rows[duplicate]}
+            for score, keep, duplicate in pairs
+        ])
+
+    @action(detail=False, methods=['post'])
+    def merge(self, request):
+        """POST /api/customers/merge/ {"target": id, "duplicates": [ids]} - fold duplicates into target"""
+        serializer = CustomerMergeSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            target, moved = merge_customers(serializer.validated_data['target'], serializer.validated_data['duplicates'])
+        except Customer.DoesNotExist as error:
+            return Response({'detail': str(error) or "Customer not found."}, status=status.HTTP_404_NOT_FOUND)
+        return Response({
+            'customer': CustomerSerializer(target).data,
+            'merged': sorted(set(serializer.validated_data['duplicates'])),
+            'moved': moved,
+        })
+
+    def get_list_values(self, queryset):
+        return queryset.values(*CUSTOMER_LIST_COLUMNS)
+
+    def build_list_rows(self, rows):
+        return customer_rows(rows)
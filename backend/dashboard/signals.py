@@ -0,0 +1,21 @@
+"""
+Drop the cached dashboard summary whenever the underlying rows change
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from customers.models import Customer
+from orders.models import Order
+from orders.signals import order_status_changed
+from payments.models import Payment
+from .summary import invalidate_summary
+
+
+@receiver(order_status_changed, sender=Order)
+@receiver([post_save, post_delete], sender=Order)
+@receiver([post_save, post_delete], sender=Payment)
+@receiver([post_save, post_delete], sender=Customer)
+def invalidate_dashboard_summary(sender, **kwargs):
+    # After commit: dropping it earlier lets a concurrent request re-cache pre-commit totals
+    transaction.on_commit(invalidate_summary)
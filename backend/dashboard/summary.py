@@ -0,0 +1,83 @@
+"""
+Dashboard rollups computed with a handful of grouped queries and cached briefly
+"""
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from customers.models import Customer
+from orders.models import Order
+from payments.models import Payment
+
+CACHE_KEY = 'dashboard:summary'
+CACHE_TTL = 60  # seconds
+UPCOMING_DAYS = 7
+LIST_LIMIT = 5
+
+
+def build_summary():
+    today = timezone.localdate()
+
+    status_counts = {code: 0 for code, _ in Order.STATUS_CHOICES}
+    total_orders = 0
+    outstanding = 0
+    for row in Order.objects.order_by().values('status').annotate(count=Count('id'), balance=Sum('balance_due')):
+        status_counts[row['status']] = row['count']
+        total_orders += row['count']
+        outstanding += row['balance'] or 0
+
+    revenue = Payment.objects.aggregate(total=Sum('amount'))['total'] or 0
+
+    upcoming = (
+        Order.objects.filter(delivery_date__range=(today, today + timedelta(days=UPCOMING_DAYS)))
+        .exclude(status='delivered')
+        .order_by('delivery_date', 'id')
+        .values('id', 'customer__name', 'status', 'delivery_date')[:LIST_LIMIT]
+    )
+    recent_orders = (
+        Order.objects.order_by('-order_date', '-id')
+        .values('id', 'customer__name', 'status', 'order_date', 'total_amount')[:LIST_LIMIT]
+    )
+    recent_customers = Customer.objects.order_by('-id').values('id', 'name', 'phone')[:LIST_LIMIT]
+
+    return {
+        'total_customers': Customer.objects.count(),
+        'total_orders': total_orders,
+        'total_revenue': float(revenue),
+        'outstanding_amount': float(outstanding),
+        'status_counts': status_counts,
+        'upcoming_deliveries': [
+            {
+                'id': o['id'],
+                'customer_name': o['customer__name'],
+                'status': o['status'],
+                'delivery_date': o['delivery_date'].isoformat(),
+            }
+            for o in upcoming
+        ],
+        'recent_orders': [
+            {
+                'id': o['id'],
+                'customer_name': o['customer__name'],
+                'status': o['status'],
+                'order_date': o['order_date'].isoformat(),
+                'total_amount': float(o['total_amount']),
+            }
+            for o in recent_orders
+        ],
+        'recent_customers': list(recent_customers),
+    }
+
+
+def get_summary():
+    summary = cache.get(CACHE_KEY)
+    if summary is None:
+        summary = build_summary()
+        cache.set(CACHE_KEY, summary, CACHE_TTL)
+    return summary
+
+
+def invalidate_summary():
+    cache.delete(CACHE_KEY)
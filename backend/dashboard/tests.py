@@ -0,0 +1,60 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from customers.models import Customer
+from orders.models import Order
+from payments.models import Payment
+
+
+class DashboardSummaryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.customer = Customer.objects.create(name='Rahim', phone='01712345678')
+        today = timezone.localdate()
+        self.soon = Order.objects.create(customer=self.customer, delivery_date=today + timedelta(days=2), total_amount=Decimal('1000.00'))
+        Order.objects.create(customer=self.customer, delivery_date=today + timedelta(days=30), total_amount=Decimal('500.00'), status='sewing')
+        Order.objects.create(customer=self.customer, delivery_date=today, total_amount=Decimal('200.00'), status='delivered')
+        Payment.objects.create(order=self.soon, amount=Decimal('400.00'), payment_type='advance', payment_method='cash')
+
+    def get_summary(self):
+        response = self.client.get('/api/dashboard/summary/')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_summary_values(self):
+        data = self.get_summary()
+        self.assertEqual(data['total_customers'], 1)
+        self.assertEqual(data['total_orders'], 3)
+        self.assertEqual(data['total_revenue'], 400.0)
+        self.assertEqual(data['outstanding_amount'], 1300.0)
+        self.assertEqual(data['status_counts'], {'pending': 1, 'cutting': 0, 'sewing': 1, 'ready': 0, 'delivered': 1})
+        self.assertEqual([o['id'] for o in data['upcoming_deliveries']], [self.soon.id])
+
+    def test_summary_is_cached_and_invalidated_on_payment(self):
+        self.get_summary()
+        with self.assertNumQueries(0):
+            self.get_summary()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Payment.objects.create(order=self.soon, amount=Decimal('100.00'), payment_type='partial', payment_method='bkash')
+        self.assertEqual(self.get_summary()['total_revenue'], 500.0)
+
+    def test_rolled_back_write_keeps_the_cache(self):
+        self.get_summary()
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    Payment.objects.create(order=self.soon, amount=Decimal('100.00'), payment_type='partial', payment_method='bkash')
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(callbacks, [])
+        with self.assertNumQueries(0):
+            self.get_summary()
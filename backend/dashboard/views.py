@@ -0,0 +1,11 @@
+from rest_framework import viewsets
+from rest_framework.response import Response
+
+from .summary import get_summary
+
+
+class DashboardViewSet(viewsets.ViewSet):
+    """Aggregated statistics for the landing page"""
+
+    def list(self, request):
+        return Response(get_summary())
@@ -0,0 +1,12 @@
+from django.apps import AppConfig
+
+
+class Dorji360Config(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'dorji360'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from .sqlite import apply_sqlite_pragmas
+
+        connection_created.connect(apply_sqlite_pragmas, dispatch_uid='dorji360.sqlite_pragmas')
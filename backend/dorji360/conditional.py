@@ -0,0 +1,69 @@
+"""
+Conditional GET (ETag / Last-Modified) for viewsets whose rows rarely change
+"""
+import hashlib
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+# Content-addressed files never change under the same URL
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# Cache, but ask the server (cheaply, via 304) before reusing
+REVALIDATE_CACHE_CONTROL = 'no-cache'
+
+
+class ConditionalGetMixin:
+    """
+    Answer list/retrieve with 304 Not Modified when the client's copy is current.
+
+    The validator is one aggregate over the filtered rows (MAX(updated_at), COUNT),
+    so a hit never loads or serializes the rows themselves. Lists send only the ETag:
+    a deleted row leaves MAX(updated_at) unchanged (only the count catches it), so
+    If-Modified-Since alone would wrongly answer 304 for a collection.
+    """
+
+    last_modified_field = 'updated_at'
+
+    def get_resource_state(self, queryset):
+        state = queryset.order_by().aggregate(last_modified=Max(self.last_modified_field), count=Count('pk'))
+        return state['last_modified'], state['count']
+
+    def make_etag(self, request, last_modified, count):
+        stamp = last_modified.isoformat() if last_modified else ''
+        key = f'{request.get_full_path()}|{request.accepted_renderer.format}|{count}|{stamp}'
+        return quote_etag(hashlib.md5(key.encode()).hexdigest())
+
+    def conditional_response(self, request, state, render, collection=False):
+        """state is (last_modified, count); render() builds the full response on a miss"""
+        last_modified, count = state
+        etag = self.make_etag(request, last_modified, count)
+        timestamp = int(last_modified.timestamp()) if last_modified and not collection else None
+        response = get_conditional_response(request._request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = render()
+            if response.status_code != 200:
+                return response
+        response['ETag'] = etag
+        if timestamp is not None:
+            response['Last-Modified'] = http_date(timestamp)
+        response['Cache-Control'] = REVALIDATE_CACHE_CONTROL
+        return response
+
+    def list(self, request, *args, **kwargs):
+        render = super().list
+        state = self.get_resource_state(self.filter_queryset(self.get_queryset()))
+        return self.conditional_response(request, state, lambda: render(request, *args, **kwargs), collection=True)
+
+    def retrieve(self, request, *args, **kwargs):
+        render = super().retrieve
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            queryset = self.filter_queryset(self.get_queryset()).filter(
+                **{self.lookup_field: kwargs[lookup_url_kwarg]}
+            )
+        except (TypeError, ValueError, DjangoValidationError):
+            return render(request, *args, **kwargs)  # malformed lookup: let get_object() 404
+        state = self.get_resource_state(queryset)
+        return self.conditional_response(request, state, lambda: render(request, *args, **kwargs))
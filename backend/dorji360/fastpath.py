@@ -0,0 +1,47 @@
+"""
+Fast list path: build response rows straight from .values() instead of serializers
+"""
+from django.utils import timezone
+from rest_framework.response import Response
+
+DATE_FORMAT = '%Y-%m-%d'
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def format_date(value):
+    """Same output as serializers.DateField(format=DATE_FORMAT)"""
+    return value.strftime(DATE_FORMAT) if value is not None else None
+
+
+def format_datetime(value):
+    """Same output as serializers.DateTimeField(format=DATETIME_FORMAT)"""
+    if value is None:
+        return None
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    return value.strftime(DATETIME_FORMAT)
+
+
+def decimal_to_float(value):
+    return float(value) if value is not None else None
+
+
+class FastListMixin:
+    """
+    list() that paginates a .values() queryset and builds rows in one pass.
+
+    Subclasses provide `get_list_values(queryset)` and `build_list_rows(rows)`;
+    the rows must be identical to what the regular list serializer produces.
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self.fast_list_response(self.filter_queryset(self.get_queryset()))
+
+    def fast_list_response(self, queryset):
+        """Paginated fast-path response for any queryset of this viewset's model"""
+        values = self.get_list_values(queryset.prefetch_related(None))
+        page = self.paginate_queryset(values)
+        rows = self.build_list_rows(page if page is not None else values)
+        if page is not None:
+            return self.get_paginated_response(rows)
+        return Response(rows)
@@ -0,0 +1,67 @@
+"""
+Fill the normalized phone columns (phone_e164, phone_reversed) of customers and staff.
+
+Model.save() keeps them current, but QuerySet.update() and bulk_create() do not, so by
+default every row is re-derived and only rows whose stored values differ are rewritten.
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from customers.models import Customer
+from dorji360.phone import reversed_digits, to_e164
+from staff.models import Staff
+
+
+def customer_values(phone):
+    e164 = to_e164(phone)
+    return {'phone_e164': e164, 'phone_reversed': reversed_digits(e164)}
+
+
+def staff_values(phone):
+    return {'phone_e164': to_e164(phone)}
+
+
+class Command(BaseCommand):
+    help = "Normalize customer and staff phone numbers into their indexed E.164 columns"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--missing-only',
+            action='store_true',
+            help="Only fill rows whose phone_e164 is empty, skipping the check for stale values",
+        )
+
+    def backfill(self, model, derive, missing_only, batch_size):
+        fields = list(derive(''))
+        rows = model.objects.order_by('id')
+        if missing_only:
+            rows = rows.filter(phone_e164__isnull=True)
+        updated = 0
+        last_id = 0
+        # Keyset batches, so no read cursor stays open while the rows are rewritten
+        while True:
+            batch = list(rows.filter(id__gt=last_id).values_list('id', 'phone', *fields)[:batch_size])
+            if not batch:
+                return updated
+            last_id = batch[-1][0]
+            changed = []
+            for row_id, phone, *stored in batch:
+                values = derive(phone)
+                if list(values.values()) != stored:
+                    changed.append(model(id=row_id, **values))
+            if changed:
+                updated += self.write(model, changed, fields)
+
+    def write(self, model, batch, fields):
+        with transaction.atomic():
+            model.objects.bulk_update(batch, fields)
+        return len(batch)
+
+    def handle(self, *args, **options):
+        for model, derive in ((Customer, customer_values), (Staff, staff_values)):
+            updated = self.backfill(model, derive, options['missing_only'], options['batch_size'])
+            unparsed = model.objects.filter(phone_e164__isnull=True).count()
+            self.stdout.write(self.style.SUCCESS(
+                f"{model._meta.db_table}: updated {updated} row(s); {unparsed} phone number(s) could not be normalized"
+            ))
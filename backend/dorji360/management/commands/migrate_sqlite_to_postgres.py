@@ -0,0 +1,160 @@
+"""
+Copy every table of the SQLite database into the configured (PostgreSQL) database
+"""
+import datetime
+import json
+import sqlite3
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import DEFAULT_DB_ALIAS, connections, models, transaction
+from django.utils import timezone
+
+
+def copyable_models():
+    """Concrete, managed models (including auto-created M2M tables) in app order"""
+    return [
+        model
+        for model in apps.get_models(include_auto_created=True)
+        if model._meta.managed and not model._meta.proxy
+    ]
+
+
+def source_converter(field):
+    """Turn a raw SQLite value into the Python value Django expects for the field"""
+    if isinstance(field, models.JSONField):
+        return lambda value: json.loads(value) if isinstance(value, (str, bytes)) else value
+    if isinstance(field, models.DateTimeField) and settings.USE_TZ:
+        # SQLite holds naive UTC timestamps
+        def to_aware(value):
+            value = field.to_python(value)
+            return timezone.make_aware(value, datetime.timezone.utc) if value and timezone.is_naive(value) else value
+        return to_aware
+    return field.to_python
+
+
+def stream_rows(source, table, columns, batch_size):
+    """Yield batches of rows from the source table without loading it into memory"""
+    cursor = source.execute(
+        'SELECT {} FROM "{}" ORDER BY rowid'.format(', '.join(f'"{c}"' for c in columns), table)
+    )
+    while True:
+        batch = cursor.fetchmany(batch_size)
+        if not batch:
+            break
+        yield batch
+
+
+def copy_batch(cursor, connection, table, columns, rows):
+    """COPY the rows in when the driver supports it (psycopg 3), otherwise a batched INSERT"""
+    quote = connection.ops.quote_name
+    column_sql = ', '.join(quote(c) for c in columns)
+    raw_cursor = getattr(cursor, 'cursor', cursor)
+    if connection.vendor == 'postgresql' and hasattr(raw_cursor, 'copy'):
+        with raw_cursor.copy(f'COPY {quote(table)} ({column_sql}) FROM STDIN') as copy:
+            for row in rows:
+                copy.write_row(row)
+        return
+    placeholders = ', '.join(['%s'] * len(columns))
+    cursor.executemany(f'INSERT INTO {quote(table)} ({column_sql}) VALUES ({placeholders})', rows)
+
+
+class Command(BaseCommand):
+    help = (
+        "One-shot copy of the SQLite database into the configured database (run `migrate` on the "
+        "target first). Tables are streamed in batches, target tables are emptied first and "
+        "sequences are reset afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--source',
+            default=str(settings.DB_PATH),
+            help="Path of the SQLite database to copy from (default: DB_PATH)",
+        )
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help="Target database alias (default: 'default')",
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help="Rows per batch; keep it small when rows carry base64 images",
+        )
+        parser.add_argument(
+            '--noinput', '--no-input',
+            action='store_false',
+            dest='interactive',
+            help="Do not prompt before emptying the target tables",
+        )
+
+    def handle(self, *args, **options):
+        source_path = Path(options['source'])
+        batch_size = options['batch_size']
+        connection = connections[options['database']]
+        if not source_path.is_file():
+            raise CommandError(f"SQLite database not found: {source_path}")
+        if batch_size < 1:
+            raise CommandError("--batch-size must be at least 1")
+        if connection.vendor == 'sqlite' and Path(str(connection.settings_dict['NAME'])).resolve() == source_path.resolve():
+            raise CommandError("The target database is the source file; set DORJI360_DB_ENGINE=postgres first")
+
+        source = sqlite3.connect(f'file:{source_path}?mode=ro', uri=True)
+        try:
+            source_tables = {
+                name for (name,) in source.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+            }
+            plan = []
+            for model in copyable_models():
+                table = model._meta.db_table
+                if table not in source_tables:
+                    self.stdout.write(self.style.WARNING(f"Skipping {table}: not in the source database"))
+                    continue
+                source_columns = {row[1] for row in source.execute(f'PRAGMA table_info("{table}")')}
+                fields = [f for f in model._meta.concrete_fields if f.column in source_columns]
+                missing = [f.column for f in model._meta.concrete_fields if f.column not in source_columns]
+                if missing:
+                    raise CommandError(
+                        f"{table} is missing columns {', '.join(missing)}; run `migrate` on the source first"
+                    )
+                plan.append((model, fields))
+
+            if options['interactive']:
+                answer = input(
+                    f"This empties {len(plan)} tables in database '{options['database']}' "
+                    f"({connection.settings_dict['NAME']}) and copies {source_path} into them.\n"
+                    "Type 'yes' to continue: "
+                )
+                if answer != 'yes':
+                    raise CommandError("Migration cancelled.")
+
+            with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+                tables = [model._meta.db_table for model, _ in plan]
+                for statement in connection.ops.sql_flush(no_style(), tables, reset_sequences=True, allow_cascade=True):
+                    cursor.execute(statement)
+                # Foreign keys are created DEFERRABLE INITIALLY DEFERRED, so table order does not matter
+                for model, fields in plan:
+                    table = model._meta.db_table
+                    columns = [f.column for f in fields]
+                    converters = [source_converter(f) for f in fields]
+                    copied = 0
+                    for batch in stream_rows(source, table, columns, batch_size):
+                        rows = [
+                            [f.get_db_prep_save(convert(value), connection) for f, convert, value in zip(fields, converters, row)]
+                            for row in batch
+                        ]
+                        copy_batch(cursor, connection, table, columns, rows)
+                        copied += len(rows)
+                    self.stdout.write(f"{table}: {copied} rows")
+
+                for statement in connection.ops.sequence_reset_sql(no_style(), [model for model, _ in plan]):
+                    cursor.execute(statement)
+        finally:
+            source.close()
+
+        self.stdout.write(self.style.SUCCESS(f"Copied {len(plan)} tables from {source_path}"))
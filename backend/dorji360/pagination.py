@@ -0,0 +1,22 @@
+"""
+Shared pagination for list endpoints
+"""
+from rest_framework.pagination import CursorPagination
+
+
+class IdCursorPagination(CursorPagination):
+    """
+    Keyset pagination on -id with an opaque cursor.
+
+    `?all=1` returns the full, unpaginated list for older clients.
+    """
+    ordering = '-id'
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    all_query_param = 'all'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if request.query_params.get(self.all_query_param) in ('1', 'true'):
+            return None
+        return super().paginate_queryset(queryset, request, view)
@@ -0,0 +1,50 @@
+"""
+Phone number normalization to E.164 (+<country code><number>)
+"""
+import re
+
+from django.conf import settings
+
+NON_DIGITS_RE = re.compile(r'\D')
+MAX_E164_DIGITS = 15
+MIN_NATIONAL_DIGITS = 6
+
+
+def default_country_code():
+    return str(getattr(settings, 'PHONE_DEFAULT_COUNTRY_CODE', '880'))
+
+
+def digits_only(value):
+    return NON_DIGITS_RE.sub('', value or '')
+
+
+def to_e164(value, country_code=None):
+    """
+    '+8801712345678', '01712-345678', '1712345678' and '008801712345678' all give
+    '+8801712345678'. Numbers without an international prefix are taken to be in
+    PHONE_DEFAULT_COUNTRY_CODE. Returns None when there are too few or too many digits.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    country_code = country_code or default_country_code()
+    digits = digits_only(value)
+    if value.startswith('+'):
+        international = digits
+    elif digits.startswith('00'):
+        international = digits[2:]
+    elif digits.startswith(country_code) and len(digits) - len(country_code) >= 10:
+        international = digits  # typed with the country code but without '+'
+    else:
+        national = digits.lstrip('0')  # trunk prefix
+        if len(national) < MIN_NATIONAL_DIGITS:
+            return None
+        international = country_code + national
+    if not MIN_NATIONAL_DIGITS < len(international) <= MAX_E164_DIGITS:
+        return None
+    return '+' + international
+
+
+def reversed_digits(e164):
+    """Key for suffix lookups: a suffix of the number is a prefix of this, so a B-tree range serves it"""
+    return e164[:0:-1] if e164 else None
@@ -10,13 +10,16 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
-# Database path - use existing SQLite database
-DB_PATH = BASE_DIR.parent / "database" / "tailor360.db"
+# Database path - use existing SQLite database (DORJI360_SQLITE_PATH overrides it)
+DB_PATH = Path(os.environ.get('DORJI360_SQLITE_PATH', BASE_DIR.parent / "database" / "tailor360.db"))
 DB_PATH.parent.mkdir(parents=True, exist_ok=True)
 
 
@@ -43,12 +46,14 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'rest_framework',
     'corsheaders',
+    'dorji360',
     'customers',
     'measurements',
     'orders',
     'payments',
     'samples',
     'staff',
+    'dashboard',
 ]
 
 MIDDLEWARE = [
@@ -86,10 +91,60 @@ WSGI_APPLICATION = 'dorji360.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
-DATABASES = {
+# DORJI360_DB_ENGINE=postgres switches to PostgreSQL (needs psycopg); SQLite stays the default.
+# Move existing data across with `manage.py migrate_sqlite_to_postgres`.
+DB_ENGINE = os.environ.get('DORJI360_DB_ENGINE', 'sqlite').lower()
+# Keep connections open between requests instead of reconnecting every time
+CONN_MAX_AGE = int(os.environ.get('DORJI360_CONN_MAX_AGE', 600))
+
+if DB_ENGINE in ('postgres', 'postgresql'):
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DORJI360_DB_NAME', 'dorji360'),
+            'USER': os.environ.get('DORJI360_DB_USER', 'dorji360'),
+            'PASSWORD': os.environ.get('DORJI360_DB_PASSWORD', ''),
+            'HOST': os.environ.get('DORJI360_DB_HOST', 'localhost'),
+            'PORT': os.environ.get('DORJI360_DB_PORT', '5432'),
+            'CONN_MAX_AGE': CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+        }
+    }
+elif DB_ENGINE == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': DB_PATH,
+            'CONN_MAX_AGE': CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+        }
+    }
+else:
+    raise ImproperlyConfigured(f"Unsupported DORJI360_DB_ENGINE: {DB_ENGINE!r} (use 'sqlite' or 'postgres')")
+
+# SQLite profile applied on every new connection (dorji360/sqlite.py).
+# None sizes the value from the database file; override with DORJI360_SQLITE_<NAME>.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',  # readers no longer block on the writer
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,  # ms to wait for a lock instead of "database is locked"
+    'cache_size': None,
+    'mmap_size': None,
+    'temp_store': 'MEMORY',
+}
+for _name in SQLITE_PRAGMAS:
+    _override = os.environ.get(f'DORJI360_SQLITE_{_name.upper()}')
+    if _override:
+        SQLITE_PRAGMAS[_name] = _override
+
+
+# Cache (process-local; used for short-lived rollups such as the dashboard summary)
+# https://docs.djangoproject.com/en/5.0/topics/cache/
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': DB_PATH,
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'dorji360',
     }
 }
 
@@ -130,6 +185,37 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Measurement templates are cached per process (measurements/registry.py); local changes
+# invalidate it at once, other processes reload after this many seconds
+MEASUREMENT_TEMPLATE_REGISTRY_TTL = 300
+# Measurement history stores diffs, with a full snapshot every N revisions (measurements/history.py)
+MEASUREMENT_SNAPSHOT_INTERVAL = 10
+# Nearest-neighbour index (measurements/similarity.py): fields two measurements must share
+# to be compared, and how long other processes may serve a stale index
+MEASUREMENT_SIMILARITY_MIN_FIELDS = 2
+MEASUREMENT_SIMILARITY_TTL = 300
+# Phone numbers without an international prefix are read as numbers in this country (dorji360/phone.py)
+PHONE_DEFAULT_COUNTRY_CODE = '880'
+# Shortest digit string GET /api/customers/by-phone/{number} accepts as a suffix
+PHONE_MIN_SUFFIX_DIGITS = 4
+# How long other processes may serve a stale customer suggest index (customers/suggest.py)
+CUSTOMER_SUGGEST_TTL = 300
+# Lowest trigram similarity of phonetic name keys that ?mode=fuzzy customer search returns
+CUSTOMER_FUZZY_THRESHOLD = 0.3
+# Lowest pair score reported as a likely duplicate customer (customers/duplicates.py)
+CUSTOMER_DUPLICATE_MIN_SCORE = 0.6
+
+# Uploaded media (content-addressed sample images, see samples/imagestore.py)
+MEDIA_URL = '/media/'
+MEDIA_ROOT = Path(os.environ.get('DORJI360_MEDIA_ROOT', BASE_DIR.parent / 'media'))
+
+# Widths (px) of the gallery variants built on upload; needs Pillow (samples/thumbnails.py)
+SAMPLE_IMAGE_WIDTHS = (160, 480, 1200)
+SAMPLE_THUMBNAIL_WORKERS = 2
+# Limits for POST /api/samples/{id}/images/ (files are streamed to disk, not held in memory)
+SAMPLE_IMAGE_MAX_UPLOAD_SIZE = 10 * 1024 * 1024
+SAMPLE_IMAGE_MAX_FILES = 20
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.0/ref/settings/#default-auto-field
 
@@ -147,16 +233,33 @@ CORS_ALLOW_ALL_ORIGINS = False
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'dorji360.renderers.FastJSONRenderer',  # JSONRenderer output, orjson speed when installed
     ],
     'DEFAULT_PARSER_CLASSES': [
         'rest_framework.parsers.JSONParser',
         'rest_framework.parsers.MultiPartParser',
         'rest_framework.parsers.FormParser',
     ],
-    'DEFAULT_PAGINATION_CLASS': None,  # No pagination by default
+    'DEFAULT_PAGINATION_CLASS': 'dorji360.pagination.IdCursorPagination',  # ?all=1 disables it
 }
 
 # Increase data upload size limits for base64 image uploads
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024  # 10MB
 DATA_UPLOAD_MAX_NUMBER_FIELDS = 1000
+
+# Logging - show the SQLite profile report on startup
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'dorji360': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+    },
+}
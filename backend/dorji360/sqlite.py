@@ -0,0 +1,81 @@
+"""
+SQLite tuning applied to every new connection (see SQLITE_PRAGMAS in settings)
+"""
+import logging
+import os
+import re
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+logger = logging.getLogger('dorji360.sqlite')
+
+MiB = 1024 * 1024
+# Bounds for the sizes derived from the database file when a PRAGMA is left as None
+MIN_CACHE_BYTES, MAX_CACHE_BYTES = 8 * MiB, 64 * MiB
+MIN_MMAP_BYTES, MAX_MMAP_BYTES = 64 * MiB, 1024 * MiB
+
+# Applied in this order; journal_mode first so the rest see the final mode
+PRAGMA_ORDER = ('journal_mode', 'synchronous', 'busy_timeout', 'cache_size', 'mmap_size', 'temp_store')
+
+_reported = False
+
+
+def database_size(path):
+    try:
+        return os.path.getsize(path)
+    except (OSError, TypeError, ValueError):
+        return 0
+
+
+def sized_pragmas(db_bytes):
+    """cache_size (negative = KiB) and mmap_size scaled to the database file"""
+    cache_bytes = min(max(db_bytes // 4, MIN_CACHE_BYTES), MAX_CACHE_BYTES)
+    mmap_bytes = MIN_MMAP_BYTES
+    while mmap_bytes < db_bytes and mmap_bytes < MAX_MMAP_BYTES:
+        mmap_bytes *= 2
+    return {'cache_size': -(cache_bytes // 1024), 'mmap_size': min(mmap_bytes, MAX_MMAP_BYTES)}
+
+
+def build_profile(configured, db_path):
+    """Resolve the configured PRAGMAs, filling None values from the database size"""
+    sized = sized_pragmas(database_size(db_path))
+    profile = {}
+    for name in PRAGMA_ORDER:
+        if name not in configured:
+            continue
+        value = configured[name]
+        if value is None:
+            if name not in sized:
+                continue  # keep SQLite's default
+            value = sized[name]
+        if not re.fullmatch(r'-?\w+', str(value)):
+            raise ImproperlyConfigured(f"Invalid value for SQLite PRAGMA {name}: {value!r}")
+        profile[name] = value
+    return profile
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """connection_created receiver: apply the SQLite profile to a fresh connection"""
+    global _reported
+    if connection.vendor != 'sqlite':
+        return
+    profile = build_profile(getattr(settings, 'SQLITE_PRAGMAS', {}), connection.settings_dict['NAME'])
+    with connection.cursor() as cursor:
+        for name, value in profile.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+        if not _reported:
+            _reported = True
+            logger.info("SQLite profile: %s", ', '.join(
+                f'{name}={value}' for name, value in pragma_report(cursor, profile).items()
+            ))
+
+
+def pragma_report(cursor, names):
+    """Read back the active value of each PRAGMA"""
+    report = {}
+    for name in names:
+        cursor.execute(f'PRAGMA {name}')
+        row = cursor.fetchone()
+        report[name] = row[0] if row else None
+    return report
@@ -0,0 +1,122 @@
+import os
+import tempfile
+from decimal import Decimal
+from io import StringIO
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from unittest import mock, skipUnless
+
+from django.db import DEFAULT_DB_ALIAS, connection
+from django.db.backends.utils import CursorWrapper
+from django.db.utils import ConnectionHandler
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+
+from customers.models import Customer
+from measurements.models import Measurement, MeasurementTemplate
+from orders.models import Order
+from payments.models import Payment
+
+from .sqlite import MAX_MMAP_BYTES, MiB, build_profile, pragma_report, sized_pragmas
+
+
+class SqliteProfileTests(SimpleTestCase):
+    def test_sizes_scale_with_database(self):
+        self.assertEqual(sized_pragmas(0), {'cache_size': -8192, 'mmap_size': 64 * MiB})
+        self.assertEqual(sized_pragmas(500 * MiB), {'cache_size': -65536, 'mmap_size': 512 * MiB})
+        self.assertEqual(sized_pragmas(5000 * MiB)['mmap_size'], MAX_MMAP_BYTES)
+
+    def test_explicit_values_win_and_are_validated(self):
+        profile = build_profile({'busy_timeout': 1000, 'cache_size': -2000, 'journal_mode': None}, '/nonexistent')
+        self.assertEqual(profile, {'busy_timeout': 1000, 'cache_size': -2000})
+        with self.assertRaises(ImproperlyConfigured):
+            build_profile({'synchronous': 'NORMAL; DROP TABLE orders'}, '/nonexistent')
+
+
+class SqliteConnectionTests(TestCase):
+    @override_settings(SQLITE_PRAGMAS={'busy_timeout': 4321, 'temp_store': 'MEMORY'})
+    def test_pragmas_applied_on_new_connection(self):
+        from .sqlite import apply_sqlite_pragmas
+
+        apply_sqlite_pragmas(sender=None, connection=connection)
+        with connection.cursor() as cursor:
+            report = pragma_report(cursor, ['busy_timeout', 'temp_store'])
+        self.assertEqual(report, {'busy_timeout': 4321, 'temp_store': 2})
+
+
+def write_sqlite_copy(path):
+    """Create a SQLite file with every model table and copy the test database's rows into it"""
+    from .management.commands.migrate_sqlite_to_postgres import copyable_models
+
+    source = ConnectionHandler({DEFAULT_DB_ALIAS: {'ENGINE': 'django.db.backends.sqlite3', 'NAME': path}})[DEFAULT_DB_ALIAS]
+    try:
+        with source.schema_editor() as editor:
+            for model in copyable_models():
+                if not model._meta.auto_created:  # M2M tables come with their model
+                    editor.create_model(model)
+        # Tables are filled in app order, not dependency order
+        with source.constraint_checks_disabled(), source.cursor() as cursor:
+            for model in copyable_models():
+                fields = model._meta.concrete_fields
+                rows = [
+                    [field.get_db_prep_save(getattr(obj, field.attname), source) for field in fields]
+                    for obj in model._base_manager.order_by('pk')
+                ]
+                if rows:
+                    columns = ', '.join(source.ops.quote_name(field.column) for field in fields)
+                    placeholders = ', '.join(['%s'] * len(fields))
+                    cursor.executemany(
+                        f'INSERT INTO {source.ops.quote_name(model._meta.db_table)} ({columns}) VALUES ({placeholders})',
+                        rows,
+                    )
+    finally:
+        source.close()
+
+
+class MigrateSqliteToPostgresTests(TransactionTestCase):
+    """Copies into whichever database the tests run on: batched INSERTs on SQLite, COPY on Postgres"""
+
+    def setUp(self):
+        customer = Customer.objects.create(name='Rahim', phone='01712345678')
+        template = MeasurementTemplate.objects.create(
+            garment_type='shirt', gender='male', fields_json={'chest': 'Chest'}, display_name='Shirt'
+        )
+        Measurement.objects.create(
+            customer=customer, garment_type='shirt', template=template, measurements_json={'chest': 40}
+        )
+        order = Order.objects.create(customer=customer, delivery_date='2025-12-01', total_amount=Decimal('900.00'))
+        Payment.objects.create(order=order, amount=Decimal('300.00'), payment_type='advance', payment_method='cash')
+
+        handle, self.source = tempfile.mkstemp(suffix='.db')
+        os.close(handle)
+        os.remove(self.source)
+        write_sqlite_copy(self.source)
+        self.addCleanup(os.remove, self.source)
+
+    def test_copies_rows_and_resets_sequences(self):
+        Customer.objects.create(name='Stale', phone='01900000000')  # target rows are replaced
+        out = StringIO()
+        call_command('migrate_sqlite_to_postgres', source=self.source, batch_size=1, interactive=False, stdout=out)
+
+        self.assertIn('customers: 1 rows', out.getvalue())
+        self.assertEqual(list(Customer.objects.values_list('name', flat=True)), ['Rahim'])
+        measurement = Measurement.objects.get()
+        self.assertEqual(measurement.measurements_json, {'chest': 40})
+        self.assertEqual(measurement.template.fields_json, {'chest': 'Chest'})
+        order = Order.objects.get()
+        self.assertEqual((order.paid_amount, order.balance_due), (Decimal('300.00'), Decimal('600.00')))
+        self.assertIsNotNone(order.created_at.tzinfo)
+
+        newer = Customer.objects.create(name='Karim', phone='01800000000')
+        self.assertGreater(newer.id, Customer.objects.get(name='Rahim').id)
+
+    @skipUnless(connection.vendor == 'postgresql', "COPY needs the tests to run on PostgreSQL (DORJI360_DB_ENGINE=postgres)")
+    def test_postgres_target_is_filled_with_copy(self):
+        with mock.patch.object(CursorWrapper, 'executemany', side_effect=AssertionError("expected COPY, got INSERT")):
+            call_command('migrate_sqlite_to_postgres', source=self.source, interactive=False, stdout=StringIO())
+        self.assertEqual(Payment.objects.get().amount, Decimal('300.00'))
+        self.assertEqual(Measurement.objects.get().measurements_json, {'chest': 40})
+
+    def test_refuses_missing_source(self):
+        with self.assertRaises(CommandError):
+            call_command('migrate_sqlite_to_postgres', source=self.source + '.missing', interactive=False)
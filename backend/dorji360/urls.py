@@ -1,10 +1,12 @@
 """
 URL configuration for dorji360 project.
 """
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
 
 from measurements.views import MeasurementViewSet
+from samples.views import serve_image, serve_variant
 from rest_framework.routers import DefaultRouter
 
 measurement_router = DefaultRouter()
@@ -20,4 +22,8 @@ urlpatterns = [
     path('api/deliveries/', include('orders.deliveries_urls')),
     path('api/samples/', include('samples.urls')),
     path('api/staff/', include('staff.urls')),
+    path('api/dashboard/', include('dashboard.urls')),
+    # Content-addressed sample images (immutable); variants are built on first request if missing
+    path(f'{settings.MEDIA_URL.strip("/")}/images/<path:path>', serve_image, name='sample-image'),
+    path(f'{settings.MEDIA_URL.strip("/")}/thumbs/<path:path>', serve_variant, name='sample-image-variant'),
 ]
@@ -3,6 +3,7 @@ Dorji360 FastAPI Backend
 """
 
 import json
+import os
 from pathlib import Path
 from typing import List, Optional
 
@@ -11,8 +12,14 @@ from fastapi import Depends, FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
-# Database path
-DB_PATH = Path(__file__).parent.parent / "database" / "tailor360.db"
+from customers.phonetic import phonetic_key, trigrams
+from dorji360.phone import reversed_digits, to_e164
+
+# Database path (same DORJI360_SQLITE_PATH override as the Django settings)
+DB_PATH = Path(os.environ.get("DORJI360_SQLITE_PATH", Path(__file__).parent.parent / "database" / "tailor360.db"))
+
+# Same as the Django PHONE_DEFAULT_COUNTRY_CODE setting, for the normalized phone columns
+PHONE_DEFAULT_COUNTRY_CODE = "880"
 
 # Ensure database directory exists
 DB_PATH.parent.mkdir(parents=True, exist_ok=True)
@@ -36,6 +43,21 @@ app.add_middleware(
 )
 
 
+def phone_columns(phone: Optional[str]) -> dict:
+    """phone_e164 and phone_reversed as the Django models derive them on save"""
+    e164 = to_e164(phone, country_code=PHONE_DEFAULT_COUNTRY_CODE)
+    return {"phone_e164": e164, "phone_reversed": reversed_digits(e164)}
+
+
+async def replace_name_trigrams(db: aiosqlite.Connection, customer_id: int, name_key: str):
+    """Trigram rows of a customer's name_key, as the Django app keeps them for fuzzy search"""
+    await db.execute("DELETE FROM customer_name_trigrams WHERE customer_id = ?", (customer_id,))
+    await db.executemany(
+        "INSERT INTO customer_name_trigrams (customer_id, trigram) VALUES (?, ?)",
+        [(customer_id, gram) for gram in sorted(trigrams(name_key))]
+    )
+
+
 # Database dependency
 async def get_db():
     try:
@@ -47,6 +69,17 @@ async def get_db():
         raise HTTPException(status_code=500, detail=f"Database connection failed: {str(e)}")
 
 
+async def refresh_order_balance(db: aiosqlite.Connection, order_id: int):
+    """Recompute the denormalized paid_amount/balance_due columns of an order."""
+    await db.execute(
+        """UPDATE orders
+           SET paid_amount = (SELECT COALESCE(SUM(amount), 0) FROM payments WHERE order_id = orders.id),
+               balance_due = total_amount - (SELECT COALESCE(SUM(amount), 0) FROM payments WHERE order_id = orders.id)
+           WHERE id = ?""",
+        (order_id,)
+    )
+
+
 # Pydantic models
 class CustomerCreate(BaseModel):
     name: str
@@ -74,6 +107,18 @@ class CustomerResponse(BaseModel):
         from_attributes = True
 
 
+def customer_fts_query(search: str) -> Optional[str]:
+    """FTS5 MATCH expression: every word must match as a prefix."""
+    words = [word.replace('"', '') for word in search.split()]
+    words = [word for word in words if word]
+    return " ".join(f'"{word}"*' for word in words) or None
+
+
+async def has_customer_fts(db: aiosqlite.Connection) -> bool:
+    cursor = await db.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'customers_fts'")
+    return await cursor.fetchone() is not None
+
+
 # Customer endpoints
 @app.get("/api/customers", response_model=List[CustomerResponse])
 async def get_customers(search: Optional[str] = None, db: aiosqlite.Connection = Depends(get_db)):
@@ -82,7 +127,18 @@ async def get_customers(search: Optional[str] = None, db: aiosqlite.Connection =
         print(f"[DEBUG] Getting customers, search: {search}")
         print(f"[DEBUG] DB path: {DB_PATH}, exists: {DB_PATH.exists()}")
         
-        if search:
+        match = customer_fts_query(search) if search else None
+        if match and await has_customer_fts(db):
+            # Ranked prefix search through the FTS5 index (see database/schema.sql)
+            query = """
+                SELECT customers.* FROM customers_fts
+                JOIN customers ON customers.id = customers_fts.rowid
+                WHERE customers_fts MATCH ?
+                ORDER BY bm25(customers_fts, 10.0, 5.0, 1.0, 1.0), customers.id DESC
+            """
+            cursor = await db.execute(query, (match,))
+            rows = await cursor.fetchall()
+        elif search:
             query = """
                 SELECT * FROM customers 
                 WHERE name LIKE ? OR phone LIKE ? OR id = ?
@@ -139,12 +195,15 @@ async def get_customer(customer_id: int, db: aiosqlite.Connection = Depends(get_
 @app.post("/api/customers", response_model=CustomerResponse)
 async def create_customer(customer: CustomerCreate, db: aiosqlite.Connection = Depends(get_db)):
     """Create a new customer."""
+    name_key = phonetic_key(customer.name)
     cursor = await db.execute(
-        "INSERT INTO customers (name, phone, address, notes) VALUES (?, ?, ?, ?)",
-        (customer.name, customer.phone, customer.address, customer.notes)
+        "INSERT INTO customers (name, phone, address, notes, phone_e164, phone_reversed, name_key) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (customer.name, customer.phone, customer.address, customer.notes, *phone_columns(customer.phone).values(), name_key)
     )
-    await db.commit()
     customer_id = cursor.lastrowid
+    await replace_name_trigrams(db, customer_id, name_key)
+    await db.commit()
     
     async with db.execute("SELECT * FROM customers WHERE id = ?", (customer_id,)) as cursor:
         row = await cursor.fetchone()
@@ -176,9 +235,14 @@ async def update_customer(
     if customer.name is not None:
         updates.append("name = ?")
         values.append(customer.name)
+        updates.append("name_key = ?")
+        values.append(phonetic_key(customer.name))
     if customer.phone is not None:
         updates.append("phone = ?")
         values.append(customer.phone)
+        for column, value in phone_columns(customer.phone).items():
+            updates.append(f"{column} = ?")
+            values.append(value)
     if customer.address is not None:
         updates.append("address = ?")
         values.append(customer.address)
@@ -193,6 +257,8 @@ async def update_customer(
     query = f"UPDATE customers SET {', '.join(updates)} WHERE id = ?"
     
     await db.execute(query, values)
+    if customer.name is not None:
+        await replace_name_trigrams(db, customer_id, phonetic_key(customer.name))
     await db.commit()
     
     async with db.execute("SELECT * FROM customers WHERE id = ?", (customer_id,)) as cursor:
@@ -214,6 +280,7 @@ async def delete_customer(customer_id: int, db: aiosqlite.Connection = Depends(g
         if not await cursor.fetchone():
             raise HTTPException(status_code=404, detail="Customer not found")
     
+    await db.execute("DELETE FROM customer_name_trigrams WHERE customer_id = ?", (customer_id,))
     await db.execute("DELETE FROM customers WHERE id = ?", (customer_id,))
     await db.commit()
     return {"message": "Customer deleted successfully"}
@@ -350,7 +417,8 @@ async def create_measurement_template(
             raise HTTPException(status_code=400, detail="Gender must be 'male', 'female', or 'unisex'")
         
         cursor = await db.execute(
-            "INSERT INTO measurement_templates (garment_type, gender, fields_json, display_name) VALUES (?, ?, ?, ?)",
+            "INSERT INTO measurement_templates (garment_type, gender, fields_json, display_name, updated_at) "
+            "VALUES (?, ?, ?, ?, datetime('now'))",
             (template.garment_type, template.gender, json.dumps(template.fields_json), template.display_name)
         )
         await db.commit()
@@ -408,6 +476,7 @@ async def update_measurement_template(
         
         if not updates:
             raise HTTPException(status_code=400, detail="No fields to update")
+        updates.append("updated_at = datetime('now')")  # conditional GET validator
         
         values.append(template_id)
         query = f"UPDATE measurement_templates SET {', '.join(updates)} WHERE id = ?"
@@ -771,14 +840,6 @@ async def get_orders(
                 for item in items_rows
             ]
             
-            # Calculate paid amount
-            payments_cursor = await db.execute(
-                "SELECT SUM(amount) as total FROM payments WHERE order_id = ?",
-                (row["id"],)
-            )
-            payment_row = await payments_cursor.fetchone()
-            paid_amount = payment_row["total"] if payment_row["total"] else 0.0
-            
             # Get assigned staff
             staff_cursor = await db.execute(
                 """SELECT osa.id, osa.staff_id, osa.assigned_date, osa.notes, 
@@ -814,8 +875,8 @@ async def get_orders(
                 "notes": row["notes"],
                 "created_at": row["created_at"],
                 "items": items,
-                "paid_amount": paid_amount,
-                "remaining_amount": row["total_amount"] - paid_amount,
+                "paid_amount": row["paid_amount"],
+                "remaining_amount": row["balance_due"],
                 "assigned_staff": assigned_staff,
             })
         
@@ -858,14 +919,6 @@ async def get_order(order_id: int, db: aiosqlite.Connection = Depends(get_db)):
             for item in items_rows
         ]
         
-        # Calculate paid amount
-        payments_cursor = await db.execute(
-            "SELECT SUM(amount) as total FROM payments WHERE order_id = ?",
-            (order_id,)
-        )
-        payment_row = await payments_cursor.fetchone()
-        paid_amount = payment_row["total"] if payment_row["total"] else 0.0
-        
         # Get assigned staff
         staff_cursor = await db.execute(
             """SELECT osa.id, osa.staff_id, osa.assigned_date, osa.notes, 
@@ -901,8 +954,8 @@ async def get_order(order_id: int, db: aiosqlite.Connection = Depends(get_db)):
             "notes": row["notes"],
             "created_at": row["created_at"],
             "items": items,
-            "paid_amount": paid_amount,
-            "remaining_amount": row["total_amount"] - paid_amount,
+            "paid_amount": row["paid_amount"],
+            "remaining_amount": row["balance_due"],
             "assigned_staff": assigned_staff,
         }
 
@@ -928,8 +981,9 @@ async def create_order(order: OrderCreate, db: aiosqlite.Connection = Depends(ge
         
         # Create order
         cursor = await db.execute(
-            "INSERT INTO orders (customer_id, order_date, delivery_date, total_amount, notes) VALUES (?, ?, ?, ?, ?)",
-            (order.customer_id, order_date, order.delivery_date, total_amount, order.notes)
+            # paid_amount has no DB default when the table was created by the Django migrations
+            "INSERT INTO orders (customer_id, order_date, delivery_date, total_amount, paid_amount, balance_due, notes) VALUES (?, ?, ?, ?, 0, ?, ?)",
+            (order.customer_id, order_date, order.delivery_date, total_amount, total_amount, order.notes)
         )
         await db.commit()
         order_id = cursor.lastrowid
@@ -1143,6 +1197,7 @@ async def create_payment(payment: PaymentCreate, db: aiosqlite.Connection = Depe
             "INSERT INTO payments (order_id, amount, payment_type, payment_method, date, notes) VALUES (?, ?, ?, ?, ?, ?)",
             (payment.order_id, payment.amount, payment.payment_type, payment.payment_method, payment_date, payment.notes)
         )
+        await refresh_order_balance(db, payment.order_id)
         await db.commit()
         payment_id = cursor.lastrowid
         
@@ -1171,10 +1226,12 @@ async def create_payment(payment: PaymentCreate, db: aiosqlite.Connection = Depe
 async def delete_payment(payment_id: int, db: aiosqlite.Connection = Depends(get_db)):
     """Delete a payment."""
     async with db.execute("SELECT * FROM payments WHERE id = ?", (payment_id,)) as cursor:
-        if not await cursor.fetchone():
+        payment_row = await cursor.fetchone()
+        if not payment_row:
             raise HTTPException(status_code=404, detail="Payment not found")
     
     await db.execute("DELETE FROM payments WHERE id = ?", (payment_id,))
+    await refresh_order_balance(db, payment_row["order_id"])
     await db.commit()
     return {"message": "Payment deleted successfully"}
 
@@ -1217,14 +1274,6 @@ async def get_deliveries(
         
         deliveries = []
         for row in rows:
-            # Calculate paid amount
-            payments_cursor = await db.execute(
-                "SELECT SUM(amount) as total FROM payments WHERE order_id = ?",
-                (row["id"],)
-            )
-            payment_row = await payments_cursor.fetchone()
-            paid_amount = payment_row["total"] if payment_row["total"] else 0.0
-            
             deliveries.append({
                 "id": row["id"],
                 "customer_id": row["customer_id"],
@@ -1236,8 +1285,8 @@ async def get_deliveries(
                 "total_amount": row["total_amount"],
                 "notes": row["notes"],
                 "created_at": row["created_at"],
-                "paid_amount": paid_amount,
-                "remaining_amount": row["total_amount"] - paid_amount,
+                "paid_amount": row["paid_amount"],
+                "remaining_amount": row["balance_due"],
             })
         
         return deliveries
@@ -1381,7 +1430,7 @@ async def create_sample(sample: SampleCreate, db: aiosqlite.Connection = Depends
         raise HTTPException(status_code=400, detail="At least one image is required")
     
     cursor = await db.execute(
-        "INSERT INTO samples (garment_type, title, description) VALUES (?, ?, ?)",
+        "INSERT INTO samples (garment_type, title, description, updated_at) VALUES (?, ?, ?, datetime('now'))",
         (sample.garment_type, sample.title, sample.description)
     )
     await db.commit()
@@ -1452,10 +1501,11 @@ async def update_sample(
         updates.append("description = ?")
         params.append(sample.description)
     
-    if updates:
-        params.append(sample_id)
-        query = f"UPDATE samples SET {', '.join(updates)} WHERE id = ?"
-        await db.execute(query, params)
+    # Always bump updated_at (the conditional GET validator), also when only images change
+    updates.append("updated_at = datetime('now')")
+    params.append(sample_id)
+    query = f"UPDATE samples SET {', '.join(updates)} WHERE id = ?"
+    await db.execute(query, params)
     
     # Update images if provided
     if sample.images is not None:
@@ -1630,8 +1680,8 @@ async def create_staff(staff: StaffCreate, db: aiosqlite.Connection = Depends(ge
         join_date = staff.join_date
     
     cursor = await db.execute(
-        "INSERT INTO staff (name, phone, address, role, join_date) VALUES (?, ?, ?, ?, ?)",
-        (staff.name, staff.phone, staff.address, staff.role, join_date)
+        "INSERT INTO staff (name, phone, address, role, join_date, phone_e164) VALUES (?, ?, ?, ?, ?, ?)",
+        (staff.name, staff.phone, staff.address, staff.role, join_date, phone_columns(staff.phone)["phone_e164"])
     )
     await db.commit()
     staff_id = cursor.lastrowid
@@ -1671,6 +1721,8 @@ async def update_staff(
     if staff.phone is not None:
         updates.append("phone = ?")
         params.append(staff.phone)
+        updates.append("phone_e164 = ?")
+        params.append(phone_columns(staff.phone)["phone_e164"])
     if staff.address is not None:
         updates.append("address = ?")
         params.append(staff.address)
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import MeasurementTemplate, Measurement
+from .models import MeasurementTemplate, Measurement, MeasurementRevision
 
 
 @admin.register(MeasurementTemplate)
@@ -19,3 +19,12 @@ class MeasurementAdmin(admin.ModelAdmin):
     readonly_fields = ('created_at',)
     ordering = ('-id',)
     autocomplete_fields = ('customer', 'template')
+
+
+@admin.register(MeasurementRevision)
+class MeasurementRevisionAdmin(admin.ModelAdmin):
+    list_display = ('id', 'measurement', 'revision', 'is_snapshot', 'created_at')
+    list_filter = ('is_snapshot', 'created_at')
+    search_fields = ('measurement__customer__name', 'measurement__customer__phone')
+    readonly_fields = ('measurement', 'revision', 'is_snapshot', 'changes', 'created_at')
+    ordering = ('-id',)
@@ -0,0 +1,98 @@
+"""
+Measurement version history: compact diffs with a full snapshot every N revisions
+"""
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Subquery
+
+from .models import MeasurementRevision
+
+MISSING = object()  # distinguishes an absent key from a None value
+
+
+def snapshot_interval():
+    return max(int(getattr(settings, 'MEASUREMENT_SNAPSHOT_INTERVAL', 10)), 1)
+
+
+def is_snapshot_revision(revision):
+    return (revision - 1) % snapshot_interval() == 0
+
+
+def diff_measurements(old, new):
+    """{"set": changed/added fields, "unset": removed fields} turning old into new"""
+    changes = {}
+    updated = {key: value for key, value in new.items() if old.get(key, MISSING) != value}
+    removed = sorted(key for key in old if key not in new)
+    if updated:
+        changes['set'] = updated
+    if removed:
+        changes['unset'] = removed
+    return changes
+
+
+def apply_diff(values, changes):
+    values = dict(values)
+    values.update(changes.get('set', {}))
+    for key in changes.get('unset', ()):
+        values.pop(key, None)
+    return values
+
+
+def latest_revision(measurement_id):
+    return MeasurementRevision.objects.filter(measurement_id=measurement_id).aggregate(last=Max('revision'))['last'] or 0
+
+
+def rebuild(measurement_id, revision):
+    """
+    measurements_json as of `revision`, or None.
+
+    Starts from the latest stored snapshot at or before `revision` (by its is_snapshot
+    flag, so history written under another MEASUREMENT_SNAPSHOT_INTERVAL still rebuilds)
+    and applies the diffs after it, in one query.
+    """
+    revisions = MeasurementRevision.objects.filter(measurement_id=measurement_id)
+    start = (
+        revisions.filter(is_snapshot=True, revision__lte=revision)
+        .order_by('-revision')
+        .values('revision')[:1]
+    )
+    rows = list(
+        revisions.filter(revision__gte=Subquery(start), revision__lte=revision)
+        .order_by('revision')
+        .values_list('revision', 'is_snapshot', 'changes')
+    )
+    if not rows or rows[-1][0] != revision:
+        return None
+    values = {}
+    for _, is_snapshot, changes in rows:
+        values = dict(changes) if is_snapshot else apply_diff(values, changes)
+    return values
+
+
+def record_revision(measurement, previous=None):
+    """
+    Append a revision for the measurement's current values; returns it, or None if nothing changed.
+
+    `previous` is the stored value before this save; it is only needed for measurements
+    whose history predates this table. Diffs are always taken against the rebuilt last
+    revision so the chain stays consistent even after out-of-band updates.
+    """
+    current = measurement.measurements_json or {}
+    with transaction.atomic():
+        last = latest_revision(measurement.pk)
+        if last == 0 and previous is not None and previous != current:
+            MeasurementRevision.objects.create(
+                measurement_id=measurement.pk, revision=1, is_snapshot=True, changes=previous
+            )
+            last = 1
+        before = rebuild(measurement.pk, last) if last else None
+        if last and before == current:
+            return None
+        revision = last + 1
+        snapshot = is_snapshot_revision(revision)
+        return MeasurementRevision.objects.create(
+            measurement_id=measurement.pk,
+            revision=revision,
+            is_snapshot=snapshot,
+            changes=current if snapshot else diff_measurements(before or {}, current),
+        )
@@ -0,0 +1,27 @@
+# Generated by Django 5.0.1 on 2026-10-17 09:40
+
+from django.db import migrations, models
+from django.db.models import F
+import django.utils.timezone
+
+
+def backfill_updated_at(apps, schema_editor):
+    MeasurementTemplate = apps.get_model('measurements', 'MeasurementTemplate')
+    MeasurementTemplate.objects.update(updated_at=F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('measurements', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='measurementtemplate',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+    ]
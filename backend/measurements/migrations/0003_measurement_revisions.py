@@ -0,0 +1,47 @@
+# Generated by Django 5.0.1 on 2026-10-17 03:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def snapshot_existing_measurements(apps, schema_editor):
+    """Revision 1 of every existing measurement is its current values"""
+    Measurement = apps.get_model('measurements', 'Measurement')
+    MeasurementRevision = apps.get_model('measurements', 'MeasurementRevision')
+    batch = []
+    for measurement_id, values in Measurement.objects.order_by('id').values_list('id', 'measurements_json').iterator(chunk_size=2000):
+        batch.append(MeasurementRevision(measurement_id=measurement_id, revision=1, is_snapshot=True, changes=values))
+        if len(batch) >= 2000:
+            MeasurementRevision.objects.bulk_create(batch)
+            batch = []
+    MeasurementRevision.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('measurements', '0002_measurementtemplate_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MeasurementRevision',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('revision', models.PositiveIntegerField()),
+                ('is_snapshot', models.BooleanField(default=False)),
+                ('changes', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('measurement', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='revisions', to='measurements.measurement')),
+            ],
+            options={
+                'db_table': 'measurement_revisions',
+                'ordering': ['measurement', 'revision'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='measurementrevision',
+            constraint=models.UniqueConstraint(fields=('measurement', 'revision'), name='uniq_measurement_revision'),
+        ),
+        migrations.RunPython(snapshot_existing_measurements, migrations.RunPython.noop),
+    ]
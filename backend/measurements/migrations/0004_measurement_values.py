@@ -0,0 +1,49 @@
+# Generated by Django 5.0.1 on 2026-10-17 03:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from measurements.search import to_number
+
+
+def index_existing_measurements(apps, schema_editor):
+    Measurement = apps.get_model('measurements', 'Measurement')
+    MeasurementValue = apps.get_model('measurements', 'MeasurementValue')
+    batch = []
+    rows = Measurement.objects.order_by('id').values_list('id', 'garment_type', 'measurements_json')
+    for measurement_id, garment_type, values in rows.iterator(chunk_size=2000):
+        for field_name, raw in (values or {}).items():
+            number = to_number(raw)
+            if number is not None:
+                batch.append(MeasurementValue(
+                    measurement_id=measurement_id, garment_type=garment_type, field_name=field_name, value=number
+                ))
+        if len(batch) >= 5000:
+            MeasurementValue.objects.bulk_create(batch)
+            batch = []
+    MeasurementValue.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('measurements', '0003_measurement_revisions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MeasurementValue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('garment_type', models.CharField(max_length=100)),
+                ('field_name', models.CharField(max_length=100)),
+                ('value', models.FloatField()),
+                ('measurement', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='values', to='measurements.measurement')),
+            ],
+            options={
+                'db_table': 'measurement_values',
+                'indexes': [models.Index(fields=['garment_type', 'field_name', 'value'], name='idx_measurement_values_search')],
+            },
+        ),
+        migrations.RunPython(index_existing_measurements, migrations.RunPython.noop),
+    ]
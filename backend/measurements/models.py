@@ -14,6 +14,7 @@ class MeasurementTemplate(models.Model):
     fields_json = models.JSONField()  # field_name -> display_name
     display_name = models.CharField(max_length=255)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)  # ETag/Last-Modified validator
 
     class Meta:
         db_table = 'measurement_templates'
@@ -36,3 +37,53 @@ class Measurement(models.Model):
 
     def __str__(self):
         return f"{self.customer.name} - {self.garment_type}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored values so the revision signal can diff without re-reading the row
+        if 'measurements_json' in field_names:
+            loaded = values[field_names.index('measurements_json')]
+            instance._loaded_measurements = dict(loaded) if isinstance(loaded, dict) else loaded
+        return instance
+
+
+class MeasurementRevision(models.Model):
+    """
+    Append-only history of Measurement.measurements_json.
+
+    Every MEASUREMENT_SNAPSHOT_INTERVAL-th revision (starting with the first) stores the
+    full values; the others store only {"set": {...}, "unset": [...]} against the previous one.
+    """
+    measurement = models.ForeignKey('Measurement', on_delete=models.CASCADE, related_name='revisions')
+    revision = models.PositiveIntegerField()
+    is_snapshot = models.BooleanField(default=False)
+    changes = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'measurement_revisions'
+        ordering = ['measurement', 'revision']
+        constraints = [
+            models.UniqueConstraint(fields=['measurement', 'revision'], name='uniq_measurement_revision'),
+        ]
+
+    def __str__(self):
+        return f"Measurement {self.measurement_id} r{self.revision}"
+
+
+class MeasurementValue(models.Model):
+    """One numeric value of Measurement.measurements_json, indexed for range search"""
+    measurement = models.ForeignKey('Measurement', on_delete=models.CASCADE, related_name='values')
+    garment_type = models.CharField(max_length=100)
+    field_name = models.CharField(max_length=100)
+    value = models.FloatField()
+
+    class Meta:
+        db_table = 'measurement_values'
+        indexes = [
+            models.Index(fields=['garment_type', 'field_name', 'value'], name='idx_measurement_values_search'),
+        ]
+
+    def __str__(self):
+        return f"{self.field_name}={self.value} ({self.garment_type})"
@@ -0,0 +1,87 @@
+"""
+Process-local registry of measurement templates (small, nearly static table)
+"""
+import threading
+import time
+
+from django.conf import settings
+
+from .models import MeasurementTemplate
+
+
+class TemplateSnapshot:
+    """All templates as loaded at one moment, indexed by id and by (garment_type, gender)"""
+
+    def __init__(self, templates):
+        self.templates = sorted(templates, key=lambda template: -template.id)
+        self.by_id = {template.id: template for template in self.templates}
+        self.by_key = {}
+        for template in self.templates:
+            self.by_key.setdefault((template.garment_type, template.gender), []).append(template)
+        self.loaded_at = time.monotonic()
+
+    def filter(self, garment_type=None, gender=None):
+        """Same result as the list endpoint's filters: a gender also matches unisex templates"""
+        if garment_type and gender:
+            matches = self.by_key.get((garment_type, gender), []) + self.by_key.get((garment_type, 'unisex'), [])
+            return sorted(matches, key=lambda template: -template.id)
+        genders = {gender, 'unisex'} if gender else None
+        return [
+            template for template in self.templates
+            if (not garment_type or template.garment_type == garment_type)
+            and (genders is None or template.gender in genders)
+        ]
+
+
+class TemplateRegistry:
+    """
+    Loaded on first use and dropped by the post_save/post_delete signals (measurements/signals.py).
+
+    Other processes only see a change after MEASUREMENT_TEMPLATE_REGISTRY_TTL seconds.
+    The instances are shared between requests, so treat them as read-only.
+    """
+
+    def __init__(self):
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def snapshot(self):
+        snapshot = self._snapshot
+        ttl = getattr(settings, 'MEASUREMENT_TEMPLATE_REGISTRY_TTL', 300)
+        if snapshot is None or time.monotonic() - snapshot.loaded_at > ttl:
+            with self._lock:
+                snapshot = self._snapshot
+                if snapshot is None or time.monotonic() - snapshot.loaded_at > ttl:
+                    snapshot = TemplateSnapshot(MeasurementTemplate.objects.all())
+                    self._snapshot = snapshot
+        return snapshot
+
+    def get(self, template_id):
+        try:
+            return self.snapshot().by_id.get(int(template_id))
+        except (TypeError, ValueError):
+            return None
+
+    def get_or_load(self, template_id):
+        """
+        get(), falling back to the database on a miss (a template created by another
+        process within the TTL); a hit there drops the snapshot so it is reloaded.
+        """
+        template = self.get(template_id)
+        if template is None:
+            try:
+                template = MeasurementTemplate.objects.filter(pk=int(template_id)).first()
+            except (TypeError, ValueError):
+                return None
+            if template is not None:
+                self.invalidate()
+        return template
+
+    def filter(self, garment_type=None, gender=None):
+        return self.snapshot().filter(garment_type=garment_type, gender=gender)
+
+    def invalidate(self):
+        self._snapshot = None
+
+
+templates = TemplateRegistry()
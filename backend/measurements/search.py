@@ -0,0 +1,72 @@
+"""
+Range search over measurement values via the measurement_values side table
+"""
+import math
+import re
+
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+
+from .models import MeasurementValue
+
+SEARCH_OPERATORS = {'': 'value', 'gte': 'value__gte', 'lte': 'value__lte', 'gt': 'value__gt', 'lt': 'value__lt'}
+# Query params that are not measurement filters
+RESERVED_PARAMS = {'garment_type', 'customer_id', 'all', 'cursor', 'page_size', 'format'}
+FIELD_NAME_RE = re.compile(r'\w+')
+
+
+def to_number(value):
+    """float for numeric measurement values (including numeric strings), else None"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        number = float(value)
+    elif isinstance(value, str):
+        try:
+            number = float(value.strip())
+        except ValueError:
+            return None
+    else:
+        return None
+    return number if math.isfinite(number) else None
+
+
+def value_rows(measurement_id, garment_type, measurements_json):
+    return [
+        MeasurementValue(measurement_id=measurement_id, garment_type=garment_type, field_name=name, value=number)
+        for name, raw in (measurements_json or {}).items()
+        if (number := to_number(raw)) is not None
+    ]
+
+
+def index_measurement(measurement):
+    """Replace the indexed values of one measurement"""
+    with transaction.atomic():
+        MeasurementValue.objects.filter(measurement_id=measurement.pk).delete()
+        MeasurementValue.objects.bulk_create(
+            value_rows(measurement.pk, measurement.garment_type, measurement.measurements_json)
+        )
+
+
+def parse_search_params(query_params):
+    """{field_name: {lookup: number}} from params like chest__gte=38&chest__lte=40"""
+    conditions = {}
+    for key, raw in query_params.items():
+        if key in RESERVED_PARAMS:
+            continue
+        field_name, _, operator = key.partition('__')
+        if operator not in SEARCH_OPERATORS or not FIELD_NAME_RE.fullmatch(field_name):
+            raise ValidationError({key: ["Use <field>, <field>__gte, __lte, __gt or __lt."]})
+        number = to_number(raw)
+        if number is None:
+            raise ValidationError({key: ["A number is required."]})
+        conditions.setdefault(field_name, {})[SEARCH_OPERATORS[operator]] = number
+    return conditions
+
+
+def search_measurements(queryset, garment_type, conditions):
+    """Narrow the queryset to measurements matching every condition, one indexed subquery per field"""
+    for field_name, lookups in conditions.items():
+        matching = MeasurementValue.objects.filter(garment_type=garment_type, field_name=field_name, **lookups)
+        queryset = queryset.filter(id__in=matching.values('measurement_id'))
+    return queryset
@@ -1,5 +1,9 @@
 from rest_framework import serializers
-from .models import MeasurementTemplate, Measurement
+
+from customers.models import Customer
+from dorji360.fastpath import format_datetime
+from .models import MeasurementTemplate, Measurement, MeasurementRevision
+from .registry import templates as template_registry
 
 
 class MeasurementTemplateSerializer(serializers.ModelSerializer):
@@ -11,7 +15,30 @@ class MeasurementTemplateSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
 
+class RegistryTemplateField(serializers.PrimaryKeyRelatedField):
+    """
+    Template primary key validated against the in-process registry (the database on a miss).
+
+    A template deleted by another process can still pass here; the view re-checks it
+    inside the write transaction.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        template = template_registry.get_or_load(data)
+        if template is None:
+            try:
+                int(data)
+            except (TypeError, ValueError):
+                self.fail('incorrect_type', data_type=type(data).__name__)
+            self.fail('does_not_exist', pk_value=data)
+        return template
+
+
 class MeasurementSerializer(serializers.ModelSerializer):
+    customer = serializers.PrimaryKeyRelatedField(queryset=Customer.objects.all())
+    template = RegistryTemplateField(queryset=MeasurementTemplate.objects.all())
     customer_id = serializers.IntegerField(source='customer.id', read_only=True)
     customer_name = serializers.CharField(source='customer.name', read_only=True)
     customer_phone = serializers.CharField(source='customer.phone', read_only=True)
@@ -28,23 +55,6 @@ class MeasurementSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'customer_id', 'customer_name', 'customer_phone', 'template_id', 'template_name', 'created_at']
     
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        # Set queryset dynamically to avoid circular import
-        from customers.models import Customer
-        from .models import MeasurementTemplate
-        # Override customer and template fields to be writable
-        self.fields['customer'] = serializers.PrimaryKeyRelatedField(
-            queryset=Customer.objects.all(),
-            write_only=False,
-            required=True
-        )
-        self.fields['template'] = serializers.PrimaryKeyRelatedField(
-            queryset=MeasurementTemplate.objects.all(),
-            write_only=False,
-            required=True
-        )
-    
     def to_representation(self, instance):
         """Ensure customer_id and template_id are always present in response"""
         ret = super().to_representation(instance)
@@ -54,3 +64,36 @@ class MeasurementSerializer(serializers.ModelSerializer):
             ret['template_id'] = instance.template.id if instance.template else None
         return ret
 
+
+class MeasurementRevisionSerializer(serializers.ModelSerializer):
+    created_at = serializers.DateTimeField(format='%Y-%m-%d %H:%M:%S', read_only=True)
+
+    class Meta:
+        model = MeasurementRevision
+        fields = ['revision', 'is_snapshot', 'changes', 'created_at']
+
+
+MEASUREMENT_LIST_COLUMNS = (
+    'id', 'customer_id', 'customer__name', 'customer__phone', 'garment_type',
+    'template_id', 'template__display_name', 'measurements_json', 'created_at',
+)
+
+
+def measurement_rows(rows):
+    """Fast-path equivalent of MeasurementSerializer(many=True) for MEASUREMENT_LIST_COLUMNS rows"""
+    return [
+        {
+            'id': row['id'],
+            'customer': row['customer_id'],
+            'customer_id': row['customer_id'],
+            'customer_name': row['customer__name'],
+            'customer_phone': row['customer__phone'],
+            'garment_type': row['garment_type'],
+            'template': row['template_id'],
+            'template_id': row['template_id'],
+            'template_name': row['template__display_name'],
+            'measurements_json': row['measurements_json'],
+            'created_at': format_datetime(row['created_at']),
+        }
+        for row in rows
+    ]
@@ -0,0 +1,49 @@
+"""
+Keep the in-process template registry and similarity index current, and on every
+measurement save record a revision and refresh its searchable values
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .history import record_revision
+from .models import Measurement, MeasurementTemplate
+from .registry import templates
+from .search import index_measurement
+from .similarity import similarity
+
+
+@receiver([post_save, post_delete], sender=MeasurementTemplate)
+def invalidate_template_registry(sender, instance, **kwargs):
+    templates.invalidate()
+    similarity.invalidate(instance.pk)  # the template's fields define the vector layout
+    # Again after commit, in case a reload inside the transaction picked up uncommitted rows
+    transaction.on_commit(templates.invalidate)
+
+
+@receiver(post_save, sender=Measurement)
+def record_measurement_revision(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return  # loaddata
+    record_revision(instance, previous=None if created else getattr(instance, '_loaded_measurements', None))
+
+
+@receiver(post_save, sender=Measurement)
+def index_measurement_values(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_measurement(instance)
+
+
+# The similarity index is shared by every request in the process: change it only once the
+# write is committed, so a rolled-back save never shows up in other requests' results
+
+@receiver(post_save, sender=Measurement)
+def update_similarity_index(sender, instance, raw=False, **kwargs):
+    if not raw:
+        transaction.on_commit(lambda: similarity.measurement_saved(instance))
+
+
+@receiver(post_delete, sender=Measurement)
+def remove_from_similarity_index(sender, instance, **kwargs):
+    measurement_id = instance.pk  # delete() clears the pk before commit
+    transaction.on_commit(lambda: similarity.measurement_deleted(measurement_id))
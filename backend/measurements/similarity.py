@@ -0,0 +1,202 @@
+"""
+In-memory nearest-neighbour index over measurement values, one matrix per template
+"""
+import heapq
+import math
+import threading
+import time
+
+from django.conf import settings
+
+from .models import Measurement
+from .registry import templates as template_registry
+from .search import to_number
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover - optional dependency
+    numpy = None
+
+NAN = float('nan')
+
+
+def min_overlap():
+    """Fields two measurements must share before they are compared"""
+    return getattr(settings, 'MEASUREMENT_SIMILARITY_MIN_FIELDS', 2)
+
+
+def to_vector(field_names, measurements_json):
+    """Template field values as floats; NaN where a value is missing or not numeric"""
+    values = measurements_json or {}
+    vector = []
+    for name in field_names:
+        number = to_number(values.get(name))
+        vector.append(NAN if number is None else number)
+    return vector
+
+
+class TemplateIndex:
+    """
+    Vectors of every measurement made with one template.
+
+    Rows are appended/overwritten/swap-removed in place as measurements are saved,
+    so keeping the index current never rescans the table. Distance is the RMS
+    difference over the fields both measurements have, in measurement units.
+    """
+
+    def __init__(self, template_id, field_names, rows):
+        self.template_id = template_id
+        self.field_names = list(field_names)
+        self.lock = threading.Lock()
+        self.loaded_at = time.monotonic()
+        self.ids = []
+        self.positions = {}
+        if numpy is not None:
+            self.matrix = numpy.full((1024, len(self.field_names)), numpy.nan)
+        else:
+            self.matrix = []
+        for measurement_id, measurements_json in rows:
+            self.upsert(measurement_id, measurements_json)
+
+    @property
+    def size(self):
+        return len(self.ids)
+
+    def upsert(self, measurement_id, measurements_json):
+        vector = to_vector(self.field_names, measurements_json)
+        with self.lock:
+            position = self.positions.get(measurement_id)
+            if position is None:
+                position = self.size
+                self.positions[measurement_id] = position
+                self.ids.append(measurement_id)
+                if numpy is None:
+                    self.matrix.append(vector)
+                elif position >= len(self.matrix):
+                    grown = numpy.full((len(self.matrix) * 2, len(self.field_names)), numpy.nan)
+                    grown[:position] = self.matrix[:position]
+                    self.matrix = grown
+            self.matrix[position] = vector
+
+    def remove(self, measurement_id):
+        with self.lock:
+            position = self.positions.pop(measurement_id, None)
+            if position is None:
+                return
+            last = self.size - 1
+            if position != last:
+                # Move the last row into the gap so rows stay contiguous
+                moved_id = self.ids[last]
+                self.matrix[position] = self.matrix[last]
+                self.ids[position] = moved_id
+                self.positions[moved_id] = position
+            self.ids.pop()
+            if numpy is None:
+                self.matrix.pop()
+
+    def vector_for(self, measurement_id):
+        with self.lock:
+            position = self.positions.get(measurement_id)
+            return None if position is None else [float(value) for value in self.matrix[position]]
+
+    def nearest(self, vector, k, exclude=()):
+        """[(measurement_id, distance, fields_compared)] closest first"""
+        with self.lock:
+            if numpy is not None:
+                return self._nearest_numpy(vector, k, exclude)
+            return self._nearest_python(vector, k, exclude)
+
+    def _nearest_numpy(self, vector, k, exclude):
+        matrix = self.matrix[:self.size]
+        diff = matrix - numpy.asarray(vector, dtype=float)
+        valid = ~numpy.isnan(diff)
+        counts = valid.sum(axis=1)
+        squared = numpy.where(valid, diff * diff, 0.0).sum(axis=1)
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            distances = numpy.sqrt(squared / counts)
+        distances[counts < min_overlap()] = numpy.inf
+        for measurement_id in exclude:
+            position = self.positions.get(measurement_id)
+            if position is not None:
+                distances[position] = numpy.inf
+        k = min(k, len(distances))
+        if k <= 0:
+            return []
+        # Everything within the k-th distance, then ties broken by id like the Python path
+        kth = numpy.partition(distances, k - 1)[k - 1]
+        candidates = numpy.flatnonzero((distances <= kth) & numpy.isfinite(distances)).tolist()
+        top = sorted(candidates, key=lambda p: (distances[p], self.ids[p]))[:k]
+        return [(self.ids[p], float(distances[p]), int(counts[p])) for p in top]
+
+    def _nearest_python(self, vector, k, exclude):
+        overlap = min_overlap()
+        scored = []
+        for position, row in enumerate(self.matrix):
+            measurement_id = self.ids[position]
+            if measurement_id in exclude:
+                continue
+            total = 0.0
+            count = 0
+            for a, b in zip(row, vector):
+                if a == a and b == b:  # both present (NaN != NaN)
+                    total += (a - b) * (a - b)
+                    count += 1
+            if count >= overlap:
+                scored.append((math.sqrt(total / count), measurement_id, count))
+        return [(i, d, c) for d, i, c in heapq.nsmallest(k, scored)]
+
+
+class SimilarityIndex:
+    """
+    Per-template indexes, built on first query and kept current by measurement signals.
+
+    Other processes pick up changes after MEASUREMENT_SIMILARITY_TTL seconds.
+    """
+
+    def __init__(self):
+        self._indexes = {}
+        self._lock = threading.Lock()
+
+    def for_template(self, template_id):
+        ttl = getattr(settings, 'MEASUREMENT_SIMILARITY_TTL', 300)
+        index = self._indexes.get(template_id)
+        if index is None or time.monotonic() - index.loaded_at > ttl:
+            with self._lock:
+                index = self._indexes.get(template_id)
+                if index is None or time.monotonic() - index.loaded_at > ttl:
+                    index = self._build(template_id)
+                    self._indexes[template_id] = index
+        return index
+
+    def _build(self, template_id):
+        template = template_registry.get(template_id)
+        field_names = list((template.fields_json or {}).keys()) if template else []
+        rows = Measurement.objects.filter(template_id=template_id).values_list('id', 'measurements_json')
+        return TemplateIndex(template_id, field_names, rows.iterator(chunk_size=2000))
+
+    def similar(self, measurement, k=10):
+        index = self.for_template(measurement.template_id)
+        vector = index.vector_for(measurement.id)
+        if vector is None:
+            vector = to_vector(index.field_names, measurement.measurements_json)
+        return index.nearest(vector, k, exclude={measurement.id})
+
+    def measurement_saved(self, measurement):
+        for template_id, index in list(self._indexes.items()):
+            if template_id == measurement.template_id:
+                index.upsert(measurement.id, measurement.measurements_json)
+            else:
+                index.remove(measurement.id)  # the template may have changed
+
+    def measurement_deleted(self, measurement_id):
+        for index in list(self._indexes.values()):
+            index.remove(measurement_id)
+
+    def invalidate(self, template_id=None):
+        if template_id is None:
+            self._indexes.clear()
+        else:
+            self._indexes.pop(template_id, None)
+
+
+similarity = SimilarityIndex()
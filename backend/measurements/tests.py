@@ -1,3 +1,368 @@
-from django.test import TestCase
+import math
 
-# Create your tests here.
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from customers.models import Customer
+from .history import apply_diff, diff_measurements, rebuild
+from .models import Measurement, MeasurementRevision, MeasurementTemplate, MeasurementValue
+from . import similarity as similarity_module
+from .search import search_measurements
+from .similarity import TemplateIndex, similarity
+from .registry import templates as template_registry
+from .serializers import MeasurementSerializer
+
+
+class MeasurementFastListTests(TestCase):
+    def test_fast_list_matches_serializer(self):
+        customer = Customer.objects.create(name='Rahim', phone='01712345678')
+        template = MeasurementTemplate.objects.create(
+            garment_type='shirt', gender='male', display_name='Shirt (Male)', fields_json={'chest': 'Chest'}
+        )
+        Measurement.objects.create(customer=customer, garment_type='shirt', template=template, measurements_json={'chest': 38.5})
+        Measurement.objects.create(customer=customer, garment_type='shirt', template=template, measurements_json={})
+
+        response = APIClient().get('/api/measurements/', {'all': '1'})
+        queryset = Measurement.objects.select_related('customer', 'template').order_by('-id')
+        expected = JSONRenderer().render(MeasurementSerializer(queryset, many=True).data)
+        self.assertEqual(response.content, expected)
+
+
+class MeasurementTemplateConditionalGetTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.template = MeasurementTemplate.objects.create(
+            garment_type='shirt', gender='male', display_name='Shirt (Male)', fields_json={'chest': 'Chest'}
+        )
+
+    def test_list_revalidates_with_etag(self):
+        first = self.client.get('/api/measurement-templates/', {'gender': 'male'})
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(first['Cache-Control'], 'no-cache')
+        self.assertNotIn('Last-Modified', first)  # a delete would not move it
+
+        with CaptureQueriesContext(connection) as ctx:
+            again = self.client.get('/api/measurement-templates/', {'gender': 'male'}, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(len(ctx.captured_queries), 0)  # validator comes from the template registry
+
+        other_filter = self.client.get('/api/measurement-templates/', {'gender': 'female'}, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(other_filter.status_code, 200)
+
+    def test_changes_invalidate_the_validator(self):
+        first = self.client.get('/api/measurement-templates/')
+        self.client.patch(
+            f'/api/measurement-templates/{self.template.id}/', {'display_name': 'Shirt'}, format='json'
+        )
+        self.assertEqual(self.client.get('/api/measurement-templates/', HTTP_IF_NONE_MATCH=first['ETag']).status_code, 200)
+
+        current = self.client.get('/api/measurement-templates/')
+        MeasurementTemplate.objects.create(garment_type='pant', gender='male', display_name='Pant', fields_json={})
+        self.assertEqual(self.client.get('/api/measurement-templates/', HTTP_IF_NONE_MATCH=current['ETag']).status_code, 200)
+
+    def test_list_ignores_if_modified_since_after_delete(self):
+        other = MeasurementTemplate.objects.create(garment_type='pant', gender='male', display_name='Pant', fields_json={})
+        first = self.client.get('/api/measurement-templates/')
+        self.client.delete(f'/api/measurement-templates/{other.id}/')
+        again = self.client.get('/api/measurement-templates/', HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT')
+        self.assertEqual(again.status_code, 200)
+        self.assertEqual(len(again.json()), len(first.json()) - 1)
+
+    def test_retrieve_supports_if_modified_since(self):
+        first = self.client.get(f'/api/measurement-templates/{self.template.id}/')
+        again = self.client.get(
+            f'/api/measurement-templates/{self.template.id}/', HTTP_IF_MODIFIED_SINCE=first['Last-Modified']
+        )
+        self.assertEqual(again.status_code, 304)
+        self.assertEqual(self.client.get('/api/measurement-templates/999/').status_code, 404)
+        self.assertEqual(self.client.get('/api/measurement-templates/abc/').status_code, 404)
+
+
+class MeasurementTemplateRegistryTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.customer = Customer.objects.create(name='Rahim', phone='01712345678')
+        self.male = MeasurementTemplate.objects.create(
+            garment_type='shirt', gender='male', display_name='Shirt (Male)', fields_json={'chest': 'Chest'}
+        )
+        self.unisex = MeasurementTemplate.objects.create(
+            garment_type='shirt', gender='unisex', display_name='Shirt', fields_json={'chest': 'Chest'}
+        )
+        MeasurementTemplate.objects.create(garment_type='pant', gender='female', display_name='Pant', fields_json={})
+
+    def test_list_is_served_from_registry_with_unisex_fallback(self):
+        self.client.get('/api/measurement-templates/')  # warm the registry
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/measurement-templates/', {'garment_type': 'shirt', 'gender': 'male'})
+        self.assertEqual(len(ctx.captured_queries), 0)
+        self.assertEqual([t['id'] for t in response.json()], [self.unisex.id, self.male.id])
+        self.assertEqual(
+            [t['id'] for t in self.client.get('/api/measurement-templates/', {'gender': 'female'}).json()],
+            list(MeasurementTemplate.objects.filter(gender__in=['female', 'unisex']).order_by('-id').values_list('id', flat=True)),
+        )
+
+    def test_measurement_validation_does_not_query_templates(self):
+        template_registry.get(self.male.id)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post('/api/measurements/', {
+                'customer_id': self.customer.id, 'template_id': self.male.id,
+                'garment_type': 'shirt', 'measurements_json': {'chest': 40},
+            }, format='json')
+        self.assertEqual(response.status_code, 201)
+        # Only the existence check inside the write transaction, no template row loads
+        template_reads = [q['sql'] for q in ctx.captured_queries if 'measurement_templates' in q['sql'] and 'SELECT' in q['sql']]
+        self.assertEqual(len(template_reads), 1)
+        self.assertIn('SELECT 1 AS', template_reads[0])
+
+        response = self.client.post('/api/measurements/', {
+            'customer': self.customer.id, 'template': 999, 'garment_type': 'shirt', 'measurements_json': {},
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('template', response.json())
+
+    def test_signals_invalidate_registry(self):
+        self.assertEqual(template_registry.get(self.male.id).display_name, 'Shirt (Male)')
+        self.male.display_name = 'Shirt for men'
+        self.male.save()
+        self.assertEqual(template_registry.get(self.male.id).display_name, 'Shirt for men')
+        self.male.delete()
+        self.assertIsNone(template_registry.get(self.male.id))
+        self.assertEqual(self.client.get(f'/api/measurement-templates/{self.male.id}/').status_code, 404)
+
+
+    def post_measurement(self, template_id):
+        return self.client.post('/api/measurements/', {
+            'customer_id': self.customer.id, 'template_id': template_id,
+            'garment_type': 'shirt', 'measurements_json': {'chest': 38},
+        }, format='json')
+
+    def test_template_created_by_another_process_is_accepted(self):
+        template_registry.invalidate()
+        self.client.get('/api/measurement-templates/')  # warm the registry
+        # bulk_create sends no signals, like a write in another process
+        created, = MeasurementTemplate.objects.bulk_create([
+            MeasurementTemplate(garment_type='kurta', gender='male', display_name='Kurta', fields_json={})
+        ])
+        self.assertEqual(self.post_measurement(created.id).status_code, 201)
+        self.assertIsNotNone(template_registry.get(created.id))
+
+    def test_template_deleted_by_another_process_is_a_400(self):
+        template_registry.invalidate()
+        self.assertIsNotNone(template_registry.get(self.male.id))
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM measurement_templates WHERE id = %s', [self.male.id])
+        response = self.post_measurement(self.male.id)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('template', response.json())
+        self.assertFalse(Measurement.objects.exists())
+
+
+@override_settings(MEASUREMENT_SNAPSHOT_INTERVAL=3)
+class MeasurementRevisionTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        customer = Customer.objects.create(name='Rahim', phone='01712345678')
+        template = MeasurementTemplate.objects.create(
+            garment_type='shirt', gender='male', display_name='Shirt', fields_json={'chest': 'Chest'}
+        )
+        self.measurement = Measurement.objects.create(
+            customer=customer, garment_type='shirt', template=template, measurements_json={'chest': 38, 'waist': 32}
+        )
+
+    def update(self, values):
+        response = self.client.patch(
+            f'/api/measurements/{self.measurement.id}/', {'measurements_json': values}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_diff_round_trip(self):
+        old, new = {'chest': 38, 'waist': 32, 'hip': 40}, {'chest': 39, 'waist': 32, 'sleeve': 24}
+        changes = diff_measurements(old, new)
+        self.assertEqual(changes, {'set': {'chest': 39, 'sleeve': 24}, 'unset': ['hip']})
+        self.assertEqual(apply_diff(old, changes), new)
+
+    def test_updates_store_diffs_and_periodic_snapshots(self):
+        history = [{'chest': 38, 'waist': 32}]
+        for chest in (39, 40, 41, 42):
+            values = {'chest': chest, 'waist': 32}
+            self.update(values)
+            history.append(values)
+        self.update({'chest': 42, 'waist': 32})  # unchanged: no new revision
+
+        revisions = list(MeasurementRevision.objects.filter(measurement=self.measurement).order_by('revision'))
+        self.assertEqual([r.is_snapshot for r in revisions], [True, False, False, True, False])
+        self.assertEqual(revisions[1].changes, {'set': {'chest': 39}})
+        for number, values in enumerate(history, start=1):
+            self.assertEqual(rebuild(self.measurement.id, number), values)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(f'/api/measurements/{self.measurement.id}/revisions/5/')
+        self.assertEqual(response.json()['measurements_json'], history[4])
+        revision_reads = [q for q in ctx.captured_queries if 'measurement_revisions' in q['sql']]
+        self.assertEqual(len(revision_reads), 2)  # snapshot..target rows, then created_at
+
+        listing = self.client.get(f'/api/measurements/{self.measurement.id}/revisions/').json()
+        self.assertEqual([r['revision'] for r in listing], [1, 2, 3, 4, 5])
+        self.assertEqual(self.client.get(f'/api/measurements/{self.measurement.id}/revisions/9/').status_code, 404)
+
+    def test_interval_change_keeps_history_readable(self):
+        history = [{'chest': 38, 'waist': 32}]
+        for chest in (39, 40):
+            history.append({'chest': chest, 'waist': 32})
+            self.update(history[-1])
+        with self.settings(MEASUREMENT_SNAPSHOT_INTERVAL=2):
+            # revision 4 is not a snapshot under the old interval's arithmetic (1, 3, 5...)
+            for chest in (41, 42, 43):
+                history.append({'chest': chest, 'waist': 32})
+                self.update(history[-1])
+        with self.settings(MEASUREMENT_SNAPSHOT_INTERVAL=5):
+            for number, values in enumerate(history, start=1):
+                self.assertEqual(rebuild(self.measurement.id, number), values)
+            history.append({'chest': 44, 'waist': 30})
+            self.update(history[-1])
+            self.assertEqual(rebuild(self.measurement.id, len(history)), history[-1])
+
+    def test_history_predating_the_table_is_bootstrapped(self):
+        MeasurementRevision.objects.all().delete()
+        self.update({'chest': 40, 'waist': 32})
+        self.assertEqual(rebuild(self.measurement.id, 1), {'chest': 38, 'waist': 32})
+        self.assertEqual(rebuild(self.measurement.id, 2), {'chest': 40, 'waist': 32})
+
+
+class MeasurementSearchTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.template = MeasurementTemplate.objects.create(
+            garment_type='shirt', gender='male', display_name='Shirt', fields_json={'chest': 'Chest'}
+        )
+        self.by_chest = {}
+        for index, (chest, waist) in enumerate([(36, 30), (38, 32), (39.5, 34), (40, 36), (42, 38)]):
+            customer = Customer.objects.create(name=f'Customer {index}', phone=f'0171000000{index}')
+            self.by_chest[chest] = Measurement.objects.create(
+                customer=customer, garment_type='shirt', template=self.template,
+                measurements_json={'chest': chest, 'waist': str(waist), 'note': 'loose fit'},
+            )
+
+    def search(self, **params):
+        return self.client.get('/api/measurements/search/', {'garment_type': 'shirt', 'all': '1', **params})
+
+    def chests(self, response):
+        self.assertEqual(response.status_code, 200)
+        return sorted(row['measurements_json']['chest'] for row in response.json())
+
+    def test_range_and_multiple_fields(self):
+        self.assertEqual(self.chests(self.search(chest__gte=38, chest__lte=40)), [38, 39.5, 40])
+        self.assertEqual(self.chests(self.search(chest__gte=38, waist__lt=36)), [38, 39.5])
+        self.assertEqual(self.chests(self.search(chest=42)), [42])
+        self.assertEqual(self.chests(self.search(chest__gt=50)), [])
+        self.assertEqual(self.chests(self.client.get('/api/measurements/search/', {'garment_type': 'pant', 'chest': 38, 'all': '1'})), [])
+
+    def test_results_are_paginated_like_the_list(self):
+        response = self.client.get('/api/measurements/search/', {'garment_type': 'shirt', 'chest__gte': 0, 'page_size': 2})
+        self.assertEqual(len(response.json()['results']), 2)
+        self.assertIsNotNone(response.json()['next'])
+
+    def test_invalid_params(self):
+        self.assertEqual(self.search(chest__contains=38).status_code, 400)
+        self.assertEqual(self.search(chest__gte='wide').status_code, 400)
+        self.assertEqual(self.search().status_code, 400)
+        self.assertEqual(self.client.get('/api/measurements/search/', {'chest': 38}).status_code, 400)
+
+    def test_values_follow_measurement_changes(self):
+        measurement = self.by_chest[36]
+        self.assertEqual(MeasurementValue.objects.filter(measurement=measurement).count(), 2)  # note is not numeric
+        self.client.patch(f'/api/measurements/{measurement.id}/', {'measurements_json': {'chest': 44}}, format='json')
+        self.assertEqual(self.chests(self.search(chest__gte=43)), [44])
+        self.assertEqual(self.chests(self.search(waist=30)), [])
+
+    def test_search_uses_the_index(self):
+        queryset = search_measurements(Measurement.objects.all(), 'shirt', {'chest': {'value__gte': 38.0}})
+        self.assertIn('idx_measurement_values_search', queryset.explain())
+
+
+class MeasurementSimilarityTests(TestCase):
+    def setUp(self):
+        similarity.invalidate()
+        self.addCleanup(similarity.invalidate)
+        self.client = APIClient()
+        self.template = MeasurementTemplate.objects.create(
+            garment_type='shirt', gender='male', display_name='Shirt',
+            fields_json={'chest': 'Chest', 'waist': 'Waist', 'sleeve': 'Sleeve'},
+        )
+        self.rows = {}
+        for name, values in [
+            ('base', {'chest': 40, 'waist': 34, 'sleeve': 24}),
+            ('close', {'chest': 40.5, 'waist': 34, 'sleeve': 24}),
+            ('medium', {'chest': 42, 'waist': 35, 'sleeve': 25}),
+            ('far', {'chest': 48, 'waist': 42, 'sleeve': 27}),
+            ('partial', {'chest': 41, 'waist': 'n/a'}),  # only one comparable field
+        ]:
+            customer = Customer.objects.create(name=name, phone=f'017{len(self.rows):08d}')
+            self.rows[name] = Measurement.objects.create(
+                customer=customer, garment_type='shirt', template=self.template, measurements_json=values
+            )
+
+    def similar(self, name, **params):
+        response = self.client.get(f'/api/measurements/{self.rows[name].id}/similar/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_closest_first_without_self(self):
+        results = self.similar('base')
+        self.assertEqual([r['customer_name'] for r in results], ['close', 'medium', 'far'])
+        self.assertAlmostEqual(results[0]['distance'], math.sqrt(0.25 / 3), places=4)
+        self.assertEqual(results[0]['fields_compared'], 3)
+        self.assertEqual(len(self.similar('base', k=1)), 1)
+        self.assertEqual(self.client.get(f"/api/measurements/{self.rows['base'].id}/similar/", {'k': 0}).status_code, 400)
+
+    def test_index_updates_incrementally(self):
+        self.similar('base')  # build the index
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(
+                f"/api/measurements/{self.rows['far'].id}/",
+                {'measurements_json': {'chest': 40, 'waist': 34, 'sleeve': 24.1}}, format='json',
+            )
+        with CaptureQueriesContext(connection) as ctx:
+            results = self.similar('base')
+        self.assertEqual(results[0]['customer_name'], 'far')
+        self.assertFalse([q for q in ctx.captured_queries if 'measurements_json' in q['sql'] and 'IN' not in q['sql']])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.rows['close'].delete()
+        self.assertNotIn('close', [r['customer_name'] for r in self.similar('base')])
+
+    def test_rolled_back_save_does_not_reach_the_index(self):
+        self.similar('base')  # build the index
+        far = self.rows['far']
+        far.measurements_json = {'chest': 40, 'waist': 34, 'sleeve': 24}
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    far.save()
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(self.similar('base')[0]['customer_name'], 'close')
+
+    def test_numpy_and_python_paths_agree(self):
+        rows = [(i, {'chest': 30 + (i * 7) % 23, 'waist': 28 + (i * 5) % 17, 'sleeve': 20 + i % 9}) for i in range(1, 400)]
+        rows.append((400, {'chest': 35}))
+        fields = ['chest', 'waist', 'sleeve']
+        query = [36.0, 31.0, float('nan')]
+        numpy_module = similarity_module.numpy
+        try:
+            results = []
+            for engine in ([numpy_module] if numpy_module is not None else []) + [None]:
+                similarity_module.numpy = engine
+                index = TemplateIndex(self.template.id, fields, rows)
+                index.remove(7)
+                results.append(index.nearest(query, 15, exclude={1}))
+        finally:
+            similarity_module.numpy = numpy_module
+        for other in results[1:]:
+            self.assertEqual([r[0] for r in other], [r[0] for r in results[0]])
+            for a, b in zip(other, results[0]):
+                self.assertAlmostEqual(a[1], b[1])
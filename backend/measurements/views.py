@@ -1,31 +1,60 @@
+from django.db import transaction
 from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.response import Response
 import json
 
-from .models import MeasurementTemplate, Measurement
-from .serializers import MeasurementTemplateSerializer, MeasurementSerializer
+from dorji360.conditional import ConditionalGetMixin
+from dorji360.fastpath import FastListMixin, format_datetime
+from .history import rebuild
+from .models import MeasurementTemplate, Measurement, MeasurementRevision
+from .registry import templates as template_registry
+from .search import parse_search_params, search_measurements
+from .similarity import similarity
+from .serializers import (
+    MeasurementTemplateSerializer, MeasurementSerializer, MeasurementRevisionSerializer,
+    MEASUREMENT_LIST_COLUMNS, measurement_rows
+)
 
+# Largest k GET /api/measurements/{id}/similar/ accepts
+MAX_SIMILAR = 50
 
-class MeasurementTemplateViewSet(viewsets.ModelViewSet):
+
+def template_state(templates):
+    """(last_modified, count) validator for ConditionalGetMixin, computed without a query"""
+    return max((template.updated_at for template in templates), default=None), len(templates)
+
+
+class MeasurementTemplateViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = MeasurementTemplate.objects.all()
     serializer_class = MeasurementTemplateSerializer
+    pagination_class = None  # Small, static table
 
     def get_queryset(self):
-        from django.db.models import Q
-        queryset = MeasurementTemplate.objects.all()
-        garment_type = self.request.query_params.get('garment_type', None)
-        gender = self.request.query_params.get('gender', None)
-        
-        if garment_type:
-            queryset = queryset.filter(garment_type=garment_type)
-        if gender:
-            # Return templates matching the gender OR unisex templates
-            queryset = queryset.filter(Q(gender=gender) | Q(gender='unisex'))
-        
-        return queryset.order_by('-id')
+        # Write paths only; list/retrieve read the in-process registry
+        return MeasurementTemplate.objects.order_by('-id')
+
+    def list(self, request, *args, **kwargs):
+        templates = template_registry.filter(
+            garment_type=request.query_params.get('garment_type') or None,
+            gender=request.query_params.get('gender') or None,
+        )
+        return self.conditional_response(
+            request, template_state(templates), lambda: Response(self.get_serializer(templates, many=True).data),
+            collection=True,
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        template = template_registry.get(kwargs['pk'])
+        if template is None:
+            raise NotFound()
+        return self.conditional_response(
+            request, template_state([template]), lambda: Response(self.get_serializer(template).data)
+        )
 
 
-class MeasurementViewSet(viewsets.ModelViewSet):
+class MeasurementViewSet(FastListMixin, viewsets.ModelViewSet):
     queryset = Measurement.objects.select_related('customer', 'template').all()
     serializer_class = MeasurementSerializer
 
@@ -41,6 +70,12 @@ class MeasurementViewSet(viewsets.ModelViewSet):
         
         return queryset.order_by('-id')
 
+    def get_list_values(self, queryset):
+        return queryset.values(*MEASUREMENT_LIST_COLUMNS)
+
+    def build_list_rows(self, rows):
+        return measurement_rows(rows)
+
     def create(self, request, *args, **kwargs):
         # Handle customer_id and template_id from frontend
         data = request.data.copy()
@@ -59,10 +94,10 @@ class MeasurementViewSet(viewsets.ModelViewSet):
         
         # Convert template_id to template object
         if 'template_id' in data:
-            try:
-                template = MeasurementTemplate.objects.get(id=data.pop('template_id'))
+            template = template_registry.get_or_load(data.pop('template_id'))
+            if template is not None:
                 data['template'] = template.id
-            except MeasurementTemplate.DoesNotExist:
+            else:
                 return Response(
                     {'template_id': ['Invalid template ID']},
                     status=status.HTTP_400_BAD_REQUEST
@@ -74,6 +109,22 @@ class MeasurementViewSet(viewsets.ModelViewSet):
         headers = self.get_success_headers(serializer.data)
         return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
 
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            self.check_template_exists(serializer.validated_data.get('template'))
+            serializer.save()
+
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            self.check_template_exists(serializer.validated_data.get('template'))
+            serializer.save()
+
+    def check_template_exists(self, template):
+        """The registry may still hold a template another process deleted; fail with 400, not an IntegrityError"""
+        if template is not None and not MeasurementTemplate.objects.filter(pk=template.pk).exists():
+            template_registry.invalidate()
+            raise ValidationError({'template': [f'Invalid pk "{template.pk}" - object does not exist.']})
+
     def update(self, request, *args, **kwargs):
         partial = kwargs.pop('partial', False)
         instance = self.get_object()
@@ -92,3 +143,63 @@ class MeasurementViewSet(viewsets.ModelViewSet):
         serializer.is_valid(raise_exception=True)
         self.perform_update(serializer)
         return Response(serializer.data)
+
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """GET /api/measurements/search/?garment_type=shirt&chest__gte=38&chest__lte=40"""
+        garment_type = request.query_params.get('garment_type')
+        if not garment_type:
+            raise ValidationError({'garment_type': ["This parameter is required."]})
+        conditions = parse_search_params(request.query_params)
+        if not conditions:
+            raise ValidationError({'detail': ["Give at least one measurement filter, e.g. chest__gte=38."]})
+        return self.fast_list_response(search_measurements(self.get_queryset(), garment_type, conditions))
+
+    @action(detail=True, methods=['get'])
+    def similar(self, request, pk=None):
+        """GET /api/measurements/{id}/similar/?k=10 - closest measurements made with the same template"""
+        measurement = self.get_object()
+        try:
+            k = int(request.query_params.get('k', 10))
+        except ValueError:
+            raise ValidationError({'k': ["A whole number is required."]})
+        if not 1 <= k <= MAX_SIMILAR:
+            raise ValidationError({'k': [f"Choose between 1 and {MAX_SIMILAR}."]})
+
+        neighbours = similarity.similar(measurement, k=k)
+        ids = [measurement_id for measurement_id, _, _ in neighbours]
+        rows = {
+            row['id']: row
+            for row in measurement_rows(Measurement.objects.filter(id__in=ids).values(*MEASUREMENT_LIST_COLUMNS))
+        }
+        results = []
+        for measurement_id, distance, fields_compared in neighbours:
+            if measurement_id in rows:  # skip rows deleted by another process
+                results.append({**rows[measurement_id], 'distance': round(distance, 4), 'fields_compared': fields_compared})
+        return Response(results)
+
+    @action(detail=True, methods=['get'])
+    def revisions(self, request, pk=None):
+        """GET /api/measurements/{id}/revisions/ - stored revisions, oldest first"""
+        measurement = self.get_object()
+        revisions = MeasurementRevision.objects.filter(measurement=measurement).order_by('revision')
+        return Response(MeasurementRevisionSerializer(revisions, many=True).data)
+
+    @action(detail=True, methods=['get'], url_path=r'revisions/(?P<revision>\d+)')
+    def revision(self, request, pk=None, revision=None):
+        """GET /api/measurements/{id}/revisions/{n}/ - measurements_json rebuilt as of revision n"""
+        measurement = self.get_object()
+        values = rebuild(measurement.id, int(revision))
+        if values is None:
+            raise NotFound("No such revision")
+        created_at = (
+            MeasurementRevision.objects.filter(measurement=measurement, revision=revision)
+            .values_list('created_at', flat=True)
+            .get()
+        )
+        return Response({
+            'measurement_id': measurement.id,
+            'revision': int(revision),
+            'measurements_json': values,
+            'created_at': format_datetime(created_at),
+        })
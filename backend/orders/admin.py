@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Order, OrderItem
+from .models import Order, OrderItem, OrderStatusEvent
 
 
 class OrderItemInline(admin.TabularInline):
@@ -10,10 +10,10 @@ class OrderItemInline(admin.TabularInline):
 
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
-    list_display = ('id', 'customer', 'order_date', 'delivery_date', 'status', 'total_amount', 'created_at')
+    list_display = ('id', 'customer', 'order_date', 'delivery_date', 'status', 'total_amount', 'balance_due', 'created_at')
     list_filter = ('status', 'order_date', 'delivery_date', 'created_at')
     search_fields = ('customer__name', 'customer__phone', 'id')
-    readonly_fields = ('created_at', 'total_amount')
+    readonly_fields = ('created_at', 'total_amount', 'paid_amount', 'balance_due')
     ordering = ('-id',)
     inlines = [OrderItemInline]
     autocomplete_fields = ('customer',)
@@ -26,3 +26,13 @@ class OrderItemAdmin(admin.ModelAdmin):
     list_filter = ('garment_type',)
     search_fields = ('order__id', 'garment_type', 'fabric_details')
     autocomplete_fields = ('order',)
+
+
+@admin.register(OrderStatusEvent)
+class OrderStatusEventAdmin(admin.ModelAdmin):
+    list_display = ('id', 'order', 'from_status', 'to_status', 'changed_at')
+    list_filter = ('to_status', 'changed_at')
+    search_fields = ('order__id',)
+    readonly_fields = ('order', 'from_status', 'to_status', 'changed_at')
+    ordering = ('-id',)
+    date_hierarchy = 'changed_at'
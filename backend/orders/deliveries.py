@@ -1,49 +1,129 @@
 """
 Delivery views - Delivery is Order with computed fields, not a separate model
 """
+from datetime import date, timedelta
+
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
 from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
-from django.db.models import Sum
 
+from dorji360.pagination import IdCursorPagination
 from .models import Order
-from payments.serializers import DeliverySerializer
+
+# Columns needed for a delivery row; paid/balance come from the denormalized order columns
+DELIVERY_COLUMNS = (
+    'id', 'customer_id', 'customer__name', 'customer__phone', 'order_date',
+    'delivery_date', 'status', 'total_amount', 'notes', 'created_at',
+    'paid_amount', 'balance_due',
+)
+
+
+def delivery_queryset(start_date=None, end_date=None, status=None):
+    """Range-filtered delivery rows as a single SELECT (served by idx_orders_delivery_date)"""
+    queryset = Order.objects.all()
+    if start_date:
+        queryset = queryset.filter(delivery_date__gte=start_date)
+    if end_date:
+        queryset = queryset.filter(delivery_date__lte=end_date)
+    if status:
+        queryset = queryset.filter(status=status)
+    return queryset.values(*DELIVERY_COLUMNS)
+
+
+MAX_CALENDAR_DAYS = 366
+
+
+def parse_date_param(params, name):
+    value = params.get(name)
+    if not value:
+        raise ValidationError({name: ["This query parameter is required (YYYY-MM-DD)."]})
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise ValidationError({name: ["Invalid date, expected YYYY-MM-DD."]})
+
+
+def delivery_calendar(start, end, today=None):
+    """Per-day delivery buckets for [start, end] from one GROUP BY delivery_date query"""
+    today = today or timezone.localdate()
+    statuses = [code for code, _ in Order.STATUS_CHOICES]
+    counts = {code: Count('id', filter=Q(status=code)) for code in statuses}
+    rows = (
+        Order.objects.filter(delivery_date__range=(start, end))
+        .order_by()
+        .values('delivery_date')
+        .annotate(
+            total=Count('id'),
+            overdue=Count('id', filter=Q(delivery_date__lt=today) & ~Q(status='delivered')),
+            balance_due=Sum('balance_due'),
+            **counts,
+        )
+    )
+    by_day = {row['delivery_date']: row for row in rows}
+
+    buckets = []
+    day = start
+    while day <= end:
+        row = by_day.get(day, {})
+        buckets.append({
+            'date': day.isoformat(),
+            'total': row.get('total', 0),
+            'status_counts': {code: row.get(code, 0) for code in statuses},
+            'overdue': row.get('overdue', 0),
+            'balance_due': float(row.get('balance_due') or 0),
+        })
+        day += timedelta(days=1)
+    return buckets
+
+
+def serialize_delivery(row):
+    """Single-pass equivalent of DeliverySerializer for a delivery_queryset() row"""
+    return {
+        'id': row['id'],
+        'customer_id': row['customer_id'],
+        'customer_name': row['customer__name'],
+        'customer_phone': row['customer__phone'],
+        'order_date': row['order_date'].isoformat(),
+        'delivery_date': row['delivery_date'].isoformat(),
+        'status': row['status'],
+        'total_amount': float(row['total_amount']),
+        'notes': row['notes'],
+        'created_at': row['created_at'].isoformat(),
+        'paid_amount': float(row['paid_amount']),
+        'remaining_amount': float(row['balance_due']),
+    }
 
 
 class DeliveryViewSet(viewsets.ViewSet):
     """Delivery is Order with computed fields - not a separate model"""
+    pagination_class = IdCursorPagination
     
     def list(self, request):
-        queryset = Order.objects.select_related('customer').prefetch_related('payments').all()
-        
-        start_date = request.query_params.get('start_date', None)
-        end_date = request.query_params.get('end_date', None)
-        status_filter = request.query_params.get('status', None)
-        
-        if start_date:
-            queryset = queryset.filter(delivery_date__gte=start_date)
-        if end_date:
-            queryset = queryset.filter(delivery_date__lte=end_date)
-        if status_filter:
-            queryset = queryset.filter(status=status_filter)
+        queryset = delivery_queryset(
+            start_date=request.query_params.get('start_date', None),
+            end_date=request.query_params.get('end_date', None),
+            status=request.query_params.get('status', None),
+        )
         
-        deliveries = []
-        for order in queryset.order_by('-id'):
-            paid_amount = order.payments.aggregate(total=Sum('amount'))['total'] or 0
-            deliveries.append({
-                'id': order.id,
-                'customer_id': order.customer_id,
-                'customer_name': order.customer.name,
-                'customer_phone': order.customer.phone,
-                'order_date': order.order_date.isoformat(),
-                'delivery_date': order.delivery_date.isoformat(),
-                'status': order.status,
-                'total_amount': float(order.total_amount),
-                'notes': order.notes,
-                'created_at': order.created_at.isoformat(),
-                'paid_amount': float(paid_amount),
-                'remaining_amount': float(order.total_amount) - float(paid_amount),
-            })
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        rows = page if page is not None else queryset.order_by('-id')
         
-        serializer = DeliverySerializer(deliveries, many=True)
-        return Response(serializer.data)
+        deliveries = [serialize_delivery(row) for row in rows]
+        if page is not None:
+            return paginator.get_paginated_response(deliveries)
+        return Response(deliveries)
 
+    @action(detail=False, methods=['get'], url_path='calendar')
+    def calendar(self, request):
+        """One bucket per day between ?start= and ?end= (inclusive)"""
+        start = parse_date_param(request.query_params, 'start')
+        end = parse_date_param(request.query_params, 'end')
+        if end < start:
+            raise ValidationError({'end': ["Must not be before start."]})
+        if (end - start).days >= MAX_CALENDAR_DAYS:
+            raise ValidationError({'end': [f"Range is limited to {MAX_CALENDAR_DAYS} days."]})
+        return Response(delivery_calendar(start, end))
@@ -0,0 +1,142 @@
+"""
+Compare the serializer list path with the .values() fast path on synthetic rows
+"""
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Sum
+from rest_framework.renderers import JSONRenderer
+
+from customers.models import Customer
+from customers.serializers import CustomerSerializer, CUSTOMER_LIST_COLUMNS, customer_rows
+from dorji360.renderers import FastJSONRenderer, orjson
+from measurements.models import Measurement, MeasurementTemplate
+from measurements.serializers import MeasurementSerializer, MEASUREMENT_LIST_COLUMNS, measurement_rows
+from orders.deliveries import delivery_queryset, serialize_delivery
+from orders.models import Order, OrderItem
+from orders.serializers import (
+    OrderWithDetailsSerializer, ORDER_LIST_COLUMNS, ORDER_CUSTOMER_COLUMNS, order_rows
+)
+from payments.models import Payment
+from payments.serializers import DeliverySerializer
+
+
+class Command(BaseCommand):
+    help = "Benchmark serializer vs fast-path list rendering (data is rolled back afterwards)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000, help="Rows per table (default: 10000)")
+        parser.add_argument('--repeat', type=int, default=3, help="Best of N runs (default: 3)")
+
+    def seed(self, rows):
+        customers = Customer.objects.bulk_create(
+            Customer(name=f'Customer {i}', phone=f'017{i:08d}', address='Dhaka', notes='বাংলা নোট')
+            for i in range(rows)
+        )
+        template = MeasurementTemplate.objects.create(
+            garment_type='shirt', gender='male', display_name='Shirt (Male)',
+            fields_json={'chest': 'Chest', 'waist': 'Waist'},
+        )
+        Measurement.objects.bulk_create(
+            Measurement(customer=c, garment_type='shirt', template=template,
+                        measurements_json={'chest': 38 + i % 5, 'waist': 32.5})
+            for i, c in enumerate(customers)
+        )
+        start = date(2025, 1, 1)
+        orders = Order.objects.bulk_create(
+            Order(customer=c, delivery_date=start + timedelta(days=i % 365), total_amount=Decimal('1250.50'),
+                  paid_amount=Decimal('500.00'), balance_due=Decimal('750.50'), notes='Urgent' if i % 3 else None)
+            for i, c in enumerate(customers)
+        )
+        OrderItem.objects.bulk_create(
+            OrderItem(order=o, garment_type='shirt', quantity=2, price=Decimal('625.25'))
+            for o in orders
+        )
+        # Matches the denormalized paid_amount, so the per-order aggregate path agrees
+        Payment.objects.bulk_create(
+            Payment(order=o, amount=Decimal('500.00'), payment_type='advance', payment_method='cash')
+            for o in orders
+        )
+
+    def serializer_deliveries(self):
+        """The delivery list as the endpoint built it before the fast path: ORM rows, a payment SUM per order"""
+        deliveries = []
+        for order in Order.objects.select_related('customer').prefetch_related('payments').order_by('-id'):
+            paid_amount = order.payments.aggregate(total=Sum('amount'))['total'] or 0
+            deliveries.append({
+                'id': order.id,
+                'customer_id': order.customer_id,
+                'customer_name': order.customer.name,
+                'customer_phone': order.customer.phone,
+                'order_date': order.order_date.isoformat(),
+                'delivery_date': order.delivery_date.isoformat(),
+                'status': order.status,
+                'total_amount': float(order.total_amount),
+                'notes': order.notes,
+                'created_at': order.created_at.isoformat(),
+                'paid_amount': float(paid_amount),
+                'remaining_amount': float(order.total_amount) - float(paid_amount),
+            })
+        return DeliverySerializer(deliveries, many=True).data
+
+    def measure(self, func, repeat):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            output = func()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, output
+
+    def handle(self, *args, **options):
+        rows, repeat = options['rows'], options['repeat']
+        slow_renderer, fast_renderer = JSONRenderer(), FastJSONRenderer()
+        order_fields = list(OrderWithDetailsSerializer().fields)
+
+        cases = [
+            (
+                'customers',
+                lambda: CustomerSerializer(Customer.objects.order_by('-id'), many=True).data,
+                lambda: customer_rows(Customer.objects.order_by('-id').values(*CUSTOMER_LIST_COLUMNS)),
+            ),
+            (
+                'measurements',
+                lambda: MeasurementSerializer(
+                    Measurement.objects.select_related('customer', 'template').order_by('-id'), many=True
+                ).data,
+                lambda: measurement_rows(Measurement.objects.order_by('-id').values(*MEASUREMENT_LIST_COLUMNS)),
+            ),
+            (
+                'orders',
+                lambda: OrderWithDetailsSerializer(
+                    Order.objects.select_related('customer')
+                    .prefetch_related('items', 'staff_assignments__staff').order_by('-id'),
+                    many=True,
+                ).data,
+                lambda: order_rows(
+                    Order.objects.order_by('-id').values(*ORDER_LIST_COLUMNS, *ORDER_CUSTOMER_COLUMNS), order_fields
+                ),
+            ),
+            (
+                'deliveries',
+                self.serializer_deliveries,
+                lambda: [serialize_delivery(row) for row in delivery_queryset().order_by('-id')],
+            ),
+        ]
+
+        self.stdout.write(f"JSON encoder for fast path: {'orjson' if orjson else 'json (orjson not installed)'}")
+        with transaction.atomic():
+            self.seed(rows)
+            self.stdout.write(f"{'endpoint':<14}{'serializer':>12}{'fast path':>12}{'speedup':>10}")
+            for name, slow, fast in cases:
+                slow_time, slow_body = self.measure(lambda: slow_renderer.render(slow()), repeat)
+                fast_time, fast_body = self.measure(lambda: fast_renderer.render(fast()), repeat)
+                if slow_body != fast_body:
+                    raise CommandError(f"{name}: fast path output differs from the serializer output")
+                self.stdout.write(
+                    f"{name:<14}{slow_time * 1000:>10.0f}ms{fast_time * 1000:>10.0f}ms{slow_time / fast_time:>9.1f}x"
+                )
+            transaction.set_rollback(True)
@@ -0,0 +1,59 @@
+"""
+Rebuild and verify the denormalized Order.paid_amount/balance_due columns
+"""
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from orders.models import Order
+
+CENT = Decimal('0.01')
+
+
+class Command(BaseCommand):
+    help = "Recompute orders.paid_amount/balance_due from payments and verify them"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help="Only verify the stored columns; exit with an error if any order has drifted",
+        )
+
+    def find_mismatches(self):
+        rows = (
+            Order.objects.with_payment_totals()
+            .order_by('id')
+            .values_list('id', 'total_amount', 'paid_amount', 'balance_due', 'paid_total')
+        )
+        mismatches = []
+        for order_id, total, paid, balance, expected_paid in rows.iterator(chunk_size=2000):
+            expected_paid = Decimal(expected_paid).quantize(CENT)
+            expected_balance = (Decimal(total) - expected_paid).quantize(CENT)
+            if Decimal(paid).quantize(CENT) != expected_paid or Decimal(balance).quantize(CENT) != expected_balance:
+                mismatches.append((order_id, paid, expected_paid, balance, expected_balance))
+        return mismatches
+
+    def handle(self, *args, **options):
+        mismatches = self.find_mismatches()
+        for order_id, paid, expected_paid, balance, expected_balance in mismatches[:20]:
+            self.stdout.write(
+                f"Order #{order_id}: paid {paid} (expected {expected_paid}), "
+                f"balance {balance} (expected {expected_balance})"
+            )
+
+        if options['check']:
+            if mismatches:
+                raise CommandError(f"{len(mismatches)} order(s) have stale payment totals")
+            self.stdout.write(self.style.SUCCESS("All order balances are consistent"))
+            return
+
+        with transaction.atomic():
+            updated = Order.objects.all().refresh_payment_totals()
+        remaining = self.find_mismatches()
+        if remaining:
+            raise CommandError(f"{len(remaining)} order(s) still inconsistent after rebuild")
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt balances for {updated} order(s); fixed {len(mismatches)} stale row(s)"
+        ))
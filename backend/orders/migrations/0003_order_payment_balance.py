@@ -0,0 +1,51 @@
+# Generated by Django 5.0.1 on 2026-10-17 02:59
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import DecimalField, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_payment_totals(apps, schema_editor):
+    Order = apps.get_model('orders', 'Order')
+    Payment = apps.get_model('payments', 'Payment')
+
+    def paid_total():
+        paid = (
+            Payment.objects.filter(order=OuterRef('pk'))
+            .order_by()
+            .values('order')
+            .annotate(total=Sum('amount'))
+            .values('total')
+        )
+        return Coalesce(Subquery(paid), Value(Decimal('0')), output_field=DecimalField(max_digits=10, decimal_places=2))
+
+    Order.objects.update(paid_amount=paid_total(), balance_due=F('total_amount') - paid_total())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0002_customer_gender'),
+        ('orders', '0002_orderitem_measurement'),
+        ('payments', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='balance_due',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=10),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='paid_amount',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=10),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['balance_due'], name='idx_orders_balance_due'),
+        ),
+        migrations.RunPython(backfill_payment_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.0.1 on 2026-10-17 03:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0002_customer_gender'),
+        ('orders', '0003_order_payment_balance'),
+    ]
+
+    operations = [
+        # Databases initialised from database/schema.sql already have this index
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    'CREATE INDEX IF NOT EXISTS idx_orders_delivery_date ON orders (delivery_date)',
+                    'DROP INDEX IF EXISTS idx_orders_delivery_date',
+                ),
+            ],
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='order',
+                    index=models.Index(fields=['delivery_date'], name='idx_orders_delivery_date'),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.0.1 on 2026-10-17 03:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0004_order_delivery_date_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderStatusEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('from_status', models.CharField(choices=[('pending', 'Pending'), ('cutting', 'Cutting'), ('sewing', 'Sewing'), ('ready', 'Ready'), ('delivered', 'Delivered')], max_length=20)),
+                ('to_status', models.CharField(choices=[('pending', 'Pending'), ('cutting', 'Cutting'), ('sewing', 'Sewing'), ('ready', 'Ready'), ('delivered', 'Delivered')], max_length=20)),
+                ('changed_at', models.DateTimeField(auto_now_add=True)),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='status_events', to='orders.order')),
+            ],
+            options={
+                'db_table': 'order_status_events',
+                'ordering': ['changed_at', 'id'],
+                'indexes': [models.Index(fields=['order', 'changed_at'], name='idx_status_events_order'), models.Index(fields=['to_status', 'changed_at'], name='idx_status_events_status')],
+            },
+        ),
+    ]
@@ -1,8 +1,47 @@
+from decimal import Decimal
+
 from django.core.validators import MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models import DecimalField, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
 from customers.models import Customer
 
 
+def paid_total_expression():
+    """SUM(payments.amount) for the outer order row, 0 when it has no payments"""
+    from payments.models import Payment
+
+    paid = (
+        Payment.objects.filter(order=OuterRef('pk'))
+        .order_by()
+        .values('order')
+        .annotate(total=Sum('amount'))
+        .values('total')
+    )
+    return Coalesce(
+        Subquery(paid),
+        Value(Decimal('0')),
+        output_field=DecimalField(max_digits=10, decimal_places=2),
+    )
+
+
+class OrderQuerySet(models.QuerySet):
+    def with_payment_totals(self):
+        """Annotate each order with `paid_total` computed in the same SQL statement"""
+        return self.annotate(paid_total=paid_total_expression())
+
+    def refresh_payment_totals(self):
+        """Recompute the denormalized paid_amount/balance_due columns in one UPDATE"""
+        return self.update(
+            paid_amount=paid_total_expression(),
+            balance_due=F('total_amount') - paid_total_expression(),
+        )
+
+
+# Denormalized payment columns, written only by refresh_payment_totals and on insert
+BALANCE_FIELDS = ('paid_amount', 'balance_due')
+
+
 class Order(models.Model):
     STATUS_CHOICES = [
         ('pending', 'Pending'),
@@ -12,6 +51,15 @@ class Order(models.Model):
         ('delivered', 'Delivered'),
     ]
 
+    # Allowed moves for bulk status changes: one stage forward, or one back for rework
+    STATUS_TRANSITIONS = {
+        'pending': {'cutting'},
+        'cutting': {'sewing', 'pending'},
+        'sewing': {'ready', 'cutting'},
+        'ready': {'delivered', 'sewing'},
+        'delivered': {'ready'},
+    }
+
     customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='orders')
     order_date = models.DateField(auto_now_add=True)
     delivery_date = models.DateField()
@@ -19,14 +67,39 @@ class Order(models.Model):
     total_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0, validators=[MinValueValidator(0)])
     notes = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Denormalized payment totals, maintained by payments.signals
+    paid_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0, editable=False)
+    balance_due = models.DecimalField(max_digits=10, decimal_places=2, default=0, editable=False)
+
+    objects = OrderQuerySet.as_manager()
 
     class Meta:
         db_table = 'orders'
         ordering = ['-id']
+        indexes = [
+            models.Index(fields=['delivery_date'], name='idx_orders_delivery_date'),
+            models.Index(fields=['balance_due'], name='idx_orders_balance_due'),
+        ]
 
     def __str__(self):
         return f"Order #{self.id} - {self.customer.name}"
 
+    def save(self, *args, **kwargs):
+        if self._state.adding or kwargs.get('force_insert'):
+            self.balance_due = Decimal(str(self.total_amount)) - self.paid_amount
+            return super().save(*args, **kwargs)
+        # paid_amount belongs to payments.signals: a stale instance must not write back what it
+        # loaded, so updates skip both balance columns and balance_due is recomputed in SQL
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None:
+            update_fields = [field.name for field in self._meta.concrete_fields if not field.primary_key]
+        kwargs['update_fields'] = [name for name in update_fields if name not in BALANCE_FIELDS]
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            orders = Order.objects.filter(pk=self.pk)
+            orders.update(balance_due=F('total_amount') - F('paid_amount'))
+            self.paid_amount, self.balance_due = orders.values_list('paid_amount', 'balance_due').get()
+
 
 class OrderItem(models.Model):
     order = models.ForeignKey('Order', on_delete=models.CASCADE, related_name='items')
@@ -41,3 +114,22 @@ class OrderItem(models.Model):
 
     def __str__(self):
         return f"{self.garment_type} x{self.quantity}"
+
+
+class OrderStatusEvent(models.Model):
+    """Append-only log of order status changes"""
+    order = models.ForeignKey('Order', on_delete=models.CASCADE, related_name='status_events')
+    from_status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    to_status = models.CharField(max_length=20, choices=Order.STATUS_CHOICES)
+    changed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'order_status_events'
+        ordering = ['changed_at', 'id']
+        indexes = [
+            models.Index(fields=['order', 'changed_at'], name='idx_status_events_order'),
+            models.Index(fields=['to_status', 'changed_at'], name='idx_status_events_status'),
+        ]
+
+    def __str__(self):
+        return f"Order #{self.order_id}: {self.from_status} -> {self.to_status}"
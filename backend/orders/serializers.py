@@ -1,8 +1,27 @@
-from django.db.models import Sum
+from collections import defaultdict
+
 from rest_framework import serializers
-from .models import Order, OrderItem
+
+from dorji360.fastpath import decimal_to_float, format_date, format_datetime
+from .models import Order, OrderItem, OrderStatusEvent
+from payments.models import Payment
 from staff.models import OrderStaffAssignment
 
+# ?expand= name -> (serializer field, prefetch_related lookup)
+ORDER_EXPANSIONS = {
+    'items': ('items', 'items'),
+    'staff': ('assigned_staff', 'staff_assignments__staff'),
+    'payments': ('payments', 'payments'),
+}
+DEFAULT_ORDER_EXPANSIONS = ('items', 'staff')
+
+
+def parse_list_param(value):
+    """Parse a comma-separated query parameter into a set, or None when absent"""
+    if value is None:
+        return None
+    return {part.strip() for part in value.split(',') if part.strip()}
+
 
 class OrderItemSerializer(serializers.ModelSerializer):
     price = serializers.SerializerMethodField()
@@ -39,13 +58,33 @@ class OrderSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
 
+class OrderPaymentSerializer(serializers.ModelSerializer):
+    amount = serializers.SerializerMethodField()
+    date = serializers.DateField(format='%Y-%m-%d')
+    created_at = serializers.DateTimeField(format='%Y-%m-%d %H:%M:%S', read_only=True)
+
+    class Meta:
+        model = Payment
+        fields = ['id', 'amount', 'payment_type', 'payment_method', 'date', 'notes', 'created_at']
+
+    def get_amount(self, obj):
+        return float(obj.amount)
+
+
 class OrderWithDetailsSerializer(serializers.ModelSerializer):
+    """
+    Order with customer, totals and optional nested relations.
+
+    `?expand=items,staff,payments` picks the nested relations (default: items,staff)
+    and `?fields=id,status,...` limits the remaining top-level fields.
+    """
     customer_name = serializers.CharField(source='customer.name', read_only=True)
     customer_phone = serializers.CharField(source='customer.phone', read_only=True)
     items = OrderItemSerializer(many=True, read_only=True)
     paid_amount = serializers.SerializerMethodField()
     remaining_amount = serializers.SerializerMethodField()
     assigned_staff = serializers.SerializerMethodField()
+    payments = OrderPaymentSerializer(many=True, read_only=True)
     total_amount = serializers.SerializerMethodField()
     order_date = serializers.DateField(format='%Y-%m-%d')
     delivery_date = serializers.DateField(format='%Y-%m-%d')
@@ -57,19 +96,39 @@ class OrderWithDetailsSerializer(serializers.ModelSerializer):
             'id', 'customer_id', 'customer_name', 'customer_phone',
             'order_date', 'delivery_date', 'status', 'total_amount',
             'notes', 'created_at', 'items', 'paid_amount',
-            'remaining_amount', 'assigned_staff'
+            'remaining_amount', 'assigned_staff', 'payments'
         ]
         read_only_fields = ['id', 'created_at']
 
+    def __init__(self, *args, fields=None, expand=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is not None:
+            if fields is None:
+                fields = parse_list_param(request.query_params.get('fields'))
+            if expand is None:
+                expand = parse_list_param(request.query_params.get('expand'))
+        if expand is None:
+            expand = set(DEFAULT_ORDER_EXPANSIONS)
+
+        relation_fields = set()
+        for name, (field_name, _) in ORDER_EXPANSIONS.items():
+            if name in expand:
+                relation_fields.add(field_name)
+            else:
+                self.fields.pop(field_name)
+        if fields is not None:
+            for field_name in set(self.fields) - set(fields) - relation_fields:
+                self.fields.pop(field_name)
+
     def get_total_amount(self, obj):
         return float(obj.total_amount)
 
     def get_paid_amount(self, obj):
-        return float(obj.payments.aggregate(total=Sum('amount'))['total'] or 0)
+        return float(obj.paid_amount)
 
     def get_remaining_amount(self, obj):
-        paid = self.get_paid_amount(obj)
-        return float(obj.total_amount) - paid
+        return float(obj.balance_due)
 
     def get_assigned_staff(self, obj):
         assignments = obj.staff_assignments.all()
@@ -86,6 +145,91 @@ class OrderWithDetailsSerializer(serializers.ModelSerializer):
         ]
 
 
+ORDER_LIST_COLUMNS = (
+    'id', 'customer_id', 'order_date', 'delivery_date', 'status', 'total_amount',
+    'notes', 'created_at', 'paid_amount', 'balance_due',
+)
+ORDER_CUSTOMER_COLUMNS = ('customer__name', 'customer__phone')
+
+
+def order_rows(rows, field_names):
+    """
+    Fast-path equivalent of OrderWithDetailsSerializer(many=True).
+
+    `rows` come from .values(*ORDER_LIST_COLUMNS[, *ORDER_CUSTOMER_COLUMNS]) and
+    `field_names` are the serializer's fields after ?fields=/?expand=; each nested
+    relation costs one extra query for the whole page.
+    """
+    rows = list(rows)
+    ids = [row['id'] for row in rows]
+
+    items = defaultdict(list)
+    if 'items' in field_names:
+        for item in OrderItem.objects.filter(order_id__in=ids).values(
+            'id', 'order_id', 'garment_type', 'quantity', 'price', 'fabric_details', 'measurement_id'
+        ):
+            items[item['order_id']].append({
+                'id': item['id'],
+                'order_id': item['order_id'],
+                'garment_type': item['garment_type'],
+                'quantity': item['quantity'],
+                'price': float(item['price']),
+                'fabric_details': item['fabric_details'],
+                'measurement_id': item['measurement_id'],
+            })
+
+    staff = defaultdict(list)
+    if 'assigned_staff' in field_names:
+        for a in OrderStaffAssignment.objects.filter(order_id__in=ids).values(
+            'id', 'order_id', 'staff_id', 'staff__name', 'staff__role', 'assigned_date', 'notes'
+        ):
+            staff[a['order_id']].append({
+                'id': a['id'],
+                'staff_id': a['staff_id'],
+                'staff_name': a['staff__name'],
+                'staff_role': a['staff__role'],
+                'assigned_date': a['assigned_date'].isoformat(),
+                'notes': a['notes'],
+            })
+
+    payments = defaultdict(list)
+    if 'payments' in field_names:
+        for p in Payment.objects.filter(order_id__in=ids).values(
+            'id', 'order_id', 'amount', 'payment_type', 'payment_method', 'date', 'notes', 'created_at'
+        ):
+            payments[p['order_id']].append({
+                'id': p['id'],
+                'amount': float(p['amount']),
+                'payment_type': p['payment_type'],
+                'payment_method': p['payment_method'],
+                'date': format_date(p['date']),
+                'notes': p['notes'],
+                'created_at': format_datetime(p['created_at']),
+            })
+
+    result = []
+    for row in rows:
+        full = {
+            'id': row['id'],
+            'customer_id': row['customer_id'],
+            'customer_name': row.get('customer__name'),
+            'customer_phone': row.get('customer__phone'),
+            'order_date': format_date(row['order_date']),
+            'delivery_date': format_date(row['delivery_date']),
+            'status': row['status'],
+            'total_amount': decimal_to_float(row['total_amount']),
+            'notes': row['notes'],
+            'created_at': format_datetime(row['created_at']),
+            'items': items[row['id']],
+            'paid_amount': decimal_to_float(row['paid_amount']),
+            'remaining_amount': decimal_to_float(row['balance_due']),
+            'assigned_staff': staff[row['id']],
+            'payments': payments[row['id']],
+        }
+        result.append({name: full[name] for name in field_names})
+    return result
+
+
 class OrderCreateSerializer(serializers.Serializer):
     customer_id = serializers.IntegerField()
     order_date = serializers.DateField(required=False)
@@ -98,3 +242,19 @@ class OrderCreateSerializer(serializers.Serializer):
         allow_empty=True
     )
 
+
+class OrderBulkCreateSerializer(serializers.Serializer):
+    orders = OrderCreateSerializer(many=True, allow_empty=False, max_length=100)
+
+
+class OrderBulkStatusSerializer(serializers.Serializer):
+    order_ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, max_length=500)
+    status = serializers.ChoiceField(choices=Order.STATUS_CHOICES)
+
+
+class OrderStatusEventSerializer(serializers.ModelSerializer):
+    changed_at = serializers.DateTimeField(format='%Y-%m-%d %H:%M:%S', read_only=True)
+
+    class Meta:
+        model = OrderStatusEvent
+        fields = ['id', 'order_id', 'from_status', 'to_status', 'changed_at']
@@ -0,0 +1,7 @@
+"""
+Signals for order changes that bypass Model.save (bulk UPDATEs)
+"""
+from django.dispatch import Signal
+
+# Sent after a bulk status UPDATE with `order_ids` and `status`
+order_status_changed = Signal()
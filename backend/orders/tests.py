@@ -1,3 +1,360 @@
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import IntegrityError, connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from customers.models import Customer
+from measurements.models import Measurement, MeasurementTemplate
+from payments.models import Payment
+from payments.serializers import DeliverySerializer
+from staff.models import Staff, OrderStaffAssignment
+from .models import Order, OrderItem, OrderStatusEvent
+from .serializers import OrderWithDetailsSerializer
+
+
+def make_order(customer, total=Decimal('1000.00'), paid=(), staff=None, **kwargs):
+    order = Order.objects.create(
+        customer=customer,
+        delivery_date=kwargs.pop('delivery_date', date(2025, 12, 1)),
+        total_amount=total,
+        **kwargs
+    )
+    OrderItem.objects.create(order=order, garment_type='shirt', quantity=1, price=total)
+    for amount in paid:
+        Payment.objects.create(order=order, amount=amount, payment_type='partial', payment_method='cash')
+    if staff is not None:
+        OrderStaffAssignment.objects.create(order=order, staff=staff)
+    return order
+
+
+class OrderListPaymentTotalsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.customer = Customer.objects.create(name='Rahim', phone='01712345678')
+        self.staff = Staff.objects.create(name='Karim', phone='01800000000', role='tailor')
+
+    def count_list_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/orders/', {'all': '1'})
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response.json()
+
+    def test_paid_and_remaining_amounts(self):
+        make_order(self.customer, total=Decimal('1500.00'), paid=[Decimal('500.00'), Decimal('250.50')])
+        make_order(self.customer, total=Decimal('800.00'))
+
+        _, data = self.count_list_queries()
+        unpaid, partly_paid = data
+        self.assertEqual(partly_paid['paid_amount'], 750.5)
+        self.assertEqual(partly_paid['remaining_amount'], 749.5)
+        self.assertEqual(unpaid['paid_amount'], 0.0)
+        self.assertEqual(unpaid['remaining_amount'], 800.0)
+
+    def test_list_query_count_is_constant(self):
+        make_order(self.customer, paid=[Decimal('100.00')], staff=self.staff)
+        baseline, _ = self.count_list_queries()
+
+        for _ in range(10):
+            make_order(self.customer, paid=[Decimal('100.00'), Decimal('50.00')], staff=self.staff)
+        queries, data = self.count_list_queries()
+
+        self.assertEqual(len(data), 11)
+        self.assertEqual(queries, baseline)
+
+    def test_retrieve_returns_balance(self):
+        order = make_order(self.customer, total=Decimal('300.00'), paid=[Decimal('120.00')])
+        response = self.client.get(f'/api/orders/{order.id}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['paid_amount'], 120.0)
+        self.assertEqual(response.json()['remaining_amount'], 180.0)
+
+
+class RebuildOrderBalancesCommandTests(TestCase):
+    def setUp(self):
+        self.customer = Customer.objects.create(name='Rahim', phone='01712345678')
+
+    def test_check_detects_and_rebuild_fixes_drift(self):
+        order = make_order(self.customer, total=Decimal('900.00'), paid=[Decimal('400.00')])
+        Order.objects.filter(pk=order.pk).update(paid_amount=0, balance_due=Decimal('900.00'))
+
+        with self.assertRaises(CommandError):
+            call_command('rebuild_order_balances', '--check', stdout=StringIO())
+
+        call_command('rebuild_order_balances', stdout=StringIO())
+        order.refresh_from_db()
+        self.assertEqual(order.paid_amount, Decimal('400.00'))
+        self.assertEqual(order.balance_due, Decimal('500.00'))
+        call_command('rebuild_order_balances', '--check', stdout=StringIO())
+
+
+class DeliveryListTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.customer = Customer.objects.create(name='Rahim', phone='01712345678')
+
+    def fetch(self, **params):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/deliveries/', {'all': '1', **params})
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response.json()
+
+    def test_output_matches_delivery_serializer(self):
+        order = make_order(self.customer, total=Decimal('1200.00'), paid=[Decimal('200.00')], notes='Urgent')
+        _, data = self.fetch()
+
+        order.refresh_from_db()
+        expected = DeliverySerializer([{
+            'id': order.id,
+            'customer_id': order.customer_id,
+            'customer_name': order.customer.name,
+            'customer_phone': order.customer.phone,
+            'order_date': order.order_date.isoformat(),
+            'delivery_date': order.delivery_date.isoformat(),
+            'status': order.status,
+            'total_amount': float(order.total_amount),
+            'notes': order.notes,
+            'created_at': order.created_at.isoformat(),
+            'paid_amount': 200.0,
+            'remaining_amount': 1000.0,
+        }], many=True).data
+        self.assertEqual(data, expected)
+
+    def test_date_range_filter(self):
+        inside = make_order(self.customer, delivery_date=date(2025, 12, 10))
+        make_order(self.customer, delivery_date=date(2025, 11, 30))
+        make_order(self.customer, delivery_date=date(2026, 1, 1))
+        _, data = self.fetch(start_date='2025-12-01', end_date='2025-12-31')
+        self.assertEqual([d['id'] for d in data], [inside.id])
+
+    def test_query_count_is_fixed(self):
+        make_order(self.customer, paid=[Decimal('10.00')])
+        baseline, _ = self.fetch()
+        for _ in range(20):
+            make_order(self.customer, paid=[Decimal('10.00'), Decimal('5.00')])
+        queries, data = self.fetch()
+        self.assertEqual(len(data), 21)
+        self.assertEqual(queries, baseline)
+        self.assertEqual(queries, 1)
+
+    def test_paginated_by_cursor(self):
+        for _ in range(3):
+            make_order(self.customer)
+        first = self.client.get('/api/deliveries/', {'page_size': 2}).json()
+        second = self.client.get(first['next']).json()
+        self.assertEqual(len(first['results']), 2)
+        self.assertEqual(len(second['results']), 1)
+        self.assertIsNone(second['next'])
+
+
+class DeliveryCalendarTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.customer = Customer.objects.create(name='Rahim', phone='01712345678')
+
+    def test_daily_buckets(self):
+        make_order(self.customer, total=Decimal('500.00'), paid=[Decimal('100.00')], delivery_date=date(2020, 1, 2))
+        make_order(self.customer, total=Decimal('300.00'), delivery_date=date(2020, 1, 2), status='ready')
+        make_order(self.customer, total=Decimal('300.00'), delivery_date=date(2020, 1, 2), status='delivered')
+        make_order(self.customer, delivery_date=date(2020, 2, 1))
+
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/deliveries/calendar/', {'start': '2020-01-01', 'end': '2020-01-03'})
+        self.assertEqual(response.status_code, 200)
+        empty, busy, _ = response.json()
+
+        self.assertEqual(empty, {
+            'date': '2020-01-01', 'total': 0, 'overdue': 0, 'balance_due': 0.0,
+            'status_counts': {'pending': 0, 'cutting': 0, 'sewing': 0, 'ready': 0, 'delivered': 0},
+        })
+        self.assertEqual(busy['total'], 3)
+        self.assertEqual(busy['status_counts']['pending'], 1)
+        self.assertEqual(busy['status_counts']['ready'], 1)
+        self.assertEqual(busy['overdue'], 2)
+        self.assertEqual(busy['balance_due'], 1000.0)
+
+    def test_requires_valid_range(self):
+        self.assertEqual(self.client.get('/api/deliveries/calendar/', {'start': '2020-01-01'}).status_code, 400)
+        self.assertEqual(
+            self.client.get('/api/deliveries/calendar/', {'start': '2020-02-01', 'end': '2020-01-01'}).status_code, 400
+        )
+
+
+class OrderCreateTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.customer = Customer.objects.create(name='Rahim', phone='01712345678')
+        self.staff = Staff.objects.create(name='Karim', phone='01800000000', role='tailor')
+
+    def order_payload(self, customer_id=None, **extra):
+        return {
+            'customer_id': customer_id or self.customer.id,
+            'delivery_date': '2025-12-01',
+            'items': [
+                {'garment_type': 'shirt', 'quantity': 2, 'price': '450.00'},
+                {'garment_type': 'pant', 'quantity': 1, 'price': '600.50'},
+            ],
+            'assigned_staff_ids': [self.staff.id, self.staff.id],
+            **extra,
+        }
+
+    def test_create_order(self):
+        response = self.client.post('/api/orders/', self.order_payload(), format='json')
+        self.assertEqual(response.status_code, 201)
+        data = response.json()
+        self.assertEqual(data['total_amount'], 1500.5)
+        self.assertEqual(data['remaining_amount'], 1500.5)
+        self.assertEqual(len(data['items']), 2)
+        self.assertEqual([a['staff_id'] for a in data['assigned_staff']], [self.staff.id])
+
+    def test_unknown_references_are_rejected_without_writes(self):
+        payload = self.order_payload(assigned_staff_ids=[self.staff.id, 9999])
+        payload['items'][0]['measurement_id'] = 8888
+        response = self.client.post('/api/orders/', payload, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('measurement_id', response.json())
+        self.assertIn('assigned_staff_ids', response.json())
+        self.assertFalse(Order.objects.exists())
+
+    def test_reference_removed_after_the_check_is_a_400(self):
+        failure = IntegrityError('FOREIGN KEY constraint failed')
+        with patch.object(OrderStaffAssignment.objects, 'bulk_create', side_effect=failure):
+            response = self.client.post('/api/orders/', self.order_payload(), format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('detail', response.json())
+        self.assertFalse(Order.objects.exists())
+
+    def test_bulk_create_uses_constant_queries(self):
+        other = Customer.objects.create(name='Salma', phone='01911111111')
+        small = {'orders': [self.order_payload()]}
+        with CaptureQueriesContext(connection) as one:
+            self.assertEqual(self.client.post('/api/orders/bulk/', small, format='json').status_code, 201)
+
+        family = {'orders': [self.order_payload(customer_id=c.id) for c in [self.customer, other] * 3]}
+        with CaptureQueriesContext(connection) as six:
+            response = self.client.post('/api/orders/bulk/', family, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.json()), 6)
+        self.assertEqual(OrderItem.objects.count(), 14)
+        # Only the per-order INSERT grows with the batch size
+        self.assertEqual(len(six.captured_queries) - len(one.captured_queries), 5)
+
+    def test_bulk_create_is_atomic(self):
+        payload = {'orders': [self.order_payload(), self.order_payload(customer_id=9999)]}
+        response = self.client.post('/api/orders/bulk/', payload, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Order.objects.exists())
+
+
+class OrderBulkStatusTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.customer = Customer.objects.create(name='Rahim', phone='01712345678')
+
+    def post(self, order_ids, new_status):
+        return self.client.post('/api/orders/bulk-status/', {'order_ids': order_ids, 'status': new_status}, format='json')
+
+    def test_moves_orders_and_logs_events(self):
+        orders = [make_order(self.customer, status='cutting') for _ in range(3)]
+        done = make_order(self.customer, status='sewing')
+        ids = [o.id for o in orders] + [done.id]
+
+        response = self.post(ids, 'sewing')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['updated'], sorted(o.id for o in orders))
+        self.assertEqual(response.json()['unchanged'], [done.id])
+        self.assertEqual(Order.objects.filter(status='sewing').count(), 4)
+        self.assertEqual(
+            set(OrderStatusEvent.objects.values_list('from_status', 'to_status')),
+            {('cutting', 'sewing')},
+        )
+        self.assertEqual(OrderStatusEvent.objects.count(), 3)
+
+    def test_disallowed_transition_rejects_whole_batch(self):
+        ok = make_order(self.customer, status='cutting')
+        skip = make_order(self.customer, status='pending')
+        response = self.post([ok.id, skip.id, 9999], 'sewing')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(len(response.json()['order_ids']), 2)
+        self.assertEqual(Order.objects.get(id=ok.id).status, 'cutting')
+        self.assertFalse(OrderStatusEvent.objects.exists())
+
+    def test_status_history_reports_stages(self):
+        order = make_order(self.customer)
+        self.post([order.id], 'cutting')
+        self.client.put(f'/api/orders/{order.id}/', {'status': 'sewing'}, format='json')
+
+        data = self.client.get(f'/api/orders/{order.id}/status-history/').json()
+        self.assertEqual([(e['from_status'], e['to_status']) for e in data['events']], [('pending', 'cutting'), ('cutting', 'sewing')])
+        self.assertEqual([s['status'] for s in data['stages']], ['pending', 'cutting', 'sewing'])
+        self.assertIsNone(data['stages'][-1]['ended_at'])
+
+
+class OrderSparseFieldsetTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.customer = Customer.objects.create(name='Rahim', phone='01712345678')
+        self.staff = Staff.objects.create(name='Karim', phone='01800000000', role='tailor')
+        self.order = make_order(self.customer, paid=[Decimal('100.00')], staff=self.staff)
+
+    def fetch(self, **params):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get('/api/orders/', {'all': '1', **params})
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response.json()[0]
+
+    def test_default_shape_is_unchanged(self):
+        _, row = self.fetch()
+        self.assertIn('items', row)
+        self.assertIn('assigned_staff', row)
+        self.assertNotIn('payments', row)
+
+    def test_fields_without_expansions_skip_prefetches(self):
+        queries, row = self.fetch(fields='id,customer_name,status,delivery_date', expand='')
+        self.assertEqual(set(row), {'id', 'customer_name', 'status', 'delivery_date'})
+        self.assertEqual(queries, 1)
+
+    def test_expand_payments(self):
+        _, row = self.fetch(fields='id', expand='payments')
+        self.assertEqual(set(row), {'id', 'payments'})
+        self.assertEqual(row['payments'][0]['amount'], 100.0)
+
+    def test_unknown_expansion_is_rejected(self):
+        response = self.client.get('/api/orders/', {'expand': 'customer'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_retrieve_and_update_honour_fields(self):
+        row = self.client.get(f'/api/orders/{self.order.id}/', {'fields': 'id,status', 'expand': ''}).json()
+        self.assertEqual(set(row), {'id', 'status'})
+        row = self.client.patch(
+            f'/api/orders/{self.order.id}/?fields=id,notes&expand=', {'notes': 'Rush'}, format='json'
+        ).json()
+        self.assertEqual(row, {'id': self.order.id, 'notes': 'Rush'})
+
+
+class OrderFastListTests(TestCase):
+    def test_fast_list_matches_serializer(self):
+        customer = Customer.objects.create(name='রহিম', phone='01712345678')
+        staff = Staff.objects.create(name='Karim', phone='01800000000', role='tailor')
+        template = MeasurementTemplate.objects.create(
+            garment_type='shirt', gender='male', display_name='Shirt (Male)', fields_json={'chest': 'Chest'}
+        )
+        measurement = Measurement.objects.create(customer=customer, garment_type='shirt', template=template, measurements_json={'chest': 38})
+        order = make_order(customer, total=Decimal('999.99'), paid=[Decimal('0.10'), Decimal('0.20')], staff=staff, notes='জরুরি')
+        OrderItem.objects.create(order=order, garment_type='pant', quantity=3, price=Decimal('10.01'), measurement=measurement)
+        make_order(customer)
 
-# Create your tests here.
+        expand = {'items', 'staff', 'payments'}
+        response = APIClient().get('/api/orders/', {'all': '1', 'expand': ','.join(expand)})
+        queryset = Order.objects.select_related('customer').prefetch_related(
+            'items', 'staff_assignments__staff', 'payments'
+        ).order_by('-id')
+        expected = JSONRenderer().render(OrderWithDetailsSerializer(queryset, many=True, expand=expand).data)
+        self.assertEqual(response.content, expected)
@@ -2,29 +2,185 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.exceptions import NotFound, ValidationError
+from django.db import IntegrityError, transaction
 from django.utils import timezone
 
-from .models import Order, OrderItem
+from .models import Order, OrderItem, OrderStatusEvent
 from .serializers import (
-    OrderSerializer, OrderWithDetailsSerializer, OrderCreateSerializer
+    OrderSerializer, OrderWithDetailsSerializer, OrderCreateSerializer, OrderBulkCreateSerializer,
+    OrderBulkStatusSerializer, OrderStatusEventSerializer,
+    ORDER_EXPANSIONS, DEFAULT_ORDER_EXPANSIONS, ORDER_LIST_COLUMNS, ORDER_CUSTOMER_COLUMNS,
+    order_rows, parse_list_param
 )
+from .signals import order_status_changed
+from customers.models import Customer
+from dorji360.fastpath import FastListMixin
+from measurements.models import Measurement
 from staff.models import Staff, OrderStaffAssignment
 from staff.serializers import OrderStaffAssignmentSerializer, OrderStaffAssignmentCreateSerializer
 
 
-class OrderViewSet(viewsets.ModelViewSet):
-    queryset = Order.objects.select_related('customer').prefetch_related('items', 'payments', 'staff_assignments__staff').all()
+def missing_ids(model, ids):
+    """Return the ids in `ids` that do not exist, using one id__in query"""
+    if not ids:
+        return []
+    found = set(model.objects.filter(id__in=ids).values_list('id', flat=True))
+    return sorted(set(ids) - found)
+
+
+def check_references(orders_data):
+    """Raise ValidationError naming every customer, measurement and staff id that does not exist"""
+    customer_ids = {data['customer_id'] for data in orders_data}
+    measurement_ids = {
+        item['measurement_id']
+        for data in orders_data for item in data['items']
+        if item.get('measurement_id')
+    }
+    staff_ids = {staff_id for data in orders_data for staff_id in data.get('assigned_staff_ids') or []}
+
+    errors = {}
+    for field, model, ids in (
+        ('customer_id', Customer, customer_ids),
+        ('measurement_id', Measurement, measurement_ids),
+        ('assigned_staff_ids', Staff, staff_ids),
+    ):
+        unknown = missing_ids(model, ids)
+        if unknown:
+            errors[field] = [f"Unknown id(s): {', '.join(map(str, unknown))}"]
+    if errors:
+        raise ValidationError(errors)
+
+
+def create_orders(orders_data):
+    """
+    Create orders with their items and staff assignments in one transaction.
+
+    Every referenced customer, measurement and staff id is checked inside that
+    transaction with one query per table; items and assignments are inserted with
+    bulk_create. A row deleted by another process after the check fails the
+    foreign key instead, and is reported as a validation error too.
+    """
+    today = timezone.now().date()
+    orders = []
+    items = []
+    assignments = []
+    try:
+        with transaction.atomic():
+            check_references(orders_data)
+            for data in orders_data:
+                total_amount = sum(item['price'] * item['quantity'] for item in data['items'])
+                order = Order.objects.create(
+                    customer_id=data['customer_id'],
+                    order_date=data.get('order_date') or today,
+                    delivery_date=data['delivery_date'],
+                    notes=data.get('notes', ''),
+                    total_amount=total_amount,
+                )
+                orders.append(order)
+                items.extend(
+                    OrderItem(
+                        order=order,
+                        garment_type=item['garment_type'],
+                        quantity=item['quantity'],
+                        price=item['price'],
+                        fabric_details=item.get('fabric_details', ''),
+                        measurement_id=item.get('measurement_id') or None,
+                    )
+                    for item in data['items']
+                )
+                assignments.extend(
+                    OrderStaffAssignment(order=order, staff_id=staff_id, assigned_date=today)
+                    for staff_id in dict.fromkeys(data.get('assigned_staff_ids') or [])
+                )
+            OrderItem.objects.bulk_create(items)
+            OrderStaffAssignment.objects.bulk_create(assignments)
+    except IntegrityError:
+        check_references(orders_data)  # names the vanished ids when they are still gone
+        raise ValidationError({'detail': ["A referenced customer, measurement or staff member was just removed."]})
+    return orders
+
+
+def change_order_status(order_ids, new_status):
+    """
+    Move many orders to `new_status` with one UPDATE, all or nothing.
+
+    Every order must exist and be allowed to make the transition
+    (Order.STATUS_TRANSITIONS); each change is appended to order_status_events.
+    Returns the ids that actually changed.
+    """
+    with transaction.atomic():
+        current = dict(
+            Order.objects.select_for_update().filter(id__in=order_ids).values_list('id', 'status')
+        )
+        errors = [f"Order #{order_id} not found" for order_id in sorted(set(order_ids) - set(current))]
+        errors += [
+            f"Order #{order_id} cannot move from {old_status} to {new_status}"
+            for order_id, old_status in sorted(current.items())
+            if old_status != new_status and new_status not in Order.STATUS_TRANSITIONS[old_status]
+        ]
+        if errors:
+            raise ValidationError({'order_ids': errors})
+
+        changed = sorted(order_id for order_id, old_status in current.items() if old_status != new_status)
+        Order.objects.filter(id__in=changed).update(status=new_status)
+        OrderStatusEvent.objects.bulk_create(
+            OrderStatusEvent(order_id=order_id, from_status=current[order_id], to_status=new_status)
+            for order_id in changed
+        )
+    if changed:
+        order_status_changed.send(sender=Order, order_ids=changed, status=new_status)
+    return changed
+
+
+def stage_durations(order, events):
+    """Time spent in each status, derived from the ordered status events"""
+    fmt = '%Y-%m-%d %H:%M:%S'
+    stages = []
+    started_at = order.created_at
+    for event in events:
+        stages.append({
+            'status': event.from_status,
+            'started_at': started_at.strftime(fmt),
+            'ended_at': event.changed_at.strftime(fmt),
+            'seconds': int((event.changed_at - started_at).total_seconds()),
+        })
+        started_at = event.changed_at
+    stages.append({'status': order.status, 'started_at': started_at.strftime(fmt), 'ended_at': None, 'seconds': None})
+    return stages
+
+
+class OrderViewSet(FastListMixin, viewsets.ModelViewSet):
+    queryset = Order.objects.select_related('customer').prefetch_related('items', 'staff_assignments__staff').all()
     serializer_class = OrderSerializer
 
+    def get_expand(self):
+        expand = parse_list_param(self.request.query_params.get('expand'))
+        if expand is None:
+            return set(DEFAULT_ORDER_EXPANSIONS)
+        unknown = expand - set(ORDER_EXPANSIONS)
+        if unknown:
+            raise ValidationError({'expand': [f"Unknown relation(s): {', '.join(sorted(unknown))}"]})
+        return expand
+
     def get_queryset(self):
-        queryset = Order.objects.select_related('customer').prefetch_related('items', 'payments', 'staff_assignments__staff').all()
+        # Only join/prefetch what the response will actually contain
+        queryset = Order.objects.all()
+        fields = parse_list_param(self.request.query_params.get('fields'))
+        if fields is None or fields & {'customer_name', 'customer_phone'}:
+            queryset = queryset.select_related('customer')
+        prefetches = [ORDER_EXPANSIONS[name][1] for name in sorted(self.get_expand())]
+        if prefetches:
+            queryset = queryset.prefetch_related(*prefetches)
         customer_id = self.request.query_params.get('customer_id', None)
         status_filter = self.request.query_params.get('status', None)
+        has_balance = self.request.query_params.get('has_balance', None)
         
         if customer_id:
             queryset = queryset.filter(customer_id=customer_id)
         if status_filter:
             queryset = queryset.filter(status=status_filter)
+        if has_balance in ('1', 'true'):
+            queryset = queryset.filter(balance_due__gt=0)
         
         return queryset.order_by('-id')
 
@@ -35,83 +191,81 @@ class OrderViewSet(viewsets.ModelViewSet):
             return OrderCreateSerializer
         return OrderSerializer
 
-    def list(self, request, *args, **kwargs):
-        queryset = self.get_queryset()
-        serializer = OrderWithDetailsSerializer(queryset, many=True)
-        return Response(serializer.data)
+    def get_list_values(self, queryset):
+        columns = ORDER_LIST_COLUMNS
+        if {'customer_name', 'customer_phone'} & set(self.get_serializer().fields):
+            columns += ORDER_CUSTOMER_COLUMNS
+        return queryset.values(*columns)
+
+    def build_list_rows(self, rows):
+        return order_rows(rows, list(self.get_serializer().fields))
 
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
-        serializer = OrderWithDetailsSerializer(instance)
+        serializer = OrderWithDetailsSerializer(instance, context=self.get_serializer_context())
         return Response(serializer.data)
 
     def create(self, request, *args, **kwargs):
         serializer = OrderCreateSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         
-        data = serializer.validated_data
-        order_date = data.get('order_date') or timezone.now().date()
+        order, = create_orders([serializer.validated_data])
         
-        # Create order
-        order = Order.objects.create(
-            customer_id=data['customer_id'],
-            order_date=order_date,
-            delivery_date=data['delivery_date'],
-            notes=data.get('notes', ''),
-            total_amount=0  # Will be calculated
+        response_serializer = OrderWithDetailsSerializer(
+            self.get_queryset().get(id=order.id), context=self.get_serializer_context()
         )
+        return Response(response_serializer.data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['post'], url_path='bulk')
+    def bulk_create(self, request):
+        """Create several orders (e.g. one family's garments) in one transaction"""
+        serializer = OrderBulkCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
         
-        # Create order items and calculate total
-        total_amount = 0
-        for item_data in data['items']:
-            measurement_id = item_data.get('measurement_id')
-            measurement = None
-            if measurement_id:
-                from measurements.models import Measurement
-                try:
-                    measurement = Measurement.objects.get(id=measurement_id)
-                except Measurement.DoesNotExist:
-                    pass  # Skip invalid measurement ID
-            
-            item = OrderItem.objects.create(
-                order=order,
-                garment_type=item_data['garment_type'],
-                quantity=item_data['quantity'],
-                price=item_data['price'],
-                fabric_details=item_data.get('fabric_details', ''),
-                measurement=measurement
-            )
-            total_amount += float(item.price) * item.quantity
-        
-        order.total_amount = total_amount
-        order.save()
-        
-        # Assign staff if provided
-        if data.get('assigned_staff_ids'):
-            for staff_id in data['assigned_staff_ids']:
-                try:
-                    staff = Staff.objects.get(id=staff_id)
-                    OrderStaffAssignment.objects.get_or_create(
-                        order=order,
-                        staff=staff,
-                        defaults={'assigned_date': timezone.now().date()}
-                    )
-                except Staff.DoesNotExist:
-                    pass  # Skip invalid staff IDs
+        orders = create_orders(serializer.validated_data['orders'])
         
-        response_serializer = OrderWithDetailsSerializer(order)
+        queryset = self.get_queryset().filter(id__in=[order.id for order in orders]).order_by('id')
+        response_serializer = OrderWithDetailsSerializer(queryset, many=True, context=self.get_serializer_context())
         return Response(response_serializer.data, status=status.HTTP_201_CREATED)
 
+    @action(detail=False, methods=['post'], url_path='bulk-status')
+    def bulk_status(self, request):
+        """Move many orders to the next stage at once"""
+        serializer = OrderBulkStatusSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        data = serializer.validated_data
+        changed = change_order_status(data['order_ids'], data['status'])
+        return Response({
+            'status': data['status'],
+            'updated': changed,
+            'unchanged': sorted(set(data['order_ids']) - set(changed)),
+        })
+
+    @action(detail=True, methods=['get'], url_path='status-history')
+    def status_history(self, request, pk=None):
+        """Status change events and the time spent in each stage"""
+        order = self.get_object()
+        events = list(order.status_events.all())
+        return Response({
+            'events': OrderStatusEventSerializer(events, many=True).data,
+            'stages': stage_durations(order, events),
+        })
+
     def update(self, request, *args, **kwargs):
         partial = kwargs.pop('partial', False)
         instance = self.get_object()
         
         # Only allow updating status, delivery_date, notes
+        previous_status = instance.status
         serializer = OrderSerializer(instance, data=request.data, partial=partial)
         serializer.is_valid(raise_exception=True)
-        self.perform_update(serializer)
+        with transaction.atomic():
+            self.perform_update(serializer)
+            if instance.status != previous_status:
+                OrderStatusEvent.objects.create(order=instance, from_status=previous_status, to_status=instance.status)
         
-        response_serializer = OrderWithDetailsSerializer(instance)
+        response_serializer = OrderWithDetailsSerializer(instance, context=self.get_serializer_context())
         return Response(response_serializer.data)
 
     @action(detail=True, methods=['get'], url_path='staff')
@@ -1,5 +1,5 @@
 from django.core.validators import MinValueValidator
-from django.db import models
+from django.db import models, transaction
 from orders.models import Order
 
 
@@ -31,3 +31,8 @@ class Payment(models.Model):
 
     def __str__(self):
         return f"Payment #{self.id} - ৳{self.amount}"
+
+    def save(self, *args, **kwargs):
+        # The order balance refresh in payments.signals must commit with the payment
+        with transaction.atomic():
+            super().save(*args, **kwargs)
@@ -0,0 +1,32 @@
+"""
+Keep the denormalized Order.paid_amount/balance_due columns in step with payments
+"""
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from orders.models import Order
+from .models import Payment
+
+
+@receiver(pre_save, sender=Payment)
+def remember_previous_order(sender, instance, **kwargs):
+    """Track the old order when an existing payment is moved to another order"""
+    instance._previous_order_id = None
+    if instance.pk:
+        instance._previous_order_id = (
+            Payment.objects.filter(pk=instance.pk).values_list('order_id', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Payment)
+def refresh_order_balance_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    order_ids = {instance.order_id, getattr(instance, '_previous_order_id', None)}
+    order_ids.discard(None)
+    Order.objects.filter(id__in=order_ids).refresh_payment_totals()
+
+
+@receiver(post_delete, sender=Payment)
+def refresh_order_balance_on_delete(sender, instance, **kwargs):
+    Order.objects.filter(id=instance.order_id).refresh_payment_totals()
@@ -1,3 +1,61 @@
+from datetime import date
+from decimal import Decimal
+
 from django.test import TestCase
 
-# Create your tests here.
+from customers.models import Customer
+from orders.models import Order
+from .models import Payment
+
+
+class OrderBalanceSignalTests(TestCase):
+    def setUp(self):
+        customer = Customer.objects.create(name='Rahim', phone='01712345678')
+        self.order = Order.objects.create(customer=customer, delivery_date=date(2025, 12, 1), total_amount=Decimal('1000.00'))
+        self.other = Order.objects.create(customer=customer, delivery_date=date(2025, 12, 2), total_amount=Decimal('500.00'))
+
+    def pay(self, order, amount):
+        return Payment.objects.create(order=order, amount=Decimal(amount), payment_type='partial', payment_method='cash')
+
+    def assertBalance(self, order, paid, balance):
+        order.refresh_from_db()
+        self.assertEqual(order.paid_amount, Decimal(paid))
+        self.assertEqual(order.balance_due, Decimal(balance))
+
+    def test_new_order_balance_is_total(self):
+        self.assertBalance(self.order, '0.00', '1000.00')
+
+    def test_create_update_delete_payment(self):
+        payment = self.pay(self.order, '300.00')
+        self.pay(self.order, '200.00')
+        self.assertBalance(self.order, '500.00', '500.00')
+
+        payment.amount = Decimal('100.00')
+        payment.save()
+        self.assertBalance(self.order, '300.00', '700.00')
+
+        payment.delete()
+        self.assertBalance(self.order, '200.00', '800.00')
+
+    def test_moving_payment_updates_both_orders(self):
+        payment = self.pay(self.order, '250.00')
+        payment.order = self.other
+        payment.save()
+        self.assertBalance(self.order, '0.00', '1000.00')
+        self.assertBalance(self.other, '250.00', '250.00')
+
+    def test_total_change_keeps_paid_amount(self):
+        self.pay(self.order, '400.00')
+        self.order.refresh_from_db()
+        self.order.total_amount = Decimal('1200.00')
+        self.order.save()
+        self.assertBalance(self.order, '400.00', '800.00')
+
+    def test_stale_order_save_keeps_concurrent_payment(self):
+        stale = Order.objects.get(pk=self.order.pk)  # loaded before the payment
+        self.pay(self.order, '300.00')
+        stale.total_amount = Decimal('1100.00')
+        stale.notes = 'Extra button'
+        stale.save()
+        self.assertEqual((stale.paid_amount, stale.balance_due), (Decimal('300.00'), Decimal('800.00')))
+        self.assertBalance(self.order, '300.00', '800.00')
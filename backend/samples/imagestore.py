@@ -0,0 +1,156 @@
+"""
+Content-addressed image store: uploads are decoded once and kept on disk under their SHA-256
+"""
+import base64
+import binascii
+import hashlib
+import os
+import re
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+
+IMAGE_DIR = 'images'
+# MIME type -> file extension for the formats the gallery accepts
+IMAGE_TYPES = {
+    'image/jpeg': 'jpg',
+    'image/jpg': 'jpg',
+    'image/png': 'png',
+    'image/gif': 'gif',
+    'image/webp': 'webp',
+}
+DATA_URL_RE = re.compile(r'data:(?P<mime>[\w.+-]+/[\w.+-]+)(?:;[^,]*)?;base64,', re.IGNORECASE)
+STORED_NAME_RE = re.compile(r'images/[0-9a-f]{2}/[0-9a-f]{64}\.\w+')
+
+
+class InvalidImage(ValueError):
+    pass
+
+
+def image_root():
+    return Path(settings.MEDIA_ROOT)
+
+
+def is_data_url(value):
+    return value[:5].lower() == 'data:'
+
+
+def decode_data_url(value):
+    """
+    Return (bytes, extension) for a base64 image data URL. The declared type only has to
+    be an image type; the extension comes from the bytes, as for multipart uploads.
+    """
+    match = DATA_URL_RE.match(value)
+    if not match:
+        raise InvalidImage("Expected a base64 image data URL")
+    extension = IMAGE_TYPES.get(match.group('mime').lower())
+    if extension is None:
+        raise InvalidImage(f"Unsupported image type: {match.group('mime')}")
+    try:
+        data = base64.b64decode(value[match.end():], validate=True)
+    except (binascii.Error, ValueError):
+        raise InvalidImage("Image data is not valid base64")
+    if not data:
+        raise InvalidImage("Image is empty")
+    extension = sniff_image_type(data[:12])
+    if extension is None:
+        raise InvalidImage("Not a JPEG, PNG, GIF or WebP image")
+    return data, extension
+
+
+def stored_path(digest, extension):
+    name = f'{IMAGE_DIR}/{digest[:2]}/{digest}.{extension}'
+    return name, image_root() / name
+
+
+def store_bytes(data, extension):
+    """Write the bytes under their hash (once) and return the stored name"""
+    name, path = stored_path(hashlib.sha256(data).hexdigest(), extension)
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temp file and rename so readers never see a partial image
+        handle, temp_path = tempfile.mkstemp(dir=path.parent, prefix='.upload-')
+        try:
+            with os.fdopen(handle, 'wb') as temp_file:
+                temp_file.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+    return name
+
+
+def store_file(temp_path, digest, extension):
+    """
+    Move an already written and hashed temp file into the store (or drop it if a copy exists).
+    Returns (stored name, whether this call created the file).
+    """
+    name, path = stored_path(digest, extension)
+    if path.exists():
+        os.remove(temp_path)
+        return name, False
+    path.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(temp_path, path)
+    return name, True
+
+
+def delete_stored(names):
+    """Remove stored files, e.g. ones an upload created before the request was rejected"""
+    for name in names:
+        path = image_root() / name
+        if path.exists():
+            os.remove(path)
+
+
+def sniff_image_type(head):
+    """File extension from the first bytes of an image, or None if it is not a supported format"""
+    if head.startswith(b'\xff\xd8\xff'):
+        return 'jpg'
+    if head.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'png'
+    if head[:6] in (b'GIF87a', b'GIF89a'):
+        return 'gif'
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'webp'
+    return None
+
+
+def stored_url(name):
+    """Site-relative URL kept in sample_images.image_url"""
+    return f'{settings.MEDIA_URL}{name}'
+
+
+def stored_name(url):
+    """The stored name if the URL (relative or absolute) points into the store, else None"""
+    marker = f'{settings.MEDIA_URL}{IMAGE_DIR}/'
+    index = url.find(marker)
+    if index == -1:
+        return None
+    name = url[index + len(settings.MEDIA_URL):].split('?', 1)[0]
+    return name if STORED_NAME_RE.fullmatch(name) else None
+
+
+def save_image(value):
+    """Turn an uploaded image value into what image_url stores.
+
+    Data URLs (or the (bytes, extension) pair already decoded from one) are
+    stored, URLs into the store are reduced to their short form, and any
+    other URL (e.g. a pasted link) is kept unchanged.
+    """
+    if isinstance(value, tuple):
+        return stored_url(store_bytes(*value))
+    if is_data_url(value):
+        return stored_url(store_bytes(*decode_data_url(value)))
+    name = stored_name(value)
+    if name is not None:
+        return stored_url(name)
+    return value
+
+
+def absolute_image_url(value, request=None):
+    """Absolute URL for API responses so the frontend can load images from the backend host"""
+    if request is not None and value.startswith(settings.MEDIA_URL):
+        return request.build_absolute_uri(value)
+    return value
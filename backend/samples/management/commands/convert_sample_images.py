@@ -0,0 +1,60 @@
+"""
+Move base64 images stored in sample_images.image_url into the content-addressed image store
+"""
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from samples.imagestore import InvalidImage, save_image
+from samples.models import SampleImage
+
+
+class Command(BaseCommand):
+    help = "Decode base64 sample images into the image store and keep only their short URL"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=50,
+            help="Rows loaded per batch; each row can hold megabytes of base64",
+        )
+        parser.add_argument(
+            '--vacuum',
+            action='store_true',
+            help="Run VACUUM afterwards to give the freed space back (SQLite)",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(options['batch_size'], 1)
+        # Only ids are held in memory; image data is read a batch at a time
+        pending_ids = list(
+            SampleImage.objects.filter(image_url__startswith='data:').order_by('id').values_list('id', flat=True)
+        )
+        converted = failed = freed = 0
+        stored = set()
+        for start in range(0, len(pending_ids), batch_size):
+            batch = SampleImage.objects.filter(id__in=pending_ids[start:start + batch_size]).values_list('id', 'image_url')
+            with transaction.atomic():
+                for image_id, image_url in batch:
+                    try:
+                        url = save_image(image_url)
+                    except InvalidImage as exc:
+                        failed += 1
+                        self.stderr.write(f"Image {image_id}: {exc}")
+                        continue
+                    SampleImage.objects.filter(id=image_id).update(image_url=url)
+                    converted += 1
+                    freed += len(image_url) - len(url)
+                    stored.add(url)
+            self.stdout.write(f"{min(start + batch_size, len(pending_ids))}/{len(pending_ids)} rows")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Converted {converted} images into {len(stored)} stored files, "
+            f"{freed / (1024 * 1024):.1f} MiB removed from the database"
+        ))
+        if failed:
+            self.stdout.write(self.style.WARNING(f"{failed} images could not be decoded and were left as they are"))
+        if options['vacuum'] and converted and connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute('VACUUM')
+            self.stdout.write("Database vacuumed")
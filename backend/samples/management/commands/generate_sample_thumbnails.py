@@ -0,0 +1,60 @@
+"""
+Backfill the gallery variants of every stored sample image using a process pool
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from samples.imagestore import image_root, stored_name
+from samples.models import SampleImage
+from samples.thumbnails import build_variants, thumbnails_enabled, variant_widths
+
+
+class Command(BaseCommand):
+    help = "Build the missing fixed-width variants for stored sample images in parallel"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Worker processes (default: CPU count)",
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help="Rebuild variants that already exist",
+        )
+
+    def handle(self, *args, **options):
+        if not thumbnails_enabled():
+            raise CommandError("Pillow is not installed; image variants cannot be built")
+        urls = (
+            SampleImage.objects.filter(image_url__startswith=f'{settings.MEDIA_URL}images/')
+            .order_by()
+            .values_list('image_url', flat=True)
+            .distinct()
+        )
+        names = sorted({name for name in map(stored_name, urls) if name is not None})
+        media_root, widths = str(image_root()), variant_widths()
+
+        written = failed = 0
+        with ProcessPoolExecutor(max_workers=max(options['workers'], 1)) as pool:
+            futures = {
+                pool.submit(build_variants, media_root, name, widths, options['force']): name
+                for name in names
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                try:
+                    written += future.result()
+                except Exception as exc:
+                    failed += 1
+                    self.stderr.write(f"{futures[future]}: {exc}")
+                if done % 100 == 0:
+                    self.stdout.write(f"{done}/{len(names)} images")
+
+        self.stdout.write(self.style.SUCCESS(f"Built {written} variants for {len(names)} images"))
+        if failed:
+            self.stdout.write(self.style.WARNING(f"{failed} images could not be processed"))
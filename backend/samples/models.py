@@ -6,6 +6,7 @@ class Sample(models.Model):
     title = models.CharField(max_length=255)
     description = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)  # ETag/Last-Modified validator
 
     class Meta:
         db_table = 'samples'
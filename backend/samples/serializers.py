@@ -1,15 +1,46 @@
 from rest_framework import serializers
+from .imagestore import InvalidImage, absolute_image_url, decode_data_url, is_data_url
 from .models import Sample, SampleImage
+from .thumbnails import variant_urls
+
+
+class StoredImageURLField(serializers.CharField):
+    """image_url made absolute, or the variant asked for with ?image_size=<width>"""
+
+    def to_representation(self, value):
+        image_size = self.context.get('image_size')
+        if image_size:
+            value = variant_urls(value).get(image_size, value)
+        return absolute_image_url(value, self.context.get('request'))
+
+
+class ImageSourceField(serializers.CharField):
+    """Accepts an image URL or a base64 data URL; data URLs are decoded here, once"""
+
+    def to_internal_value(self, data):
+        value = super().to_internal_value(data)
+        if is_data_url(value):
+            try:
+                return decode_data_url(value)
+            except InvalidImage as exc:
+                raise serializers.ValidationError(str(exc))
+        return value
 
 
 class SampleImageSerializer(serializers.ModelSerializer):
+    image_url = StoredImageURLField(read_only=True)
+    variants = serializers.SerializerMethodField()
     created_at = serializers.DateTimeField(format='%Y-%m-%d %H:%M:%S', read_only=True)
 
     class Meta:
         model = SampleImage
-        fields = ['id', 'sample_id', 'image_url', 'display_order', 'created_at']
+        fields = ['id', 'sample_id', 'image_url', 'variants', 'display_order', 'created_at']
         read_only_fields = ['id', 'sample_id', 'created_at']
 
+    def get_variants(self, obj):
+        request = self.context.get('request')
+        return {width: absolute_image_url(url, request) for width, url in variant_urls(obj.image_url).items()}
+
 
 class SampleSerializer(serializers.ModelSerializer):
     images = SampleImageSerializer(many=True, read_only=True)
@@ -26,7 +57,7 @@ class SampleCreateSerializer(serializers.Serializer):
     title = serializers.CharField()
     description = serializers.CharField(required=False, allow_blank=True)
     images = serializers.ListField(
-        child=serializers.CharField(),
+        child=ImageSourceField(trim_whitespace=False),
         min_length=1
     )
 
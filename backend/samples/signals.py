@@ -0,0 +1,17 @@
+"""
+Keep Sample.updated_at (the ETag/Last-Modified validator) current when its images change
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Sample, SampleImage
+
+
+def touch_samples(sample_ids):
+    Sample.objects.filter(pk__in=sample_ids).update(updated_at=timezone.now())
+
+
+@receiver([post_save, post_delete], sender=SampleImage)
+def touch_sample_on_image_change(sender, instance, **kwargs):
+    touch_samples([instance.sample_id])
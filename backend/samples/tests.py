@@ -1,3 +1,260 @@
-from django.test import TestCase
+import base64
+import shutil
+import tempfile
+import unittest
+from io import BytesIO, StringIO
+from pathlib import Path
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from .models import Sample, SampleImage
+from .thumbnails import shutdown_workers, thumbnails_enabled
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+PNG_BYTES = base64.b64decode(
+    'iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mNkYAAAAAYAAjCB0C8AAAAASUVORK5CYII='
+)
+PNG_DATA_URL = 'data:image/png;base64,' + base64.b64encode(PNG_BYTES).decode()
+
+
+class ImageStoreTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.addCleanup(shutdown_workers)
+
+    def stored_files(self):
+        return [p for p in Path(self.media_root).rglob('*') if p.is_file()]
+
+
+class SampleImageStoreTests(ImageStoreTestCase):
+    def create_sample(self, images):
+        return self.client.post(
+            '/api/samples/',
+            {'garment_type': 'shirt', 'title': 'Panjabi', 'images': images},
+            format='json',
+        )
+
+    def test_data_urls_are_stored_once_by_hash(self):
+        response = self.create_sample([PNG_DATA_URL, PNG_DATA_URL, 'https://example.com/a.jpg'])
+        self.assertEqual(response.status_code, 201)
+        urls = [image['image_url'] for image in response.json()['images']]
+        self.assertRegex(urls[0], r'^http://testserver/media/images/[0-9a-f]{2}/[0-9a-f]{64}\.png$')
+        self.assertEqual(urls[0], urls[1])
+        self.assertEqual(urls[2], 'https://example.com/a.jpg')
+
+        files = self.stored_files()
+        self.assertEqual(len(files), 1)
+        self.assertEqual(files[0].read_bytes(), PNG_BYTES)
+        self.assertTrue(SampleImage.objects.filter(image_url__startswith='/media/images/').exists())
+        self.assertFalse(SampleImage.objects.filter(image_url__startswith='data:').exists())
+
+    def test_resending_stored_urls_keeps_them(self):
+        created = self.create_sample([PNG_DATA_URL]).json()
+        response = self.client.put(
+            f"/api/samples/{created['id']}/",
+            {'garment_type': 'shirt', 'title': 'Panjabi', 'images': [created['images'][0]['image_url']]},
+            format='json',
+        )
+        self.assertEqual(response.status_code, 200)
+        stored = SampleImage.objects.get(sample_id=created['id']).image_url
+        self.assertRegex(stored, r'^/media/images/[0-9a-f]{2}/[0-9a-f]{64}\.png$')
+
+    def test_invalid_data_url_is_rejected(self):
+        response = self.create_sample(['data:image/png;base64,not base64!'])
+        self.assertEqual(response.status_code, 400)
+        response = self.create_sample(['data:text/html;base64,' + base64.b64encode(b'<p>').decode()])
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Sample.objects.exists())
+
+    def test_mislabelled_data_url_is_checked_by_content(self):
+        html = 'data:image/png;base64,' + base64.b64encode(b'<script>alert(1)</script>').decode()
+        response = self.create_sample([html])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Not a JPEG, PNG, GIF or WebP image', str(response.json()))
+        self.assertEqual(self.stored_files(), [])
+
+        response = self.create_sample(['data:image/jpeg;base64,' + base64.b64encode(PNG_BYTES).decode()])
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(response.json()['images'][0]['image_url'].endswith('.png'))
+
+    def test_convert_command_moves_existing_rows(self):
+        sample = Sample.objects.create(garment_type='shirt', title='Old')
+        SampleImage.objects.create(sample=sample, image_url=PNG_DATA_URL, display_order=0)
+        SampleImage.objects.create(sample=sample, image_url=PNG_DATA_URL, display_order=1)
+        SampleImage.objects.create(sample=sample, image_url='data:image/png;base64,@@', display_order=2)
+
+        out = StringIO()
+        call_command('convert_sample_images', batch_size=1, stdout=out, stderr=StringIO())
+        self.assertIn('Converted 2 images into 1 stored files', out.getvalue())
+        urls = list(SampleImage.objects.order_by('display_order').values_list('image_url', flat=True))
+        self.assertTrue(urls[0].startswith('/media/images/'))
+        self.assertEqual(urls[0], urls[1])
+        self.assertTrue(urls[2].startswith('data:'))
+        self.assertEqual(len(self.stored_files()), 1)
+
+
+def jpeg_data_url(width, height):
+    buffer = BytesIO()
+    Image.new('RGB', (width, height), (200, 40, 40)).save(buffer, format='JPEG', quality=95)
+    return 'data:image/jpeg;base64,' + base64.b64encode(buffer.getvalue()).decode()
+
+
+@unittest.skipUnless(thumbnails_enabled(), "Pillow is not installed")
+class SampleImageVariantTests(ImageStoreTestCase):
+    def create_sample(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                '/api/samples/',
+                {'garment_type': 'shirt', 'title': 'Panjabi', 'images': [jpeg_data_url(2000, 1000)]},
+                format='json',
+            )
+        self.assertEqual(response.status_code, 201)
+        return response.json()
+
+    def test_upload_builds_variants_in_background(self):
+        image = self.create_sample()['images'][0]
+        self.assertEqual(sorted(image['variants'], key=int), ['160', '480', '1200'])
+        shutdown_workers()
+
+        for width, url in image['variants'].items():
+            path = Path(self.media_root) / url.split('/media/', 1)[1]
+            with Image.open(path) as variant:
+                self.assertEqual(variant.width, int(width))
+        small = Path(self.media_root) / image['variants']['480'].split('/media/', 1)[1]
+        original = Path(self.media_root) / image['image_url'].split('/media/', 1)[1]
+        self.assertLess(small.stat().st_size, original.stat().st_size)
+
+    def test_image_size_param_selects_variant(self):
+        self.create_sample()
+        response = self.client.get('/api/samples/', {'image_size': '160'})
+        image = response.json()['results'][0]['images'][0]
+        self.assertEqual(image['image_url'], image['variants']['160'])
+        self.assertEqual(self.client.get('/api/samples/', {'image_size': '999'}).status_code, 400)
+
+    def test_missing_variant_is_built_on_request(self):
+        from .imagestore import save_image
+
+        sample = Sample.objects.create(garment_type='shirt', title='Old')
+
+        url = save_image(jpeg_data_url(800, 600))
+        SampleImage.objects.create(sample=sample, image_url=url)
+        variant = self.client.get('/api/samples/').json()['results'][0]['images'][0]['variants']['160']
+
+        response = self.client.get(variant.replace('http://testserver', ''))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get('/media/thumbs/aa/' + 'a' * 64 + '-160.webp').status_code, 404)
+
+    def test_backfill_command_builds_variants(self):
+        from .imagestore import save_image
+
+        sample = Sample.objects.create(garment_type='shirt', title='Old')
+        for size in ((900, 600), (300, 200)):
+            SampleImage.objects.create(sample=sample, image_url=save_image(jpeg_data_url(*size)))
+        out = StringIO()
+        call_command('generate_sample_thumbnails', workers=2, stdout=out)
+        self.assertIn('Built 6 variants for 2 images', out.getvalue())
+        out = StringIO()
+        call_command('generate_sample_thumbnails', workers=2, stdout=out)
+        self.assertIn('Built 0 variants', out.getvalue())
+
+
+class SampleImageUploadTests(ImageStoreTestCase):
+    def setUp(self):
+        super().setUp()
+        self.sample = Sample.objects.create(garment_type='shirt', title='Panjabi')
+        SampleImage.objects.create(sample=self.sample, image_url='https://example.com/a.jpg', display_order=3)
+
+    def upload(self, *files):
+        return self.client.post(f'/api/samples/{self.sample.id}/images/', {'images': list(files)}, format='multipart')
+
+    def test_files_are_streamed_into_the_store(self):
+        big_png = PNG_BYTES + b'\0' * (200 * 1024)  # several upload chunks
+        response = self.upload(
+            SimpleUploadedFile('a.png', big_png, content_type='image/png'),
+            SimpleUploadedFile('b.png', big_png, content_type='application/octet-stream'),
+        )
+        self.assertEqual(response.status_code, 201)
+        images = response.json()
+        self.assertEqual([image['display_order'] for image in images], [4, 5])
+        self.assertEqual(images[0]['image_url'], images[1]['image_url'])
+        self.assertRegex(images[0]['image_url'], r'^http://testserver/media/images/[0-9a-f]{2}/[0-9a-f]{64}\.png$')
+
+        files = self.stored_files()
+        self.assertEqual(len(files), 1)
+        self.assertEqual(files[0].read_bytes(), big_png)
+        self.assertEqual(self.sample.images.count(), 3)
+
+    def test_rejects_non_images_and_oversized_files(self):
+        response = self.upload(SimpleUploadedFile('notes.txt', b'hello', content_type='image/png'))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('notes.txt', response.json()['images'][0])
+
+        with override_settings(SAMPLE_IMAGE_MAX_UPLOAD_SIZE=1024):
+            response = self.upload(SimpleUploadedFile('big.png', PNG_BYTES + b'\0' * 4096, content_type='image/png'))
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.stored_files(), [])
+        self.assertEqual(self.sample.images.count(), 1)
+
+    def test_rejected_upload_removes_new_files_only(self):
+        self.upload(SimpleUploadedFile('a.png', PNG_BYTES, content_type='image/png'))
+        kept = self.stored_files()
+        other_png = PNG_BYTES + b'\0'
+        response = self.upload(
+            SimpleUploadedFile('a.png', PNG_BYTES, content_type='image/png'),
+            SimpleUploadedFile('b.png', other_png, content_type='image/png'),
+            SimpleUploadedFile('notes.txt', b'hello', content_type='image/png'),
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.stored_files(), kept)
+        self.assertEqual(self.sample.images.count(), 2)
+
+    def test_stops_parsing_past_the_file_limit(self):
+        files = [SimpleUploadedFile(f'{i}.png', PNG_BYTES + bytes([i]), content_type='image/png') for i in range(4)]
+        with override_settings(SAMPLE_IMAGE_MAX_FILES=2):
+            response = self.upload(*files)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('At most 2 files', response.json()['images'][0])
+        self.assertEqual(self.stored_files(), [])
+        self.assertEqual(self.sample.images.count(), 1)
+
+    def test_requires_files(self):
+        self.assertEqual(self.client.post(f'/api/samples/{self.sample.id}/images/', {}, format='multipart').status_code, 400)
+        self.assertEqual(self.client.post('/api/samples/999/images/', {}, format='multipart').status_code, 404)
+
+
+class SampleCachingTests(ImageStoreTestCase):
+    def test_stored_images_are_immutable(self):
+        response = self.client.post(
+            '/api/samples/', {'garment_type': 'shirt', 'title': 'Panjabi', 'images': [PNG_DATA_URL]}, format='json'
+        )
+        url = response.json()['images'][0]['image_url'].replace('http://testserver', '')
+        image = self.client.get(url)
+        self.assertEqual(image.status_code, 200)
+        self.assertEqual(b''.join(image.streaming_content), PNG_BYTES)
+        self.assertIn('immutable', image['Cache-Control'])
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=image['ETag']).status_code, 304)
+        self.assertEqual(self.client.get('/media/images/../../etc/passwd').status_code, 404)
+
+    def test_sample_list_etag_changes_when_images_change(self):
+        sample = Sample.objects.create(garment_type='shirt', title='Panjabi')
+        first = self.client.get('/api/samples/')
+        self.assertEqual(self.client.get('/api/samples/', HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+
+        self.client.post(
+            f'/api/samples/{sample.id}/images/',
+            {'images': [SimpleUploadedFile('a.png', PNG_BYTES, content_type='image/png')]},
+            format='multipart',
+        )
+        self.assertEqual(self.client.get('/api/samples/', HTTP_IF_NONE_MATCH=first['ETag']).status_code, 200)
@@ -0,0 +1,137 @@
+"""
+Fixed-width variants of stored sample images (needs Pillow; without it the originals are served)
+"""
+import logging
+import os
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+
+from .imagestore import IMAGE_DIR, image_root, stored_name, stored_url
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:  # pragma: no cover - optional dependency
+    Image = None
+
+logger = logging.getLogger('samples.thumbnails')
+
+THUMB_DIR = 'thumbs'
+VARIANT_FORMAT = 'webp' if Image is not None and features.check('webp') else 'jpg'
+VARIANT_NAME_RE = re.compile(r'thumbs/(?P<prefix>[0-9a-f]{2})/(?P<digest>[0-9a-f]{64})-(?P<width>\d+)\.(?P<ext>\w+)')
+
+_executor = None
+
+
+def thumbnails_enabled():
+    return Image is not None
+
+
+def variant_widths():
+    return tuple(getattr(settings, 'SAMPLE_IMAGE_WIDTHS', (160, 480, 1200)))
+
+
+def variant_name(name, width):
+    """thumbs/aa/<sha256>-<width>.<format> for a stored image name"""
+    digest = name.rsplit('/', 1)[-1].split('.', 1)[0]
+    return f'{THUMB_DIR}/{digest[:2]}/{digest}-{width}.{VARIANT_FORMAT}'
+
+
+def source_for_variant(name):
+    """(stored image name, width) for a variant name, or None if it is not one of ours"""
+    match = VARIANT_NAME_RE.fullmatch(name)
+    if not match or match.group('ext') != VARIANT_FORMAT or int(match.group('width')) not in variant_widths():
+        return None
+    digest = match.group('digest')
+    for path in (image_root() / IMAGE_DIR / match.group('prefix')).glob(f'{digest}.*'):
+        return f'{IMAGE_DIR}/{match.group("prefix")}/{path.name}', int(match.group('width'))
+    return None
+
+
+def render_variant(source_path, target_path, width):
+    """Scale the image down to at most `width` pixels wide (never up) and save it"""
+    with Image.open(source_path) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.width > width:
+            image.thumbnail((width, image.height), Image.LANCZOS)
+        has_alpha = image.mode in ('RGBA', 'LA') or 'transparency' in image.info
+        if VARIANT_FORMAT == 'webp':
+            image = image.convert('RGBA' if has_alpha else 'RGB')
+            options = {'format': 'WEBP', 'quality': 80, 'method': 4}
+        else:
+            image = image.convert('RGB')
+            options = {'format': 'JPEG', 'quality': 80, 'optimize': True, 'progressive': True}
+        target_path.parent.mkdir(parents=True, exist_ok=True)
+        handle, temp_path = tempfile.mkstemp(dir=target_path.parent, prefix='.variant-')
+        try:
+            with os.fdopen(handle, 'wb') as temp_file:
+                image.save(temp_file, **options)
+            os.replace(temp_path, target_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+
+def build_variants(media_root, name, widths, force=False):
+    """Create the missing variants of one stored image; returns how many were written.
+
+    Takes plain arguments so it can run in a worker process without Django settings.
+    """
+    media_root = Path(media_root)
+    source_path = media_root / name
+    written = 0
+    for width in widths:
+        target_path = media_root / variant_name(name, width)
+        if force or not target_path.exists():
+            render_variant(source_path, target_path, width)
+            written += 1
+    return written
+
+
+def generate_variants(name, force=False):
+    if not thumbnails_enabled():
+        return 0
+    return build_variants(image_root(), name, variant_widths(), force=force)
+
+
+def _build_logged(media_root, name, widths):
+    try:
+        return build_variants(media_root, name, widths)
+    except Exception:
+        logger.exception("Could not build variants for %s", name)
+        return 0
+
+
+def schedule_variants(image_urls):
+    """Build variants for newly stored images in the background thread pool"""
+    global _executor
+    names = {name for name in map(stored_name, image_urls) if name is not None}
+    if not names or not thumbnails_enabled():
+        return []
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'SAMPLE_THUMBNAIL_WORKERS', 2),
+            thread_name_prefix='thumbnails',
+        )
+    media_root, widths = image_root(), variant_widths()
+    return [_executor.submit(_build_logged, media_root, name, widths) for name in sorted(names)]
+
+
+def shutdown_workers():
+    """Wait for queued variant jobs and stop the pool (it is recreated on demand)"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+
+
+def variant_urls(image_url):
+    """{width: site-relative URL} for a stored image; empty for external URLs"""
+    name = stored_name(image_url)
+    if name is None or not thumbnails_enabled():
+        return {}
+    return {str(width): stored_url(variant_name(name, width)) for width in variant_widths()}
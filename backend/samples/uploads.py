@@ -0,0 +1,101 @@
+"""
+Multipart upload handler that streams sample images straight into the image store
+"""
+import hashlib
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, StopFutureHandlers, StopUpload
+
+from .imagestore import IMAGE_DIR, image_root, sniff_image_type, store_file
+
+SNIFF_BYTES = 12
+
+
+class StoredUpload(UploadedFile):
+    """A file part that has already been written to the store (or rejected with `error`)"""
+
+    def __init__(self, name, content_type, size, stored_name=None, error=None):
+        super().__init__(file=None, name=name, content_type=content_type, size=size)
+        self.stored_name = stored_name
+        self.error = error
+
+
+class ImageStoreUploadHandler(FileUploadHandler):
+    """
+    Hash and write each file part chunk by chunk; nothing larger than a chunk is held in memory.
+
+    Parsing stops at the first part past max_files (`too_many_files` is then set), and
+    `created` lists the store files this request added so a rejected upload can remove them.
+    """
+
+    chunk_size = 64 * 1024
+
+    def __init__(self, request=None, max_file_size=None, max_files=None):
+        super().__init__(request)
+        self.max_file_size = max_file_size or settings.SAMPLE_IMAGE_MAX_UPLOAD_SIZE
+        self.max_files = max_files or settings.SAMPLE_IMAGE_MAX_FILES
+        self.temp_path = None
+        self.file_count = 0
+        self.too_many_files = False
+        self.created = []
+
+    def new_file(self, *args, **kwargs):
+        if self.file_count >= self.max_files:
+            self.too_many_files = True
+            raise StopUpload(connection_reset=False)
+        self.file_count += 1
+        super().new_file(*args, **kwargs)
+        self.hasher = hashlib.sha256()
+        self.head = b''
+        self.size = 0
+        self.error = None
+        incoming = image_root() / IMAGE_DIR
+        incoming.mkdir(parents=True, exist_ok=True)
+        handle, self.temp_path = tempfile.mkstemp(dir=incoming, prefix='.upload-')
+        self.temp_file = os.fdopen(handle, 'wb')
+        raise StopFutureHandlers()
+
+    def receive_data_chunk(self, raw_data, start):
+        self.size += len(raw_data)
+        if self.error:
+            return None  # keep draining the request body, but stop writing
+        if self.size > self.max_file_size:
+            self.error = f"File is larger than {self.max_file_size // (1024 * 1024)} MB"
+            self.discard()
+            return None
+        if len(self.head) < SNIFF_BYTES:
+            self.head += raw_data[:SNIFF_BYTES - len(self.head)]
+        self.hasher.update(raw_data)
+        self.temp_file.write(raw_data)
+        return None
+
+    def file_complete(self, file_size):
+        stored_name = None
+        if not self.error:
+            self.temp_file.close()
+            extension = sniff_image_type(self.head)
+            if not self.size:
+                self.error = "File is empty"
+            elif extension is None:
+                self.error = "Not a JPEG, PNG, GIF or WebP image"
+            if self.error:
+                self.discard()
+            else:
+                stored_name, created = store_file(self.temp_path, self.hasher.hexdigest(), extension)
+                self.temp_path = None
+                if created:
+                    self.created.append(stored_name)
+        return StoredUpload(self.file_name, self.content_type, self.size, stored_name=stored_name, error=self.error)
+
+    def upload_interrupted(self):
+        self.discard()
+
+    def discard(self):
+        if self.temp_path is not None:
+            self.temp_file.close()
+            if os.path.exists(self.temp_path):
+                os.remove(self.temp_path)
+            self.temp_path = None
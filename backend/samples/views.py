@@ -1,11 +1,64 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from django.http import Http404
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from django.views.static import serve
 from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import MultiPartParser
 from rest_framework.response import Response
 
+from dorji360.conditional import IMMUTABLE_CACHE_CONTROL, ConditionalGetMixin
+from .imagestore import STORED_NAME_RE, delete_stored, image_root, save_image, stored_url
 from .models import Sample, SampleImage
-from .serializers import SampleSerializer, SampleCreateSerializer
+from .serializers import SampleImageSerializer, SampleSerializer, SampleCreateSerializer
+from .signals import touch_samples
+from .thumbnails import generate_variants, schedule_variants, source_for_variant, thumbnails_enabled, variant_widths
+from .uploads import ImageStoreUploadHandler
 
 
-class SampleViewSet(viewsets.ModelViewSet):
+def create_images(sample, image_urls, first_order=0):
+    return SampleImage.objects.bulk_create(
+        SampleImage(sample=sample, image_url=image_url, display_order=idx)
+        for idx, image_url in enumerate(image_urls, start=first_order)
+    )
+
+
+def serve_immutable(request, name):
+    """Serve a content-addressed file; its name is its hash, so clients may cache it forever"""
+    etag = quote_etag(name.rsplit('/', 1)[-1].split('.', 1)[0])
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = serve(request, name, document_root=image_root())
+    response['ETag'] = etag
+    response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    return response
+
+
+def serve_image(request, path):
+    name = f'images/{path}'
+    if not STORED_NAME_RE.fullmatch(name):
+        raise Http404("Unknown image")
+    return serve_immutable(request, name)
+
+
+def serve_variant(request, path):
+    """Serve an image variant, building it first if the background worker has not yet"""
+    name = f'thumbs/{path}'
+    source = source_for_variant(name)
+    if source is None:
+        raise Http404("Unknown image variant")
+    if not (image_root() / name).exists():
+        if not thumbnails_enabled():
+            raise Http404("Image variants are not available")
+        generate_variants(source[0])
+    return serve_immutable(request, name)
+
+
+class SampleViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Sample.objects.prefetch_related('images').all()
     serializer_class = SampleSerializer
 
@@ -18,6 +71,16 @@ class SampleViewSet(viewsets.ModelViewSet):
         
         return queryset.order_by('-id')
 
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        image_size = self.request.query_params.get('image_size') if self.request else None
+        if image_size:
+            widths = [str(width) for width in variant_widths()]
+            if image_size not in widths:
+                raise ValidationError({'image_size': f"Choose one of {', '.join(widths)}"})
+            context['image_size'] = image_size
+        return context
+
     def get_serializer_class(self):
         if self.action == 'create' or self.action == 'update':
             return SampleCreateSerializer
@@ -28,21 +91,18 @@ class SampleViewSet(viewsets.ModelViewSet):
         serializer.is_valid(raise_exception=True)
         
         data = serializer.validated_data
-        sample = Sample.objects.create(
-            garment_type=data['garment_type'],
-            title=data['title'],
-            description=data.get('description', '')
-        )
-        
-        # Create sample images
-        for idx, image_url in enumerate(data['images']):
-            SampleImage.objects.create(
-                sample=sample,
-                image_url=image_url,
-                display_order=idx
+        # Write image files before the transaction; stored files are deduped so retries are harmless
+        image_urls = [save_image(image) for image in data['images']]
+        with transaction.atomic():
+            sample = Sample.objects.create(
+                garment_type=data['garment_type'],
+                title=data['title'],
+                description=data.get('description', '')
             )
+            create_images(sample, image_urls)
+            transaction.on_commit(lambda: schedule_variants(image_urls))
         
-        response_serializer = SampleSerializer(sample)
+        response_serializer = SampleSerializer(sample, context=self.get_serializer_context())
         return Response(response_serializer.data, status=status.HTTP_201_CREATED)
 
     def update(self, request, *args, **kwargs):
@@ -65,15 +125,42 @@ class SampleViewSet(viewsets.ModelViewSet):
         
         # Update images if provided
         if 'images' in data:
-            # Delete existing images
-            instance.images.all().delete()
-            # Create new images
-            for idx, image_url in enumerate(data['images']):
-                SampleImage.objects.create(
-                    sample=instance,
-                    image_url=image_url,
-                    display_order=idx
-                )
+            image_urls = [save_image(image) for image in data['images']]
+            with transaction.atomic():
+                # Replace existing images
+                instance.images.all().delete()
+                create_images(instance, image_urls)
+                transaction.on_commit(lambda: schedule_variants(image_urls))
         
-        response_serializer = SampleSerializer(instance)
+        response_serializer = SampleSerializer(instance, context=self.get_serializer_context())
         return Response(response_serializer.data)
+
+    @action(detail=True, methods=['post'], url_path='images', parser_classes=[MultiPartParser])
+    def upload_images(self, request, pk=None):
+        """POST /api/samples/{id}/images/ - multipart `images` files appended to the sample"""
+        sample = self.get_object()
+        # Stream file parts into the image store instead of Django's memory/temp-file handlers
+        handler = ImageStoreUploadHandler(request._request)
+        request._request.upload_handlers = [handler]
+        uploads = request.FILES.getlist('images')
+        try:
+            if handler.too_many_files:
+                raise ValidationError({'images': [f"At most {settings.SAMPLE_IMAGE_MAX_FILES} files per upload."]})
+            if not uploads:
+                raise ValidationError({'images': ["Upload one or more files in the 'images' field."]})
+            errors = [f"{upload.name}: {upload.error}" for upload in uploads if upload.error]
+            if errors:
+                raise ValidationError({'images': errors})
+        except ValidationError:
+            delete_stored(handler.created)
+            raise
+
+        image_urls = [stored_url(upload.stored_name) for upload in uploads]
+        with transaction.atomic():
+            last_order = sample.images.aggregate(last=Max('display_order'))['last']
+            images = create_images(sample, image_urls, first_order=0 if last_order is None else last_order + 1)
+            touch_samples([sample.id])  # bulk_create sends no post_save
+            transaction.on_commit(lambda: schedule_variants(image_urls))
+
+        serializer = SampleImageSerializer(images, many=True, context=self.get_serializer_context())
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -0,0 +1,22 @@
+# Generated by Django 5.0.1 on 2026-10-17 03:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('staff', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='staff',
+            name='phone_e164',
+            field=models.CharField(blank=True, editable=False, max_length=16, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='staff',
+            index=models.Index(fields=['phone_e164'], name='idx_staff_phone_e164'),
+        ),
+    ]
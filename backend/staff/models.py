@@ -1,4 +1,5 @@
 from django.db import models
+from dorji360.phone import to_e164
 from orders.models import Order
 
 
@@ -18,6 +19,8 @@ class Staff(models.Model):
 
     name = models.CharField(max_length=255)
     phone = models.CharField(max_length=50)
+    # Derived from phone on save (and by the backfill_phone_numbers command)
+    phone_e164 = models.CharField(max_length=16, blank=True, null=True, editable=False)
     address = models.TextField(blank=True, null=True)
     role = models.CharField(max_length=50, choices=ROLE_CHOICES)
     join_date = models.DateField(auto_now_add=True)
@@ -26,10 +29,20 @@ class Staff(models.Model):
     class Meta:
         db_table = 'staff'
         ordering = ['-id']
+        indexes = [
+            models.Index(fields=['phone_e164'], name='idx_staff_phone_e164'),
+        ]
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        self.phone_e164 = to_e164(self.phone)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'phone' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'phone_e164'}
+        super().save(*args, **kwargs)
+
 
 class OrderStaffAssignment(models.Model):
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='staff_assignments')
@@ -1,3 +1,9 @@
 from django.test import TestCase
 
-# Create your tests here.
+from .models import Staff
+
+
+class StaffPhoneTests(TestCase):
+    def test_phone_normalized_on_save(self):
+        staff = Staff.objects.create(name='Jamal', phone='01712-345678', role='tailor')
+        self.assertEqual(Staff.objects.get(phone_e164='+8801712345678'), staff)
@@ -5,11 +5,22 @@ CREATE TABLE IF NOT EXISTS customers (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     name TEXT NOT NULL,
     phone TEXT NOT NULL,
+    phone_e164 TEXT,
+    phone_reversed TEXT,
+    name_key TEXT,
     address TEXT,
     notes TEXT,
     created_at TEXT NOT NULL DEFAULT (datetime('now'))
 );
 
+-- Trigrams of customers.name_key (fuzzy name search)
+CREATE TABLE IF NOT EXISTS customer_name_trigrams (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    customer_id INTEGER NOT NULL,
+    trigram TEXT NOT NULL,
+    FOREIGN KEY (customer_id) REFERENCES customers(id) ON DELETE CASCADE
+);
+
 -- Measurement templates table
 CREATE TABLE IF NOT EXISTS measurement_templates (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -17,7 +28,8 @@ CREATE TABLE IF NOT EXISTS measurement_templates (
     gender TEXT NOT NULL CHECK (gender IN ('male', 'female', 'unisex')),
     fields_json TEXT NOT NULL, -- JSON string of field_name -> display_name
     display_name TEXT NOT NULL,
-    created_at TEXT NOT NULL DEFAULT (datetime('now'))
+    created_at TEXT NOT NULL DEFAULT (datetime('now')),
+    updated_at TEXT NOT NULL DEFAULT (datetime('now'))
 );
 
 -- Measurements table
@@ -42,6 +54,8 @@ CREATE TABLE IF NOT EXISTS orders (
     total_amount REAL NOT NULL DEFAULT 0,
     notes TEXT,
     created_at TEXT NOT NULL DEFAULT (datetime('now')),
+    paid_amount REAL NOT NULL DEFAULT 0, -- denormalized SUM(payments.amount)
+    balance_due REAL NOT NULL DEFAULT 0, -- total_amount - paid_amount
     FOREIGN KEY (customer_id) REFERENCES customers(id) ON DELETE CASCADE
 );
 
@@ -75,7 +89,8 @@ CREATE TABLE IF NOT EXISTS samples (
     garment_type TEXT NOT NULL,
     title TEXT NOT NULL,
     description TEXT,
-    created_at TEXT NOT NULL DEFAULT (datetime('now'))
+    created_at TEXT NOT NULL DEFAULT (datetime('now')),
+    updated_at TEXT NOT NULL DEFAULT (datetime('now'))
 );
 
 -- Sample images table
@@ -90,19 +105,50 @@ CREATE TABLE IF NOT EXISTS sample_images (
 
 -- Indexes for better query performance
 CREATE INDEX IF NOT EXISTS idx_customers_phone ON customers(phone);
+CREATE INDEX IF NOT EXISTS idx_customers_phone_e164 ON customers(phone_e164);
+CREATE INDEX IF NOT EXISTS idx_customers_phone_reversed ON customers(phone_reversed);
+CREATE INDEX IF NOT EXISTS idx_customers_name_key ON customers(name_key);
+CREATE INDEX IF NOT EXISTS idx_customer_name_trigrams ON customer_name_trigrams(trigram, customer_id);
 CREATE INDEX IF NOT EXISTS idx_measurements_customer ON measurements(customer_id);
 CREATE INDEX IF NOT EXISTS idx_orders_customer ON orders(customer_id);
 CREATE INDEX IF NOT EXISTS idx_orders_status ON orders(status);
 CREATE INDEX IF NOT EXISTS idx_orders_delivery_date ON orders(delivery_date);
+CREATE INDEX IF NOT EXISTS idx_orders_balance_due ON orders(balance_due);
 CREATE INDEX IF NOT EXISTS idx_payments_order ON payments(order_id);
 CREATE INDEX IF NOT EXISTS idx_samples_garment_type ON samples(garment_type);
 CREATE INDEX IF NOT EXISTS idx_sample_images_sample ON sample_images(sample_id);
 
+-- Full-text index over customers, kept in sync by triggers (ranked prefix search)
+CREATE VIRTUAL TABLE IF NOT EXISTS customers_fts USING fts5(
+    name, phone, address, notes,
+    content='customers', content_rowid='id',
+    tokenize="unicode61 remove_diacritics 2 categories 'L* N* Co M*'",
+    prefix='2 3'
+);
+
+CREATE TRIGGER IF NOT EXISTS customers_fts_ai AFTER INSERT ON customers BEGIN
+    INSERT INTO customers_fts(rowid, name, phone, address, notes)
+    VALUES (new.id, new.name, new.phone, new.address, new.notes);
+END;
+
+CREATE TRIGGER IF NOT EXISTS customers_fts_ad AFTER DELETE ON customers BEGIN
+    INSERT INTO customers_fts(customers_fts, rowid, name, phone, address, notes)
+    VALUES ('delete', old.id, old.name, old.phone, old.address, old.notes);
+END;
+
+CREATE TRIGGER IF NOT EXISTS customers_fts_au AFTER UPDATE OF name, phone, address, notes ON customers BEGIN
+    INSERT INTO customers_fts(customers_fts, rowid, name, phone, address, notes)
+    VALUES ('delete', old.id, old.name, old.phone, old.address, old.notes);
+    INSERT INTO customers_fts(rowid, name, phone, address, notes)
+    VALUES (new.id, new.name, new.phone, new.address, new.notes);
+END;
+
 -- Staff table
 CREATE TABLE IF NOT EXISTS staff (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     name TEXT NOT NULL,
     phone TEXT NOT NULL,
+    phone_e164 TEXT,
     address TEXT,
     role TEXT NOT NULL CHECK (role IN ('master_tailor', 'tailor', 'assistant_tailor', 'cutting_master', 'sewing_operator', 'finishing', 'receptionist', 'delivery_person', 'accountant', 'other')),
     join_date TEXT NOT NULL DEFAULT (date('now')),
@@ -123,6 +169,7 @@ CREATE TABLE IF NOT EXISTS order_staff_assignments (
 );
 
 CREATE INDEX IF NOT EXISTS idx_staff_role ON staff(role);
+CREATE INDEX IF NOT EXISTS idx_staff_phone_e164 ON staff(phone_e164);
 CREATE INDEX IF NOT EXISTS idx_order_staff_order ON order_staff_assignments(order_id);
 CREATE INDEX IF NOT EXISTS idx_order_staff_staff ON order_staff_assignments(staff_id);
 
@@ -13,7 +13,7 @@ interface CustomerDetailProps {
 }
 
 export default function CustomerDetail({ customer, onClose, onEdit }: CustomerDetailProps) {
-  const { orders, fetchOrders, loading: ordersLoading } = useOrderStore();
+  const { orders, fetchAllOrders, loading: ordersLoading } = useOrderStore();
   const { measurements, fetchMeasurements, loading: measurementsLoading } = useMeasurementStore();
   const { payments, fetchPayments, loading: paymentsLoading } = usePaymentStore();
   const { deliveries, fetchDeliveries, loading: deliveriesLoading } = useDeliveryStore();
@@ -22,7 +22,7 @@ export default function CustomerDetail({ customer, onClose, onEdit }: CustomerDe
   const [activeTab, setActiveTab] = useState<'orders' | 'measurements' | 'payments' | 'deliveries'>('orders');
 
   useEffect(() => {
-    fetchOrders(customer.id);
+    fetchAllOrders(customer.id); // payments below are matched against all of this customer's orders
     fetchMeasurements(customer.id);
     // Fetch all payments and deliveries, then filter client-side
     fetchPayments();
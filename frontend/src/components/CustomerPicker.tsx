@@ -0,0 +1,96 @@
+import { useEffect, useState } from 'react';
+import { api, type CustomerSuggestion } from '../lib/api';
+
+interface CustomerPickerProps {
+  id?: string;
+  value: number | '';
+  onChange: (customerId: number | '') => void;
+  disabled?: boolean;
+  className?: string;
+}
+
+const label = (customer: CustomerSuggestion) => `${customer.name} - ${customer.phone}`;
+
+// Type-ahead customer selector backed by /api/customers/suggest (no full customer list download)
+export default function CustomerPicker({ id, value, onChange, disabled, className = '' }: CustomerPickerProps) {
+  const [query, setQuery] = useState('');
+  const [suggestions, setSuggestions] = useState<CustomerSuggestion[]>([]);
+  const [open, setOpen] = useState(false);
+  const [labelledId, setLabelledId] = useState<number | ''>('');
+
+  // Show the name of a customer selected elsewhere (editing, or a fixed customerId)
+  useEffect(() => {
+    if (!value || value === labelledId) return;
+    let cancelled = false;
+    api.getCustomer(value).then((customer) => {
+      if (cancelled) return;
+      setQuery(label(customer));
+      setLabelledId(customer.id);
+    }).catch(() => undefined);
+    return () => {
+      cancelled = true;
+    };
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [value]);
+
+  useEffect(() => {
+    if (!open || !query.trim()) {
+      setSuggestions([]);
+      return;
+    }
+    let cancelled = false;
+    const timer = setTimeout(() => {
+      api.suggestCustomers(query.trim()).then((results) => {
+        if (!cancelled) setSuggestions(results);
+      }).catch(() => undefined);
+    }, 120);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [query, open]);
+
+  const select = (customer: CustomerSuggestion) => {
+    setQuery(label(customer));
+    setLabelledId(customer.id);
+    setOpen(false);
+    onChange(customer.id);
+  };
+
+  return (
+    <div className="relative">
+      <input
+        id={id}
+        type="text"
+        value={query}
+        placeholder="Search by name or phone"
+        autoComplete="off"
+        disabled={disabled}
+        onChange={(e) => {
+          setQuery(e.target.value);
+          setOpen(true);
+          if (value) onChange('');
+        }}
+        onFocus={() => setOpen(true)}
+        onBlur={() => setTimeout(() => setOpen(false), 150)}
+        className={className}
+      />
+      {open && suggestions.length > 0 && (
+        <ul className="absolute z-10 mt-1 w-full max-h-60 overflow-auto bg-white border border-gray-200 rounded-lg shadow-lg">
+          {suggestions.map((customer) => (
+            <li key={customer.id}>
+              <button
+                type="button"
+                onMouseDown={(e) => e.preventDefault()}
+                onClick={() => select(customer)}
+                className="w-full text-left px-3 py-2 text-sm hover:bg-gray-100"
+              >
+                {customer.name} <span className="text-gray-500">- {customer.phone}</span>
+              </button>
+            </li>
+          ))}
+        </ul>
+      )}
+    </div>
+  );
+}
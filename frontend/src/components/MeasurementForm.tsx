@@ -1,7 +1,7 @@
 import { useEffect, useState } from 'react';
 import { useMeasurementStore } from '../store/measurementStore';
-import { useCustomerStore } from '../store/customerStore';
-import type { MeasurementTemplate, MeasurementCreate } from '../lib/api';
+import { api, type MeasurementTemplate, type MeasurementCreate } from '../lib/api';
+import CustomerPicker from './CustomerPicker';
 
 interface MeasurementFormProps {
   measurementId?: number | null;
@@ -20,7 +20,6 @@ export default function MeasurementForm({ measurementId, customerId, onClose }:
     fetchMeasurement,
     loading,
   } = useMeasurementStore();
-  const { customers, fetchCustomers } = useCustomerStore();
 
   const [selectedCustomerId, setSelectedCustomerId] = useState<number | ''>(customerId || '');
   const [selectedTemplateId, setSelectedTemplateId] = useState<number | ''>('');
@@ -31,7 +30,6 @@ export default function MeasurementForm({ measurementId, customerId, onClose }:
   const [showQuickEntry, setShowQuickEntry] = useState(false);
 
   useEffect(() => {
-    fetchCustomers();
     if (measurementId) {
       fetchMeasurement(measurementId);
     }
@@ -40,20 +38,22 @@ export default function MeasurementForm({ measurementId, customerId, onClose }:
 
   // Fetch templates filtered by customer's gender when customer is selected
   useEffect(() => {
-    if (selectedCustomerId) {
-      const selectedCustomer = customers.find((c) => c.id === selectedCustomerId);
-      if (selectedCustomer) {
-        // Fetch templates matching customer's gender or unisex
-        const genderFilter = selectedCustomer.gender === 'unisex' ? undefined : selectedCustomer.gender;
-        fetchTemplates(undefined, genderFilter);
-      } else {
-        fetchTemplates();
-      }
-    } else {
+    if (!selectedCustomerId) {
       fetchTemplates();
+      return;
     }
+    let cancelled = false;
+    api.getCustomer(selectedCustomerId).then((selectedCustomer) => {
+      if (cancelled) return;
+      // Fetch templates matching customer's gender or unisex
+      const genderFilter = selectedCustomer.gender === 'unisex' ? undefined : selectedCustomer.gender;
+      fetchTemplates(undefined, genderFilter);
+    }).catch(() => fetchTemplates());
+    return () => {
+      cancelled = true;
+    };
     // eslint-disable-next-line react-hooks/exhaustive-deps
-  }, [selectedCustomerId, customers]);
+  }, [selectedCustomerId]);
 
   useEffect(() => {
     if (selectedMeasurement && measurementId && selectedMeasurement.id === measurementId) {
@@ -217,22 +217,15 @@ export default function MeasurementForm({ measurementId, customerId, onClose }:
               <label htmlFor="customer" className="block text-sm font-medium text-gray-700 mb-1">
                 Customer *
               </label>
-              <select
+              <CustomerPicker
                 id="customer"
                 value={selectedCustomerId}
-                onChange={(e) => setSelectedCustomerId(e.target.value ? Number(e.target.value) : '')}
+                onChange={setSelectedCustomerId}
                 disabled={!!customerId}
                 className={`w-full px-3 py-2 border rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-transparent ${
                   errors.customer ? 'border-red-500' : 'border-gray-300'
                 }`}
-              >
-                <option value="">Select a customer</option>
-                {customers.map((customer) => (
-                  <option key={customer.id} value={customer.id}>
-                    {customer.name} - {customer.phone}
-                  </option>
-                ))}
-              </select>
+              />
               {errors.customer && <p className="mt-1 text-sm text-red-600">{errors.customer}</p>}
             </div>
 
@@ -1,8 +1,8 @@
 import { useEffect, useState } from 'react';
 import { useOrderStore } from '../store/orderStore';
-import { useCustomerStore } from '../store/customerStore';
 import { useStaffStore } from '../store/staffStore';
 import { useMeasurementStore } from '../store/measurementStore';
+import CustomerPicker from './CustomerPicker';
 import type { OrderItemCreate, OrderCreate } from '../lib/api';
 
 interface OrderFormProps {
@@ -29,7 +29,6 @@ const getRoleLabel = (role: string) => {
 
 export default function OrderForm({ orderId, customerId, onClose }: OrderFormProps) {
   const { createOrder, updateOrder, loading, selectedOrder, fetchOrder } = useOrderStore();
-  const { customers, fetchCustomers } = useCustomerStore();
   const { staff, fetchStaff } = useStaffStore();
   const { measurements, fetchMeasurements } = useMeasurementStore();
 
@@ -45,7 +44,6 @@ export default function OrderForm({ orderId, customerId, onClose }: OrderFormPro
   const [errors, setErrors] = useState<Record<string, string>>({});
 
   useEffect(() => {
-    fetchCustomers();
     fetchStaff();
     // Set default order date to today
     const today = new Date().toISOString().split('T')[0];
@@ -196,11 +194,11 @@ export default function OrderForm({ orderId, customerId, onClose }: OrderFormPro
               <label htmlFor="customer" className="block text-sm font-medium text-gray-700 mb-1">
                 Customer *
               </label>
-              <select
+              <CustomerPicker
                 id="customer"
                 value={selectedCustomerId}
-                onChange={(e) => {
-                  setSelectedCustomerId(e.target.value ? Number(e.target.value) : '');
+                onChange={(id) => {
+                  setSelectedCustomerId(id);
                   // Reset all item measurements when customer changes
                   setItems(items.map(item => ({ ...item, measurement_id: undefined })));
                 }}
@@ -208,14 +206,7 @@ export default function OrderForm({ orderId, customerId, onClose }: OrderFormPro
                 className={`input-modern w-full ${
                   errors.customer ? 'border-red-500 focus:ring-red-500/50' : ''
                 } disabled:bg-gray-100 disabled:cursor-not-allowed`}
-              >
-                <option value="">Select a customer</option>
-                {customers.map((customer) => (
-                  <option key={customer.id} value={customer.id}>
-                    {customer.name} - {customer.phone}
-                  </option>
-                ))}
-              </select>
+              />
               {errors.customer && <p className="mt-1 text-sm text-red-600">{errors.customer}</p>}
             </div>
 
@@ -13,6 +13,24 @@ export interface Customer {
   created_at: string;
 }
 
+export interface CustomerSuggestion {
+  id: number;
+  name: string;
+  phone: string;
+}
+
+export interface CustomerDuplicatePair {
+  score: number;
+  keep: Customer;
+  duplicate: Customer;
+}
+
+export interface CustomerMergeResult {
+  customer: Customer;
+  merged: number[];
+  moved: { measurements: number; orders: number; payments: number };
+}
+
 export interface CustomerCreate {
   name: string;
   phone: string;
@@ -29,6 +47,18 @@ export interface CustomerUpdate {
   notes?: string;
 }
 
+// One page of a cursor-paginated list; `next` / `previous` are full URLs or null
+export interface Page<T> {
+  next: string | null;
+  previous: string | null;
+  results: T[];
+}
+
+// The opaque ?cursor= value of a next/previous link, to pass back to the same endpoint
+export function cursorFrom(link: string | null): string | null {
+  return link ? new URL(link).searchParams.get('cursor') : null;
+}
+
 class ApiClient {
   private async request<T>(
     endpoint: string,
@@ -40,7 +70,8 @@ class ApiClient {
       const response = await fetch(url, {
         ...options,
         headers: {
-          'Content-Type': 'application/json',
+          // Let the browser set the multipart boundary for FormData bodies
+          ...(options.body instanceof FormData ? {} : { 'Content-Type': 'application/json' }),
           ...options.headers,
         },
       });
@@ -97,9 +128,37 @@ class ApiClient {
   }
 
   // Customer endpoints
-  async getCustomers(search?: string): Promise<Customer[]> {
-    const query = search ? `?search=${encodeURIComponent(search)}` : '';
-    return this.request<Customer[]>(`/api/customers${query}`);
+  // mode 'fuzzy' matches names by sound in either script ("Rahim" finds "রহিম")
+  async getCustomers(search?: string, mode: 'prefix' | 'fuzzy' = 'prefix'): Promise<Customer[]> {
+    const params = new URLSearchParams({ all: '1' });
+    if (search) params.append('search', search);
+    if (search && mode !== 'prefix') params.append('mode', mode);
+    return this.request<Customer[]>(`/api/customers?${params.toString()}`);
+  }
+
+  // Picker suggestions: name-word or phone-digit prefix, answered from a server-side in-memory index
+  async suggestCustomers(q: string, limit = 10): Promise<CustomerSuggestion[]> {
+    const params = new URLSearchParams({ q, limit: String(limit) });
+    return this.request<CustomerSuggestion[]>(`/api/customers/suggest/?${params.toString()}`);
+  }
+
+  // Exact match on the normalized number, else customers whose number ends with these digits
+  async findCustomersByPhone(number: string): Promise<{ match: 'exact' | 'suffix'; results: Customer[] }> {
+    return this.request(`/api/customers/by-phone/${encodeURIComponent(number)}/`);
+  }
+
+  async getDuplicateCustomers(minScore?: number, limit = 50): Promise<CustomerDuplicatePair[]> {
+    const params = new URLSearchParams({ limit: String(limit) });
+    if (minScore !== undefined) params.append('min_score', String(minScore));
+    return this.request<CustomerDuplicatePair[]>(`/api/customers/duplicates/?${params.toString()}`);
+  }
+
+  // Moves the duplicates' measurements and orders (with their payments) to target, then deletes them
+  async mergeCustomers(target: number, duplicates: number[]): Promise<CustomerMergeResult> {
+    return this.request<CustomerMergeResult>('/api/customers/merge/', {
+      method: 'POST',
+      body: JSON.stringify({ target, duplicates }),
+    });
   }
 
   async getCustomer(id: number): Promise<Customer> {
@@ -164,11 +223,10 @@ class ApiClient {
 
   // Measurement endpoints
   async getMeasurements(customerId?: number, garmentType?: string): Promise<MeasurementWithCustomer[]> {
-    const params = new URLSearchParams();
+    const params = new URLSearchParams({ all: '1' });
     if (customerId) params.append('customer_id', customerId.toString());
     if (garmentType) params.append('garment_type', garmentType);
-    const query = params.toString() ? `?${params.toString()}` : '';
-    return this.request<MeasurementWithCustomer[]>(`/api/measurements${query}`);
+    return this.request<MeasurementWithCustomer[]>(`/api/measurements?${params.toString()}`);
   }
 
   async getMeasurement(id: number): Promise<MeasurementWithCustomer> {
@@ -189,6 +247,29 @@ class ApiClient {
     });
   }
 
+  // Range search over indexed values, e.g. { chest__gte: 38, chest__lte: 40 }
+  async searchMeasurements(
+    garmentType: string,
+    filters: Record<string, number>
+  ): Promise<MeasurementWithCustomer[]> {
+    const params = new URLSearchParams({ all: '1', garment_type: garmentType });
+    Object.entries(filters).forEach(([key, value]) => params.append(key, String(value)));
+    return this.request<MeasurementWithCustomer[]>(`/api/measurements/search/?${params.toString()}`);
+  }
+
+  // Closest measurements made with the same template (for reusing paper patterns)
+  async getSimilarMeasurements(id: number, k = 10): Promise<SimilarMeasurement[]> {
+    return this.request<SimilarMeasurement[]>(`/api/measurements/${id}/similar/?k=${k}`);
+  }
+
+  async getMeasurementRevisions(id: number): Promise<MeasurementRevision[]> {
+    return this.request<MeasurementRevision[]>(`/api/measurements/${id}/revisions/`);
+  }
+
+  async getMeasurementAtRevision(id: number, revision: number): Promise<MeasurementAtRevision> {
+    return this.request<MeasurementAtRevision>(`/api/measurements/${id}/revisions/${revision}/`);
+  }
+
   async deleteMeasurement(id: number): Promise<void> {
     return this.request<void>(`/api/measurements/${id}/`, {
       method: 'DELETE',
@@ -196,12 +277,21 @@ class ApiClient {
   }
 
   // Order endpoints
-  async getOrders(customerId?: number, status?: string): Promise<OrderWithDetails[]> {
+  // One page, newest first; pass cursorFrom(page.next) to get the following page
+  async getOrders(customerId?: number, status?: string, cursor?: string | null): Promise<Page<OrderWithDetails>> {
     const params = new URLSearchParams();
     if (customerId) params.append('customer_id', customerId.toString());
     if (status) params.append('status', status);
-    const query = params.toString() ? `?${params.toString()}` : '';
-    return this.request<OrderWithDetails[]>(`/api/orders${query}`);
+    if (cursor) params.append('cursor', cursor);
+    return this.request<Page<OrderWithDetails>>(`/api/orders?${params.toString()}`);
+  }
+
+  // Every matching order in one response (?all=1); only for lookups that need the full set
+  async getAllOrders(customerId?: number, status?: string): Promise<OrderWithDetails[]> {
+    const params = new URLSearchParams({ all: '1' });
+    if (customerId) params.append('customer_id', customerId.toString());
+    if (status) params.append('status', status);
+    return this.request<OrderWithDetails[]>(`/api/orders?${params.toString()}`);
   }
 
   async getOrder(id: number): Promise<OrderWithDetails> {
@@ -230,8 +320,8 @@ class ApiClient {
 
   // Payment endpoints
   async getPayments(orderId?: number): Promise<Payment[]> {
-    const query = orderId ? `?order_id=${orderId}` : '';
-    return this.request<Payment[]>(`/api/payments${query}`);
+    const query = orderId ? `&order_id=${orderId}` : '';
+    return this.request<Payment[]>(`/api/payments?all=1${query}`);
   }
 
   async getPayment(id: number): Promise<Payment> {
@@ -253,18 +343,17 @@ class ApiClient {
 
   // Delivery endpoints
   async getDeliveries(startDate?: string, endDate?: string, status?: string): Promise<Delivery[]> {
-    const params = new URLSearchParams();
+    const params = new URLSearchParams({ all: '1' });
     if (startDate) params.append('start_date', startDate);
     if (endDate) params.append('end_date', endDate);
     if (status) params.append('status', status);
-    const query = params.toString() ? `?${params.toString()}` : '';
-    return this.request<Delivery[]>(`/api/deliveries${query}`);
+    return this.request<Delivery[]>(`/api/deliveries?${params.toString()}`);
   }
 
   // Sample endpoints
   async getSamples(garmentType?: string): Promise<Sample[]> {
-    const query = garmentType ? `?garment_type=${garmentType}` : '';
-    return this.request<Sample[]>(`/api/samples${query}`);
+    const query = garmentType ? `&garment_type=${garmentType}` : '';
+    return this.request<Sample[]>(`/api/samples?all=1${query}`);
   }
 
   async getSample(id: number): Promise<Sample> {
@@ -285,6 +374,16 @@ class ApiClient {
     });
   }
 
+  // Multipart upload: files are streamed to disk server-side instead of sent as base64
+  async uploadSampleImages(id: number, files: File[]): Promise<SampleImage[]> {
+    const body = new FormData();
+    files.forEach((file) => body.append('images', file));
+    return this.request<SampleImage[]>(`/api/samples/${id}/images/`, {
+      method: 'POST',
+      body,
+    });
+  }
+
   async deleteSample(id: number): Promise<void> {
     return this.request<void>(`/api/samples/${id}/`, {
       method: 'DELETE',
@@ -293,8 +392,8 @@ class ApiClient {
 
   // Staff endpoints
   async getStaff(role?: string): Promise<Staff[]> {
-    const query = role ? `?role=${role}` : '';
-    return this.request<Staff[]>(`/api/staff${query}`);
+    const query = role ? `&role=${role}` : '';
+    return this.request<Staff[]>(`/api/staff?all=1${query}`);
   }
 
   async getStaffById(id: number): Promise<Staff> {
@@ -338,6 +437,11 @@ class ApiClient {
       method: 'DELETE',
     });
   }
+
+  // Dashboard endpoints
+  async getDashboardSummary(): Promise<DashboardSummary> {
+    return this.request<DashboardSummary>('/api/dashboard/summary/');
+  }
 }
 
 export const api = new ApiClient();
@@ -361,6 +465,26 @@ export interface Measurement {
   created_at: string;
 }
 
+export interface SimilarMeasurement extends MeasurementWithCustomer {
+  distance: number; // RMS difference over the shared fields, in measurement units
+  fields_compared: number;
+}
+
+// Stored history entry: a full snapshot, or only the fields changed since the previous revision
+export interface MeasurementRevision {
+  revision: number;
+  is_snapshot: boolean;
+  changes: Record<string, number> | { set?: Record<string, number>; unset?: string[] };
+  created_at: string;
+}
+
+export interface MeasurementAtRevision {
+  measurement_id: number;
+  revision: number;
+  measurements_json: Record<string, number>;
+  created_at: string;
+}
+
 export interface MeasurementWithCustomer extends Measurement {
   customer_name: string;
   customer_phone: string;
@@ -490,11 +614,39 @@ export interface Delivery {
   remaining_amount: number;
 }
 
+// Dashboard types
+export interface DashboardSummary {
+  total_customers: number;
+  total_orders: number;
+  total_revenue: number;
+  outstanding_amount: number;
+  status_counts: Record<'pending' | 'cutting' | 'sewing' | 'ready' | 'delivered', number>;
+  upcoming_deliveries: {
+    id: number;
+    customer_name: string;
+    status: 'pending' | 'cutting' | 'sewing' | 'ready' | 'delivered';
+    delivery_date: string;
+  }[];
+  recent_orders: {
+    id: number;
+    customer_name: string;
+    status: 'pending' | 'cutting' | 'sewing' | 'ready' | 'delivered';
+    order_date: string;
+    total_amount: number;
+  }[];
+  recent_customers: {
+    id: number;
+    name: string;
+    phone: string;
+  }[];
+}
+
 // Sample types
 export interface SampleImage {
   id: number;
   sample_id: number;
   image_url: string;
+  variants: Record<string, string>; // width (px) -> URL; empty for external image links
   display_order: number;
   created_at: string;
 }
@@ -1,26 +1,18 @@
 import { useEffect, useState } from 'react';
 import { Link } from 'react-router-dom';
-import { useOrderStore } from '../store/orderStore';
-import { useCustomerStore } from '../store/customerStore';
-import { usePaymentStore } from '../store/paymentStore';
+import { api } from '../lib/api';
+import type { DashboardSummary } from '../lib/api';
 import { formatDate } from '../lib/utils';
 
 export default function Dashboard() {
-  const { orders, fetchOrders } = useOrderStore();
-  const { customers, fetchCustomers } = useCustomerStore();
-  const { payments, fetchPayments } = usePaymentStore();
-
+  const [summary, setSummary] = useState<DashboardSummary | null>(null);
   const [loading, setLoading] = useState(true);
 
   useEffect(() => {
     const loadData = async () => {
       setLoading(true);
       try {
-        await Promise.all([
-          fetchOrders(),
-          fetchCustomers(),
-          fetchPayments(),
-        ]);
+        setSummary(await api.getDashboardSummary());
       } catch (error) {
         console.error('Error loading dashboard data:', error);
       } finally {
@@ -28,43 +20,22 @@ export default function Dashboard() {
       }
     };
     loadData();
-    // eslint-disable-next-line react-hooks/exhaustive-deps
   }, []);
 
-  // Calculate statistics
-  const totalCustomers = customers.length;
-  const totalOrders = orders.length;
-  const totalRevenue = payments.reduce((sum, payment) => sum + payment.amount, 0);
-  const pendingOrders = orders.filter((o) => o.status === 'pending').length;
-  const cuttingOrders = orders.filter((o) => o.status === 'cutting').length;
-  const sewingOrders = orders.filter((o) => o.status === 'sewing').length;
-  const readyOrders = orders.filter((o) => o.status === 'ready').length;
-  const deliveredOrders = orders.filter((o) => o.status === 'delivered').length;
-
-  // Get recent orders (last 5)
-  const recentOrders = [...orders]
-    .sort((a, b) => new Date(b.order_date).getTime() - new Date(a.order_date).getTime())
-    .slice(0, 5);
-
-  // Get recent customers (last 5)
-  const recentCustomers = [...customers]
-    .sort((a, b) => new Date(b.created_at).getTime() - new Date(a.created_at).getTime())
-    .slice(0, 5);
-
-  // Get upcoming deliveries (next 7 days)
+  // Statistics are aggregated server-side by /api/dashboard/summary/
+  const totalCustomers = summary?.total_customers ?? 0;
+  const totalOrders = summary?.total_orders ?? 0;
+  const totalRevenue = summary?.total_revenue ?? 0;
+  const pendingOrders = summary?.status_counts.pending ?? 0;
+  const cuttingOrders = summary?.status_counts.cutting ?? 0;
+  const sewingOrders = summary?.status_counts.sewing ?? 0;
+  const readyOrders = summary?.status_counts.ready ?? 0;
+  const deliveredOrders = summary?.status_counts.delivered ?? 0;
+  const recentOrders = summary?.recent_orders ?? [];
+  const recentCustomers = summary?.recent_customers ?? [];
+  const upcomingDeliveries = summary?.upcoming_deliveries ?? [];
+  const outstandingAmount = summary?.outstanding_amount ?? 0;
   const today = new Date();
-  const nextWeek = new Date(today);
-  nextWeek.setDate(today.getDate() + 7);
-  const upcomingDeliveries = orders
-    .filter((order) => {
-      const deliveryDate = new Date(order.delivery_date);
-      return deliveryDate >= today && deliveryDate <= nextWeek && order.status !== 'delivered';
-    })
-    .sort((a, b) => new Date(a.delivery_date).getTime() - new Date(b.delivery_date).getTime())
-    .slice(0, 5);
-
-  // Calculate outstanding payments
-  const outstandingAmount = orders.reduce((sum, order) => sum + order.remaining_amount, 0);
 
   const getStatusColor = (status: string) => {
     const colors: Record<string, string> = {
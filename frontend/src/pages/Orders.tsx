@@ -11,8 +11,11 @@ export default function Orders() {
   const {
     orders,
     loading,
+    loadingMore,
     error,
     fetchOrders,
+    loadMoreOrders,
+    nextCursor,
     selectedOrder,
     setSelectedOrder,
     deleteOrder,
@@ -42,7 +45,7 @@ export default function Orders() {
 
   const handleSearch = (e: React.FormEvent) => {
     e.preventDefault();
-    // Search is handled by filtering the displayed orders
+    // Search is handled by filtering the loaded orders
   };
 
   const filteredOrders = orders.filter((order) => {
@@ -390,6 +393,19 @@ export default function Orders() {
                     </tbody>
                   </table>
                 </div>
+
+                {/* Next page of the cursor-paginated list */}
+                {nextCursor && (
+                  <div className="text-center p-4">
+                    <button
+                      onClick={() => loadMoreOrders()}
+                      disabled={loadingMore}
+                      className="px-4 py-2.5 min-h-[44px] bg-gray-100 text-text-secondary rounded-lg hover:bg-gray-200 transition-colors disabled:opacity-50"
+                    >
+                      {loadingMore ? 'Loading...' : 'Load more orders'}
+                    </button>
+                  </div>
+                )}
               </>
             )}
           </div>
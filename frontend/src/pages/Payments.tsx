@@ -5,14 +5,14 @@ import { formatDate } from '../lib/utils';
 
 export default function Payments() {
   const { payments, loading, error, fetchPayments } = usePaymentStore();
-  const { orders, fetchOrders } = useOrderStore();
+  const { orders, fetchAllOrders } = useOrderStore();
 
   const [selectedOrderId, setSelectedOrderId] = useState<number | ''>('');
   const [searchTerm, setSearchTerm] = useState<string>('');
 
   useEffect(() => {
     fetchPayments();
-    fetchOrders();
+    fetchAllOrders(); // every order, to label payments and fill the order filter
     // eslint-disable-next-line react-hooks/exhaustive-deps
   }, []);
 
@@ -4,7 +4,14 @@ import { useToastStore } from '../store/toastStore';
 import SampleForm from '../components/SampleForm';
 import ConfirmDialog from '../components/ConfirmDialog';
 import ImageModal from '../components/ImageModal';
-import type { Sample } from '../lib/api';
+import type { Sample, SampleImage } from '../lib/api';
+
+// Let the browser pick the smallest gallery variant that fills the card
+function variantSrcSet(image: SampleImage): string | undefined {
+  const entries = Object.entries(image.variants ?? {});
+  if (entries.length === 0) return undefined;
+  return entries.map(([width, url]) => `${url} ${width}w`).join(', ');
+}
 
 export default function Samples() {
   const {
@@ -190,7 +197,10 @@ export default function Samples() {
                               {sample.images.length > 0 ? (
                                 <>
                                   <img
-                                    src={sample.images[0].image_url}
+                                    src={sample.images[0].variants?.['480'] ?? sample.images[0].image_url}
+                                    srcSet={variantSrcSet(sample.images[0])}
+                                    sizes="(min-width: 1280px) 25vw, (min-width: 1024px) 33vw, (min-width: 640px) 50vw, 100vw"
+                                    loading="lazy"
                                     alt={sample.title}
                                     className="w-full h-full object-cover group-hover:scale-110 transition-transform duration-300"
                                     onClick={() => setSelectedImage(sample)}
@@ -3,6 +3,7 @@
 import { create } from 'zustand';
 import {
   api,
+  cursorFrom,
   type OrderWithDetails,
   type OrderCreate,
   type OrderUpdate,
@@ -11,9 +12,15 @@ import {
 interface OrderState {
   orders: OrderWithDetails[];
   loading: boolean;
+  loadingMore: boolean;
   error: string | null;
   selectedOrder: OrderWithDetails | null;
+  // Cursor of the next page of the current list, null when every order is loaded
+  nextCursor: string | null;
+  filters: { customerId?: number; status?: string };
   fetchOrders: (customerId?: number, status?: string) => Promise<void>;
+  loadMoreOrders: () => Promise<void>;
+  fetchAllOrders: (customerId?: number) => Promise<void>;
   fetchOrder: (id: number) => Promise<void>;
   createOrder: (order: OrderCreate) => Promise<void>;
   updateOrder: (id: number, order: OrderUpdate) => Promise<void>;
@@ -24,14 +31,50 @@ interface OrderState {
 export const useOrderStore = create<OrderState>((set, get) => ({
   orders: [],
   loading: false,
+  loadingMore: false,
   error: null,
   selectedOrder: null,
+  nextCursor: null,
+  filters: {},
 
   fetchOrders: async (customerId?: number, status?: string) => {
-    set({ loading: true, error: null });
+    set({ loading: true, error: null, filters: { customerId, status } });
+    try {
+      const page = await api.getOrders(customerId, status);
+      set({ orders: page.results, nextCursor: cursorFrom(page.next), loading: false });
+    } catch (error) {
+      set({
+        error: error instanceof Error ? error.message : 'Failed to fetch orders',
+        loading: false,
+      });
+    }
+  },
+
+  loadMoreOrders: async () => {
+    const { nextCursor, filters, loadingMore } = get();
+    if (!nextCursor || loadingMore) return;
+    set({ loadingMore: true, error: null });
+    try {
+      const page = await api.getOrders(filters.customerId, filters.status, nextCursor);
+      set((state) => ({
+        orders: [...state.orders, ...page.results],
+        nextCursor: cursorFrom(page.next),
+        loadingMore: false,
+      }));
+    } catch (error) {
+      set({
+        error: error instanceof Error ? error.message : 'Failed to fetch orders',
+        loadingMore: false,
+      });
+    }
+  },
+
+  // Whole list at once, for screens that look orders up by id (e.g. to label payments)
+  fetchAllOrders: async (customerId?: number) => {
+    set({ loading: true, error: null, filters: { customerId } });
     try {
-      const orders = await api.getOrders(customerId, status);
-      set({ orders, loading: false });
+      const orders = await api.getAllOrders(customerId);
+      set({ orders, nextCursor: null, loading: false });
     } catch (error) {
       set({
         error: error instanceof Error ? error.message : 'Failed to fetch orders',
@@ -57,7 +100,8 @@ export const useOrderStore = create<OrderState>((set, get) => ({
     set({ loading: true, error: null });
     try {
       await api.createOrder(order);
-      await get().fetchOrders();
+      const { customerId, status } = get().filters;
+      await get().fetchOrders(customerId, status);
       set({ loading: false });
     } catch (error) {
       set({
@@ -78,7 +122,8 @@ export const useOrderStore = create<OrderState>((set, get) => ({
         const updatedOrder = await api.getOrder(id);
         set({ selectedOrder: updatedOrder });
       }
-      await get().fetchOrders();
+      const { customerId, status } = get().filters;
+      await get().fetchOrders(customerId, status);
       set({ loading: false });
     } catch (error) {
       set({